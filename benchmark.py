@@ -0,0 +1,545 @@
+#!/usr/bin/python
+
+#-------------------------------------------------------------------------------
+#    Filename: benchmark.py
+#
+#      Author: David C. Drake (https://davidcdrake.com)
+#
+# Description: Benchmarks for the game's hot paths (board generation, mine
+#              counting, reveals, undo, win checks, and restarts) at the
+#              standard board sizes and at larger custom sizes. Headless
+#              benchmarks time the engine alone; GUI benchmarks (with '--gui')
+#              time the GTK table as well, under a virtual display if no
+#              display is available. Solver benchmarks time the slowest
+#              deduction step and mine probability computation over games on
+#              a dense board. Startup benchmarks time importing the game's
+#              modules in a fresh interpreter, and memory benchmarks measure
+#              the size of a board's state and of an undo history. Results
+#              are saved as JSON and compared against a stored baseline so
+#              that regressions are caught.
+#
+#   Functions: timeCall, timeBatch, getSafeCell, getFloodCell,
+#              benchmarkHeadless, benchmarkSolver, benchmarkGui,
+#              benchmarkStartup, benchmarkMemory, startVirtualDisplay,
+#              formatResult, compareResults, main
+#-------------------------------------------------------------------------------
+
+import argparse
+import gc
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from engine import SMALL, MEDIUM, LARGE, ROW_COL_VALUES, MINE_RATIO, \
+                   PLAYING, MinesweeperBoard, getNeighborIndex, importNumpy
+from history import BoardHistory
+from solver import MinesweeperSolver
+
+SIZES = [('small', ROW_COL_VALUES[SMALL]), ('medium', ROW_COL_VALUES[MEDIUM]),
+         ('large', ROW_COL_VALUES[LARGE]), ('100x100', (100, 100)),
+         ('300x300', (300, 300))]
+GUI_SIZES = SIZES[:3] + [('50x50', (50, 50))]
+MEMORY_SIZES = SIZES + [('1000x1000', (1000, 1000))]
+BASELINE_FILE = 'benchmark_baseline.json'
+DEFAULT_THRESHOLD = 1.5 # slowdown ratio reported as a regression
+DEFAULT_REPEAT = 7
+MIN_TIME = 0.002 # seconds of timed calls per benchmark, e.g. 200 x 10 us
+MAX_REPEAT = 200 # timed calls per benchmark when making up MIN_TIME
+BATCH = 50 # operations per batch in 'timeBatch'
+SEED = 12345
+HISTORY_VERSIONS = 1000 # versions in the search tree of the memory benchmark
+SOLVER_SIZE = (20, 20)
+SOLVER_MINE_RATIO = 0.2 # dense enough for frontiers with many layouts
+SOLVER_GAMES = 100
+SOLVER_PASSES = 3 # times the games are played; each step's best time counts
+
+#-------------------------------------------------------------------------------
+#    Function: timeCall
+#
+# Description: Times a call several times, each time on fresh arguments from
+#              a setup function (which is not timed). Quick calls are
+#              repeated until MIN_TIME has been timed (up to MAX_REPEAT
+#              calls), since their best time varies too much over a few
+#              calls. Garbage collection is off while timing, as in
+#              'timeit'.
+#
+#      Inputs: setup  - Function returning a tuple of arguments for 'call'.
+#              call   - The function to time.
+#              repeat - Number of timed calls (at least).
+#              ops    - Number of operations each call performs; the result is
+#                       divided by this.
+#
+#     Outputs: Best (least disturbed) time per operation, in seconds.
+#-------------------------------------------------------------------------------
+def timeCall(setup, call, repeat=DEFAULT_REPEAT, ops=1):
+    times = []
+    while len(times) < repeat or (sum(times) < MIN_TIME and
+                                  len(times) < MAX_REPEAT):
+        args = setup()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            call(*args)
+            times.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return min(times) / ops
+
+#-------------------------------------------------------------------------------
+#    Function: timeBatch
+#
+# Description: Times an operation BATCH times in a row on the same arguments,
+#              undoing it (untimed) after each time, so that quick operations
+#              are not timed right after an expensive setup. The result is the
+#              median over several batches, which a few disturbed batches
+#              don't move.
+#
+#      Inputs: setup  - Function returning a tuple of arguments for 'call'
+#                       and 'undo'.
+#              call   - The operation to time.
+#              undo   - Function that undoes the operation.
+#              repeat - Number of batches.
+#
+#     Outputs: Median time per operation, in seconds.
+#-------------------------------------------------------------------------------
+def timeBatch(setup, call, undo, repeat=DEFAULT_REPEAT):
+    times = []
+    for _ in range(repeat):
+        args = setup()
+        total = 0.0
+        gc.disable()
+        try:
+            for _ in range(BATCH):
+                start = time.perf_counter()
+                call(*args)
+                total += time.perf_counter() - start
+                undo(*args)
+        finally:
+            gc.enable()
+        times.append(total / BATCH)
+    return statistics.median(times)
+
+#-------------------------------------------------------------------------------
+#    Function: getSafeCell
+#
+# Description: Finds a cell with no adjacent mines (or, failing that, any
+#              non-mine cell), so that revealing it starts a flood fill.
+#
+#      Inputs: board - The MinesweeperBoard to search.
+#
+#     Outputs: Tuple containing the row and column of the cell.
+#-------------------------------------------------------------------------------
+def getSafeCell(board):
+    safe = [i for i in range(board.rows * board.cols)
+            if not board.containsMine(i)]
+    for i in safe:
+        if board.getAdjacentMines(i) == 0:
+            return board.getRowCol(i)
+    return board.getRowCol(safe[0])
+
+#-------------------------------------------------------------------------------
+#    Function: getFloodCell
+#
+# Description: Finds the cell whose reveal floods the largest region of a
+#              board, so that timing its reveal measures a real flood fill.
+#              The board is left with those cells revealed.
+#
+#      Inputs: board - The (unrevealed) MinesweeperBoard to search.
+#
+#     Outputs: Tuple containing the row and column of the cell.
+#-------------------------------------------------------------------------------
+def getFloodCell(board):
+    (best, largest) = (None, 0)
+    for i in range(board.rows * board.cols):
+        if not board.containsMine(i) and not board.isRevealed(i) and \
+           board.getAdjacentMines(i) == 0:
+            flooded = len(board.revealCell(*board.getRowCol(i)))
+            if flooded > largest:
+                (best, largest) = (i, flooded)
+    if best is None:
+        return getSafeCell(board)
+    return board.getRowCol(best)
+
+#-------------------------------------------------------------------------------
+#    Function: benchmarkHeadless
+#
+# Description: Times the engine's hot paths at every size in SIZES.
+#
+#      Inputs: repeat - Number of timed calls per benchmark.
+#
+#     Outputs: Dictionary mapping benchmark names to seconds per operation.
+#-------------------------------------------------------------------------------
+def benchmarkHeadless(repeat=DEFAULT_REPEAT):
+    results = {}
+    for (name, (rows, cols)) in SIZES:
+
+        def newBoard():
+            # The same layout every time, so that each timed reveal floods
+            # the same region.
+            return MinesweeperBoard(rows, cols, MINE_RATIO, seed=SEED)
+
+        def emptyBoard():
+            board = newBoard()
+            board.cells = bytearray(rows * cols)
+            return (board,)
+
+        def countAll(board):
+            for row in range(rows):
+                for col in range(cols):
+                    board.getAdjacentMineCount(row, col)
+
+        (floodRow, floodCol) = getFloodCell(newBoard())
+
+        def revealArgs():
+            board = newBoard()
+            return (board, BoardHistory(board))
+
+        def undoArgs():
+            (board, history) = revealArgs()
+            board.revealCell(floodRow, floodCol)
+            history.commit()
+            return (board, history)
+
+        def checkWon(board):
+            for _ in range(1000):
+                board.hasWon()
+
+        prefix = 'headless/%s/' % name
+        results[prefix + 'placeMines'] = timeCall(
+            emptyBoard, lambda board: board.placeMines(), repeat)
+        results[prefix + 'placeLabels'] = timeCall(
+            lambda: (newBoard(),), lambda board: board.placeLabels(), repeat)
+        results[prefix + 'getAdjacentMineCount'] = timeCall(
+            lambda: (newBoard(),), countAll, repeat, rows * cols)
+        results[prefix + 'revealCell'] = timeBatch(
+            revealArgs,
+            lambda board, history: board.revealCell(floodRow, floodCol),
+            lambda board, history: history.rollback(), repeat)
+        results[prefix + 'undo'] = timeBatch(
+            undoArgs, lambda board, history: history.undo(),
+            lambda board, history: history.redo(), repeat)
+        results[prefix + 'revealAllCells'] = timeCall(
+            lambda: (newBoard(),), lambda board: board.revealAllCells(),
+            repeat)
+        results[prefix + 'playerHasWon'] = timeCall(
+            lambda: (newBoard(),), checkWon, repeat, 1000)
+        results[prefix + 'restart'] = timeCall(lambda: (), newBoard, repeat)
+    return results
+
+#-------------------------------------------------------------------------------
+#    Function: benchmarkSolver
+#
+# Description: Plays SOLVER_GAMES seeded games with a MinesweeperSolver on a
+#              dense board, timing every deduction step and every mine
+#              probability computation. The games are played SOLVER_PASSES
+#              times, the same way each time, and each step's best time is
+#              kept, so that one disturbed step can't set the result. The
+#              slowest step of each kind is reported, since it is the worst
+#              wait for a Solve or Hint in the game.
+#
+#      Inputs: None.
+#
+#     Outputs: Dictionary mapping benchmark names to seconds.
+#-------------------------------------------------------------------------------
+def benchmarkSolver():
+    (rows, cols) = SOLVER_SIZE
+    steps = {} # (game, move) -> best time of its deduction step
+    probabilities = {} # (game, move) -> best time of its probabilities
+    for _ in range(SOLVER_PASSES):
+        for seed in range(SOLVER_GAMES):
+            board = MinesweeperBoard(rows, cols, SOLVER_MINE_RATIO,
+                                     seed=SEED + seed)
+            solver = MinesweeperSolver(board)
+            solver.click(board.getIndex(rows // 2, cols // 2))
+            move = 0
+            gc.disable()
+            try:
+                while board.getState() == PLAYING:
+                    move += 1
+                    start = time.perf_counter()
+                    changed = solver.step()
+                    elapsed = time.perf_counter() - start
+                    key = (seed, move)
+                    steps[key] = min(steps.get(key, elapsed), elapsed)
+                    if changed:
+                        continue
+                    start = time.perf_counter()
+                    safest = solver.getSafestCell()
+                    elapsed = time.perf_counter() - start
+                    probabilities[key] = min(probabilities.get(key, elapsed),
+                                             elapsed)
+                    if safest is None:
+                        break
+                    solver.guess(safest[0])
+            finally:
+                gc.enable()
+    prefix = 'solver/%dx%d-%g/' % (rows, cols, SOLVER_MINE_RATIO)
+    return {prefix + 'worstStep': max(steps.values(), default=0.0),
+            prefix + 'worstMineProbabilities':
+                max(probabilities.values(), default=0.0)}
+
+#-------------------------------------------------------------------------------
+#    Function: benchmarkGui
+#
+# Description: Times the GTK table's hot paths and a full game restart at
+#              every size in GUI_SIZES. Mine images and labels are placed on
+#              tables whose own have been removed, so each timing builds
+#              them from scratch and no widgets pile up. Requires PyGObject
+#              and a display.
+#
+#      Inputs: repeat - Number of timed calls per benchmark.
+#
+#     Outputs: Dictionary mapping benchmark names to seconds per operation.
+#-------------------------------------------------------------------------------
+def benchmarkGui(repeat=DEFAULT_REPEAT):
+    import minesweeper
+    from gui import Minesweeper, MinesweeperTable, Gtk
+
+    def flush():
+        while Gtk.events_pending():
+            Gtk.main_iteration()
+
+    results = {}
+    for (name, (rows, cols)) in GUI_SIZES:
+        random.seed(SEED)
+        prefix = 'gui/%s/' % name
+
+        def newTable():
+            table = MinesweeperTable(rows, cols)
+            table.show_all()
+            return (table,)
+
+        def emptyTable():
+            (table,) = newTable()
+            for widget in table.contents.values():
+                table.remove(widget)
+            table.contents.clear()
+            return (table,)
+
+        def revealArgs():
+            (table,) = newTable()
+            return (table,) + getSafeCell(table.getBoard())
+
+        results[prefix + 'createTable'] = timeCall(
+            lambda: (), lambda: newTable(), repeat)
+        results[prefix + 'placeMines'] = timeCall(
+            emptyTable, lambda table: table.placeMines(), repeat)
+        results[prefix + 'placeLabels'] = timeCall(
+            emptyTable, lambda table: table.placeLabels(), repeat)
+        results[prefix + 'revealCell'] = timeCall(
+            revealArgs, lambda table, row, col: table.revealCell(row, col),
+            repeat)
+        results[prefix + 'revealAllCells'] = timeCall(
+            newTable, lambda table: table.revealAllCells(), repeat)
+        game = Minesweeper(minesweeper.DEFAULT_SIZE, rows=rows, cols=cols)
+        flush()
+
+        def restart():
+            game.restart()
+            flush()
+
+        results[prefix + 'restart'] = timeCall(lambda: (), restart, repeat)
+        game.window.destroy()
+        flush()
+    return results
+
+#-------------------------------------------------------------------------------
+#    Function: benchmarkStartup
+#
+# Description: Times starting a fresh interpreter that imports a module, for
+#              the bare interpreter, the game's entry point ('minesweeper.py',
+#              which should not load GTK), and optionally the GTK interface.
+#
+#      Inputs: repeat - Number of timed starts per benchmark.
+#              gui    - If 'True', also time importing 'gui.py' (needs
+#                       PyGObject).
+#
+#     Outputs: Dictionary mapping benchmark names to seconds per start.
+#-------------------------------------------------------------------------------
+def benchmarkStartup(repeat=DEFAULT_REPEAT, gui=False):
+    here = os.path.dirname(os.path.abspath(__file__))
+    commands = [('python', 'pass'), ('minesweeper', 'import minesweeper')]
+    if gui:
+        commands.append(('gui', 'import gui'))
+    results = {}
+    for (name, command) in commands:
+        results['startup/' + name] = timeCall(
+            lambda: (), lambda: subprocess.run([sys.executable, '-c', command],
+                                               cwd=here, check=True), repeat)
+    return results
+
+#-------------------------------------------------------------------------------
+#    Function: benchmarkMemory
+#
+# Description: Measures the memory held by a board of each size in
+#              MEMORY_SIZES, and by the neighbor index shared by all boards of
+#              that size, and the memory held by a search tree of
+#              HISTORY_VERSIONS hypothetical states of a large board.
+#
+#      Inputs: None.
+#
+#     Outputs: Dictionary mapping benchmark names to sizes, in bytes.
+#-------------------------------------------------------------------------------
+def benchmarkMemory():
+    results = {}
+    if importNumpy() is not None: # so that loading NumPy isn't counted
+        MinesweeperBoard(2, 2, useNumpy=True)
+    for (name, (rows, cols)) in MEMORY_SIZES:
+        getNeighborIndex.cache_clear()
+        tracemalloc.start()
+        try:
+            getNeighborIndex(rows, cols)
+            index = tracemalloc.get_traced_memory()[0]
+            board = MinesweeperBoard(rows, cols, MINE_RATIO,
+                                     random.Random(SEED), useNumpy=True)
+            total = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+        results['memory/%s/board' % name] = total - index
+        results['memory/%s/neighborIndex' % name] = index
+        del board
+    board = MinesweeperBoard(*ROW_COL_VALUES[LARGE], MINE_RATIO,
+                             random.Random(SEED))
+    history = BoardHistory(board)
+    versions = [history.getVersion()]
+    rng = random.Random(SEED)
+    tracemalloc.start()
+    try:
+        for _ in range(HISTORY_VERSIONS):
+            history.checkout(rng.choice(versions))
+            board.toggleFlag(*board.getRowCol(rng.randrange(board.rows *
+                                                            board.cols)))
+            versions.append(history.commit())
+        results['memory/history/%dversions' % HISTORY_VERSIONS] = \
+            tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return results
+
+#-------------------------------------------------------------------------------
+#    Function: startVirtualDisplay
+#
+# Description: Starts an Xvfb virtual display if no display is available.
+#
+#      Inputs: None.
+#
+#     Outputs: The Xvfb process, or None if none was started.
+#-------------------------------------------------------------------------------
+def startVirtualDisplay():
+    if os.environ.get('DISPLAY') or not shutil.which('Xvfb'):
+        return None
+    process = subprocess.Popen(['Xvfb', ':99', '-screen', '0', '1920x1080x24'],
+                               stdout=subprocess.DEVNULL,
+                               stderr=subprocess.DEVNULL)
+    os.environ['DISPLAY'] = ':99'
+    time.sleep(1) # give the server time to accept connections
+    return process
+
+#-------------------------------------------------------------------------------
+#    Function: formatResult
+#
+# Description: Formats a result in the unit that suits it.
+#
+#      Inputs: name  - Name of the benchmark.
+#              value - Its result.
+#
+#     Outputs: The formatted result (megabytes for memory benchmarks,
+#              otherwise microseconds).
+#-------------------------------------------------------------------------------
+def formatResult(name, value):
+    if name.startswith('memory/'):
+        return '%12.3f MB' % (value / 1e6)
+    return '%12.2f us' % (value * 1e6)
+
+#-------------------------------------------------------------------------------
+#    Function: compareResults
+#
+# Description: Compares results against a baseline and prints the ratio of
+#              each benchmark present in both.
+#
+#      Inputs: results   - Dictionary of current results.
+#              baseline  - Dictionary of baseline results.
+#              threshold - Ratio above which a benchmark counts as a
+#                          regression.
+#
+#     Outputs: List of the names of the benchmarks that regressed.
+#-------------------------------------------------------------------------------
+def compareResults(results, baseline, threshold=DEFAULT_THRESHOLD):
+    regressions = []
+    for name in sorted(results):
+        if name not in baseline or baseline[name] <= 0:
+            continue
+        ratio = results[name] / baseline[name]
+        flag = ''
+        if ratio > threshold:
+            regressions.append(name)
+            flag = '  <-- regression'
+        print('%-45s %s %8.2fx%s' %
+              (name, formatResult(name, results[name]), ratio, flag))
+    return regressions
+
+#-------------------------------------------------------------------------------
+#    Function: main
+#
+# Description: Command-line entry point. Runs the benchmarks, saves the
+#              results, and compares them against the baseline.
+#
+#      Inputs: argv - Command-line arguments (optional; defaults to
+#                     'sys.argv').
+#
+#     Outputs: Exit status: 1 if any benchmark regressed, otherwise 0.
+#-------------------------------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Benchmark the Minesweeper hot paths.')
+    parser.add_argument('--gui', action='store_true',
+                        help='also benchmark the GTK table (needs PyGObject)')
+    parser.add_argument('-r', '--repeat', type=int, default=DEFAULT_REPEAT,
+                        help='timed calls per benchmark')
+    parser.add_argument('-o', '--output', help='JSON file for the results')
+    parser.add_argument('--baseline', default=BASELINE_FILE,
+                        help='JSON file of baseline results')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='store the results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='slowdown ratio reported as a regression')
+    args = parser.parse_args(argv)
+    results = benchmarkHeadless(args.repeat)
+    results.update(benchmarkSolver())
+    results.update(benchmarkStartup(args.repeat, args.gui))
+    results.update(benchmarkMemory())
+    if args.gui:
+        display = startVirtualDisplay()
+        try:
+            results.update(benchmarkGui(args.repeat))
+        finally:
+            if display is not None:
+                display.terminate()
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    regressions = compareResults(results, baseline, args.threshold)
+    if not baseline:
+        for name in sorted(results):
+            print('%-45s %s' % (name, formatResult(name, results[name])))
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if regressions:
+        print('%d benchmark(s) regressed by more than %.2fx' %
+              (len(regressions), args.threshold))
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
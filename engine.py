@@ -0,0 +1,967 @@
+#!/usr/bin/python
+
+#-------------------------------------------------------------------------------
+#    Filename: engine.py
+#
+#      Author: David C. Drake (https://davidcdrake.com)
+#
+# Description: Headless Minesweeper engine. Holds the board, mine placement,
+#              reveals, flags, and win/loss state without importing any GUI
+#              toolkit, so games can be created and played on machines that
+#              have no display.
+#
+#              Random boards are generated from a seed, and each has a short
+#              board code, such as '16x30-72-9f3a1c2b' (rows, columns, mines,
+#              and the seed in hexadecimal), from which 'boardFromCode'
+#              rebuilds it exactly.
+#
+#     Classes: MinesweeperBoard
+#
+#   Functions: getNeighborIndex, importNumpy, countAdjacentMines,
+#              generateBoards, parseBoardCode, boardFromCode
+#-------------------------------------------------------------------------------
+
+from functools import lru_cache
+from itertools import compress
+import math
+import random
+
+numpy = None # NumPy is optional and loaded on first use; see 'importNumpy'
+numpyChecked = False
+
+SMALL = 0
+MEDIUM = 1
+LARGE = 2
+ROW_COL_VALUES = [(10, 10), (15, 15), (20, 20)]
+MINE_RATIO = 0.10 # about 10% of cells will contain mines
+SEED_BITS = 32 # of the seeds chosen for new boards, to keep codes short
+RELOCATION_TRIES = 32 # random draws for a free cell before listing them all
+
+PLAYING = 0
+WON = 1
+LOST = 2
+
+MINE = 1 # bits of a cell's state byte
+REVEALED = 2
+FLAGGED = 4
+COVER_TABLE = bytes(b & MINE for b in range(256)) # clears REVEALED, FLAGGED
+REVEAL_TABLE = bytes(b & MINE | REVEALED for b in range(256)) # and reveals
+FREE_TABLE = bytes(0 if b & MINE else 1 for b in range(256)) # 1 if no mine
+
+#-------------------------------------------------------------------------------
+#       Class: MinesweeperBoard
+#
+# Description: The state of a single Minesweeper game: where the mines are, how
+#              many mines border each cell, and which cells have been revealed
+#              or flagged. Cells are addressed by (row, col) or by their index
+#              in row-major order.
+#
+#              State is stored as a structure of byte arrays, one byte per
+#              cell each: 'cells' holds the MINE, REVEALED, and FLAGGED bits,
+#              'adjacentMines' the mine counts, and 'adjacentFlags' the flag
+#              counts, so a board takes about three bytes per cell.
+#
+#              While 'journal' is a list (see 'history.py'), every change to
+#              a cell is logged there as an (index, old state byte, old
+#              adjacent mine count) tuple before it is made, so moves can be
+#              undone in time proportional to the cells they changed.
+#
+#     Methods: __init__, getMineCount, placeMines, placeLabels,
+#              placeLabelsWithNumpy, getAdjacentMineCount, containsMine,
+#              getMines, getAdjacentMines,
+#              isRevealed, isFlagged, getFlagCount, getAdjacentFlags,
+#              getRevealedCount, getState, hasWon, hasLost, clickCell,
+#              playMove, openCell, chordCell, revealCell, revealAllCells,
+#              toggleFlag, setFlag, moveMine, clearOpening,
+#              getRelocationTarget, getFreeCells,
+#              reset, logCells, restoreCell, getNeighbors, getIndex,
+#              getRowCol, getSeed, getCode
+#-------------------------------------------------------------------------------
+class MinesweeperBoard:
+    #---------------------------------------------------------------------------
+    #      Method: __init__
+    #
+    # Description: Creates an empty board of the given size, then places mines
+    #              and computes adjacent mine counts.
+    #
+    #      Inputs: rows      - Number of rows.
+    #              cols      - Number of columns.
+    #              mineRatio - Ratio of mines vs. empty cells.
+    #              rng       - Source of randomness (anything with a
+    #                          'randrange' method; optional). By default, a
+    #                          generator is created from 'seed'.
+    #              mines     - Optional sequence of 'rows * cols' truth values
+    #                          giving a fixed mine layout, in which case no
+    #                          mines are placed at random.
+    #              useNumpy  - If 'True' and NumPy is installed, adjacent mine
+    #                          counts are computed with vectorized NumPy code.
+    #                          The layout is the same either way.
+    #              seed      - Seed of the mine layout (optional; chosen at
+    #                          random unless 'rng' or 'mines' is given).
+    #              mineCount - Number of mines, overriding 'mineRatio'
+    #                          (optional).
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def __init__(self, rows, cols, mineRatio=MINE_RATIO, rng=None,
+                 mines=None, useNumpy=False, seed=None, mineCount=None):
+        self.rows = rows
+        self.cols = cols
+        self.mineRatio = mineRatio
+        if seed is not None:
+            rng = random.Random(seed)
+        elif rng is None and mines is None:
+            seed = random.getrandbits(SEED_BITS)
+            rng = random.Random(seed)
+        self.rng = rng
+        self.seed = seed
+        (self.edgeClasses, self.neighborOffsets) = getNeighborIndex(rows, cols)
+        self.adjacentFlags = bytearray(rows * cols)
+        self.flagCount = 0
+        self.state = PLAYING
+        if mines is not None:
+            self.cells = bytearray(MINE if mine else 0 for mine in mines)
+            self.mineCount = self.cells.count(MINE)
+            self.adjacentMines = bytearray(rows * cols)
+            self.placeLabels()
+        else:
+            if mineCount is None:
+                mineCount = math.ceil(rows * cols * mineRatio)
+            if not 0 <= mineCount <= rows * cols:
+                raise ValueError('a %d x %d board cannot hold %d mines' %
+                                 (rows, cols, mineCount))
+            self.mineCount = mineCount
+            self.cells = bytearray(rows * cols)
+            self.placeMines()
+            if useNumpy and importNumpy() is not None:
+                self.placeLabelsWithNumpy()
+            else:
+                self.adjacentMines = bytearray(rows * cols)
+                self.placeLabels()
+        self.unrevealedSafeCells = rows * cols - self.mineCount
+        self.journal = None # list of (index, cell, count) while journaling
+
+    #---------------------------------------------------------------------------
+    #      Method: getMineCount
+    #
+    # Description: Determines how many mines a board of this size holds.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: The number of mines on the board.
+    #---------------------------------------------------------------------------
+    def getMineCount(self):
+        return self.mineCount
+
+    #---------------------------------------------------------------------------
+    #      Method: placeMines
+    #
+    # Description: Places mines in randomly selected cells, using Floyd's
+    #              algorithm: exactly one random number is drawn per mine, so
+    #              the time taken depends only on the number of mines, however
+    #              densely they are packed.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def placeMines(self):
+        cells = self.cells
+        randrange = self.rng.randrange
+        total = self.rows * self.cols
+        for j in range(total - self.getMineCount(), total):
+            i = randrange(j + 1)
+            if cells[i] & MINE:
+                i = j # 'j' has not been a candidate before, so it's free
+            cells[i] = MINE
+
+    #---------------------------------------------------------------------------
+    #      Method: placeLabelsWithNumpy
+    #
+    # Description: Computes every cell's adjacent mine count at once with
+    #              'countAdjacentMines'. Requires NumPy.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def placeLabelsWithNumpy(self):
+        mines = numpy.frombuffer(self.cells, dtype=numpy.uint8)
+        counts = countAdjacentMines(mines.reshape(self.rows, self.cols))
+        self.adjacentMines = bytearray(counts.tobytes())
+
+    #---------------------------------------------------------------------------
+    #      Method: placeLabels
+    #
+    # Description: Records, for each non-mine cell, the number of mines next to
+    #              it.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def placeLabels(self):
+        cells = self.cells
+        adjacentMines = self.adjacentMines
+        edgeClasses = self.edgeClasses
+        offsets = self.neighborOffsets
+        for i in range(self.rows * self.cols):
+            if not cells[i] & MINE:
+                count = 0
+                for d in offsets[edgeClasses[i]]:
+                    count += cells[i + d] & MINE
+                adjacentMines[i] = count
+
+    #---------------------------------------------------------------------------
+    #      Method: getAdjacentMineCount
+    #
+    # Description: Given a cell location, determines how many mines are adjacent
+    #              to that cell (i.e., how many mine-containing cells share a
+    #              side or corner with that cell) and returns that number.
+    #
+    #      Inputs: row - Row of the cell of interest.
+    #              col - Column of the cell of interest.
+    #
+    #     Outputs: The number of mines surrounding the cell of interest, or -1
+    #              if the cell itself contains a mine.
+    #---------------------------------------------------------------------------
+    def getAdjacentMineCount(self, row, col):
+        cells = self.cells
+        i = self.getIndex(row, col)
+        if cells[i] & MINE:
+            return -1
+        count = 0
+        for d in self.neighborOffsets[self.edgeClasses[i]]:
+            count += cells[i + d] & MINE
+        return count
+
+    #---------------------------------------------------------------------------
+    #      Method: containsMine
+    #
+    # Description: Determines whether a cell contains a mine.
+    #
+    #      Inputs: index - Index of the cell of interest.
+    #
+    #     Outputs: 'True' if the cell contains a mine, otherwise 'False'.
+    #---------------------------------------------------------------------------
+    def containsMine(self, index):
+        return self.cells[index] & MINE != 0
+
+    #---------------------------------------------------------------------------
+    #      Method: getMines
+    #
+    # Description: Provides the mine layout.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: A bytearray holding 1 for each cell with a mine and 0 for
+    #              each cell without.
+    #---------------------------------------------------------------------------
+    def getMines(self):
+        return self.cells.translate(COVER_TABLE)
+
+    #---------------------------------------------------------------------------
+    #      Method: getAdjacentMines
+    #
+    # Description: Provides the number of mines next to a cell.
+    #
+    #      Inputs: index - Index of the cell of interest.
+    #
+    #     Outputs: The number of adjacent mines (0 for mine cells).
+    #---------------------------------------------------------------------------
+    def getAdjacentMines(self, index):
+        return self.adjacentMines[index]
+
+    #---------------------------------------------------------------------------
+    #      Method: isRevealed
+    #
+    # Description: Determines whether a cell has been revealed.
+    #
+    #      Inputs: index - Index of the cell of interest.
+    #
+    #     Outputs: 'True' if the cell has been revealed, otherwise 'False'.
+    #---------------------------------------------------------------------------
+    def isRevealed(self, index):
+        return self.cells[index] & REVEALED != 0
+
+    #---------------------------------------------------------------------------
+    #      Method: isFlagged
+    #
+    # Description: Determines whether a cell has been flagged.
+    #
+    #      Inputs: index - Index of the cell of interest.
+    #
+    #     Outputs: 'True' if the cell is flagged, otherwise 'False'.
+    #---------------------------------------------------------------------------
+    def isFlagged(self, index):
+        return self.cells[index] & FLAGGED != 0
+
+    #---------------------------------------------------------------------------
+    #      Method: getFlagCount
+    #
+    # Description: Provides the number of flagged cells.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: The number of flags on the board.
+    #---------------------------------------------------------------------------
+    def getFlagCount(self):
+        return self.flagCount
+
+    #---------------------------------------------------------------------------
+    #      Method: getAdjacentFlags
+    #
+    # Description: Provides the number of flags next to a cell, which is kept
+    #              up to date as flags are placed and removed.
+    #
+    #      Inputs: index - Index of the cell of interest.
+    #
+    #     Outputs: The number of adjacent flagged cells.
+    #---------------------------------------------------------------------------
+    def getAdjacentFlags(self, index):
+        return self.adjacentFlags[index]
+
+    #---------------------------------------------------------------------------
+    #      Method: getRevealedCount
+    #
+    # Description: Determines how many safe cells have been revealed.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: The number of revealed non-mine cells.
+    #---------------------------------------------------------------------------
+    def getRevealedCount(self):
+        return self.rows * self.cols - self.mineCount - self.unrevealedSafeCells
+
+    #---------------------------------------------------------------------------
+    #      Method: getState
+    #
+    # Description: Provides the state of the game.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: PLAYING, WON, or LOST.
+    #---------------------------------------------------------------------------
+    def getState(self):
+        return self.state
+
+    #---------------------------------------------------------------------------
+    #      Method: hasWon
+    #
+    # Description: Determines whether every non-mine cell has been revealed,
+    #              using the running count kept up to date by 'revealCell'.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: 'True' if the game has been won, otherwise 'False'.
+    #---------------------------------------------------------------------------
+    def hasWon(self):
+        if self.state == PLAYING and self.unrevealedSafeCells == 0:
+            self.state = WON
+        return self.state == WON
+
+    #---------------------------------------------------------------------------
+    #      Method: hasLost
+    #
+    # Description: Determines whether a mine has been revealed.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: 'True' if the game has been lost, otherwise 'False'.
+    #---------------------------------------------------------------------------
+    def hasLost(self):
+        return self.state == LOST
+
+    #---------------------------------------------------------------------------
+    #      Method: clickCell
+    #
+    # Description: Plays a left-click on a cell: the game is lost if the cell
+    #              contains a mine, otherwise the cell (and possibly some empty
+    #              neighbors) is revealed.
+    #
+    #      Inputs: row - Row of the clicked cell.
+    #              col - Column of the clicked cell.
+    #
+    #     Outputs: List of the indices of the cells the click revealed (empty
+    #              if the click hit a mine or the game is already over).
+    #---------------------------------------------------------------------------
+    def clickCell(self, row, col):
+        if self.state != PLAYING:
+            return []
+        if self.cells[self.getIndex(row, col)] & MINE:
+            self.state = LOST
+            return []
+        changed = self.revealCell(row, col)
+        self.hasWon()
+        return changed
+
+    #---------------------------------------------------------------------------
+    #      Method: playMove
+    #
+    # Description: Plays a move given by cell index, with exactly the effect
+    #              of 'clickCell' or 'toggleFlag' (counters, win and loss
+    #              checks, and the journal included). Used to replay recorded
+    #              games without converting every move to a row and column.
+    #
+    #      Inputs: index - Index of the cell.
+    #              flag  - 'True' to toggle the cell's flag, 'False' to click
+    #                      it.
+    #
+    #     Outputs: List of the indices of the cells a click revealed (empty
+    #              for flags).
+    #---------------------------------------------------------------------------
+    def playMove(self, index, flag):
+        if flag:
+            if not self.cells[index] & REVEALED:
+                self.setFlag(index, not self.cells[index] & FLAGGED)
+            return []
+        return self.clickCell(*divmod(index, self.cols))
+
+    #---------------------------------------------------------------------------
+    #      Method: openCell
+    #
+    # Description: Plays a left-click the way the game's frontends do: if no
+    #              cell has been revealed yet, any mines around the clicked
+    #              cell are moved away first (see 'clearOpening'), so the first
+    #              click of a game never hits a mine.
+    #
+    #      Inputs: row - Row of the clicked cell.
+    #              col - Column of the clicked cell.
+    #
+    #     Outputs: Tuple containing a list of the indices of the cells whose
+    #              mine or count changed (empty after the first click) and a
+    #              list of the indices of the cells the click revealed.
+    #---------------------------------------------------------------------------
+    def openCell(self, row, col):
+        moved = []
+        if self.state == PLAYING and self.getRevealedCount() == 0:
+            moved = self.clearOpening(row, col)
+        return (moved, self.clickCell(row, col))
+
+    #---------------------------------------------------------------------------
+    #      Method: chordCell
+    #
+    # Description: Plays a chord on a revealed number: if as many of its
+    #              neighbors are flagged as it has adjacent mines, all of its
+    #              other covered neighbors are revealed (and the game is lost if
+    #              one of them contains a mine). Only the cell's own neighbors
+    #              are examined, plus any flood fills they start.
+    #
+    #      Inputs: row - Row of the clicked cell.
+    #              col - Column of the clicked cell.
+    #
+    #     Outputs: List of the indices of the cells the chord revealed.
+    #---------------------------------------------------------------------------
+    def chordCell(self, row, col):
+        i = self.getIndex(row, col)
+        count = self.adjacentMines[i]
+        cells = self.cells
+        if self.state != PLAYING or not cells[i] & REVEALED or count == 0 or \
+           self.adjacentFlags[i] != count:
+            return []
+        neighbors = [i + d for d in self.neighborOffsets[self.edgeClasses[i]]
+                     if not cells[i + d] & (REVEALED | FLAGGED)]
+        if any(cells[j] & MINE for j in neighbors):
+            self.state = LOST
+            return []
+        changed = []
+        cols = self.cols
+        for j in neighbors:
+            changed += self.revealCell(j // cols, j % cols)
+        self.hasWon()
+        return changed
+
+    #---------------------------------------------------------------------------
+    #      Method: revealCell
+    #
+    # Description: Reveals the cell at a given location and, if it's empty
+    #              (i.e., it bears neither mine nor label), also reveals all
+    #              nearby cells that don't contain a mine. The flood fill uses
+    #              a work list rather than recursion and marks each cell as it
+    #              is queued, so every cell is visited at most once.
+    #
+    #      Inputs: row - Row of the cell to reveal.
+    #              col - Column of the cell to reveal.
+    #
+    #     Outputs: List of the indices of the newly revealed cells.
+    #---------------------------------------------------------------------------
+    def revealCell(self, row, col):
+        cells = self.cells
+        adjacentMines = self.adjacentMines
+        edgeClasses = self.edgeClasses
+        offsets = self.neighborOffsets
+        i = self.getIndex(row, col)
+        if row < 0 or row >= self.rows or col < 0 or col >= self.cols or \
+           cells[i] & (REVEALED | MINE):
+            return []
+        if cells[i] & FLAGGED:
+            self.setFlag(i, False)
+        cells[i] |= REVEALED
+        changed = [i]
+        pending = [i] if adjacentMines[i] == 0 else []
+        while pending:
+            k = pending.pop()
+            for d in offsets[edgeClasses[k]]:
+                j = k + d
+                if not cells[j] & (REVEALED | MINE):
+                    if cells[j] & FLAGGED:
+                        self.setFlag(j, False)
+                    cells[j] |= REVEALED
+                    changed.append(j)
+                    if adjacentMines[j] == 0:
+                        pending.append(j)
+        self.unrevealedSafeCells -= len(changed)
+        if self.journal is not None: # flags were logged by 'setFlag'
+            self.journal.extend((j, cells[j] & ~REVEALED, adjacentMines[j])
+                                for j in changed)
+        return changed
+
+    #---------------------------------------------------------------------------
+    #      Method: revealAllCells
+    #
+    # Description: Reveals every cell and removes all flags.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def revealAllCells(self):
+        if self.journal is not None:
+            self.logCells(REVEAL_TABLE)
+        self.cells[:] = self.cells.translate(REVEAL_TABLE)
+        self.adjacentFlags[:] = bytes(self.rows * self.cols)
+        self.flagCount = 0
+        self.unrevealedSafeCells = 0
+
+    #---------------------------------------------------------------------------
+    #      Method: toggleFlag
+    #
+    # Description: Flags an unrevealed cell or removes its flag if it was
+    #              already flagged.
+    #
+    #      Inputs: row - Row of the cell of interest.
+    #              col - Column of the cell of interest.
+    #
+    #     Outputs: 'True' if the cell is now flagged, otherwise 'False'.
+    #---------------------------------------------------------------------------
+    def toggleFlag(self, row, col):
+        i = self.getIndex(row, col)
+        if not self.cells[i] & REVEALED:
+            self.setFlag(i, not self.cells[i] & FLAGGED)
+        return self.cells[i] & FLAGGED != 0
+
+    #---------------------------------------------------------------------------
+    #      Method: setFlag
+    #
+    # Description: Places or removes a cell's flag, updating the flag counts
+    #              of its neighbors and of the board.
+    #
+    #      Inputs: index - Index of the cell of interest.
+    #              flag  - 'True' to flag the cell, 'False' to unflag it.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def setFlag(self, index, flag):
+        if bool(self.cells[index] & FLAGGED) == bool(flag):
+            return
+        if self.journal is not None:
+            self.journal.append((index, self.cells[index],
+                                 self.adjacentMines[index]))
+        self.cells[index] ^= FLAGGED
+        change = 1 if flag else -1
+        self.flagCount += change
+        adjacentFlags = self.adjacentFlags
+        for d in self.neighborOffsets[self.edgeClasses[index]]:
+            adjacentFlags[index + d] += change
+
+    #---------------------------------------------------------------------------
+    #      Method: moveMine
+    #
+    # Description: Moves a mine to another cell, updating only the adjacent
+    #              mine counts of the cells around the two locations.
+    #
+    #      Inputs: fromIndex - Index of a cell containing a mine.
+    #              toIndex   - Index of a cell without a mine.
+    #
+    #     Outputs: List of the indices of the cells whose mine or count
+    #              changed.
+    #---------------------------------------------------------------------------
+    def moveMine(self, fromIndex, toIndex):
+        cells = self.cells
+        adjacentMines = self.adjacentMines
+        changed = [fromIndex, toIndex]
+        if self.journal is not None:
+            self.journal.extend((j, cells[j], adjacentMines[j])
+                                for j in changed + self.getNeighbors(fromIndex)
+                                + self.getNeighbors(toIndex))
+        cells[fromIndex] &= ~MINE
+        count = 0
+        for j in self.getNeighbors(fromIndex):
+            if cells[j] & MINE:
+                count += 1
+            else:
+                adjacentMines[j] -= 1
+                changed.append(j)
+        adjacentMines[fromIndex] = count
+        cells[toIndex] |= MINE
+        for j in self.getNeighbors(toIndex):
+            if not cells[j] & MINE:
+                adjacentMines[j] += 1
+                changed.append(j)
+        adjacentMines[toIndex] = 0
+        return changed
+
+    #---------------------------------------------------------------------------
+    #      Method: clearOpening
+    #
+    # Description: Makes a first click safe by moving any mines out of the
+    #              clicked cell and its neighbors to random free cells
+    #              elsewhere (with 'moveMine', so only the counts around the
+    #              old and new locations change). If there are not enough
+    #              free cells for that, only the clicked cell is cleared, and
+    #              if there are none at all (e.g., every other cell holds a
+    #              mine), nothing is moved. New locations are drawn with the
+    #              board's 'rng' (or a fresh one for boards built from a mine
+    #              layout) in a fixed order (see 'getRelocationTarget'), so
+    #              the first click costs about as much as any other, and
+    #              rebuilding a board from its code and clearing the same
+    #              opening gives the same layout.
+    #
+    #      Inputs: row - Row of the first click.
+    #              col - Column of the first click.
+    #
+    #     Outputs: List of the indices of the cells whose mine or count
+    #              changed.
+    #---------------------------------------------------------------------------
+    def clearOpening(self, row, col):
+        cells = self.cells
+        i = self.getIndex(row, col)
+        opening = self.getNeighbors(i) + [i]
+        mines = sorted(j for j in opening if cells[j] & MINE)
+        if not mines:
+            return []
+        safeCells = self.rows * self.cols - self.mineCount
+        if safeCells - (len(opening) - len(mines)) < len(mines):
+            (mines, opening) = ([i], [i])
+            if not cells[i] & MINE or safeCells == 0:
+                return []
+        rng = self.rng if self.rng is not None else random.Random()
+        excluded = set(opening)
+        changed = []
+        for j in mines:
+            changed += self.moveMine(j, self.getRelocationTarget(excluded,
+                                                                 rng))
+        return changed
+
+    #---------------------------------------------------------------------------
+    #      Method: getRelocationTarget
+    #
+    # Description: Picks a random free cell for a mine moved by
+    #              'clearOpening'. Cells are drawn at random until one is
+    #              free, which takes a few draws unless the board is nearly
+    #              full; after RELOCATION_TRIES misses, the target is chosen
+    #              from a full list of the free cells instead.
+    #
+    #      Inputs: excluded - Set of the indices of the cells to leave out.
+    #              rng      - Source of randomness.
+    #
+    #     Outputs: Index of the free cell.
+    #---------------------------------------------------------------------------
+    def getRelocationTarget(self, excluded, rng):
+        cells = self.cells
+        total = self.rows * self.cols
+        for _ in range(RELOCATION_TRIES):
+            j = rng.randrange(total)
+            if not cells[j] & MINE and j not in excluded:
+                return j
+        return rng.choice(self.getFreeCells(excluded))
+
+    #---------------------------------------------------------------------------
+    #      Method: getFreeCells
+    #
+    # Description: Lists the cells that hold no mine, leaving out some given
+    #              cells.
+    #
+    #      Inputs: excluded - List of the indices of the cells to leave out.
+    #
+    #     Outputs: List of the indices of the free cells, in ascending order.
+    #---------------------------------------------------------------------------
+    def getFreeCells(self, excluded):
+        free = bytearray(self.cells.translate(FREE_TABLE))
+        for j in excluded:
+            free[j] = 0
+        return list(compress(range(len(free)), free))
+
+    #---------------------------------------------------------------------------
+    #      Method: reset
+    #
+    # Description: Covers every cell again and removes all flags, keeping the
+    #              mine layout, so the same board can be played again.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def reset(self):
+        if self.journal is not None:
+            self.logCells(COVER_TABLE)
+        self.cells[:] = self.cells.translate(COVER_TABLE)
+        self.adjacentFlags[:] = bytes(self.rows * self.cols)
+        self.flagCount = 0
+        self.state = PLAYING
+        self.unrevealedSafeCells = self.rows * self.cols - self.mineCount
+
+    #---------------------------------------------------------------------------
+    #      Method: logCells
+    #
+    # Description: Logs, in the journal, every cell that a translation of the
+    #              whole board (e.g., by REVEAL_TABLE) is about to change.
+    #
+    #      Inputs: table - The translation table.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def logCells(self, table):
+        cells = self.cells
+        adjacentMines = self.adjacentMines
+        self.journal.extend((i, cell, adjacentMines[i])
+                            for (i, cell) in enumerate(cells)
+                            if table[cell] != cell)
+
+    #---------------------------------------------------------------------------
+    #      Method: restoreCell
+    #
+    # Description: Sets a cell's state byte and adjacent mine count, keeping
+    #              the flag counts of its neighbors current. Used to undo and
+    #              redo changes (see 'history.py'); the board's own counters
+    #              are restored separately.
+    #
+    #      Inputs: index - Index of the cell of interest.
+    #              cell  - The state byte (MINE, REVEALED, and FLAGGED bits).
+    #              count - The adjacent mine count.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def restoreCell(self, index, cell, count):
+        change = (cell & FLAGGED) - (self.cells[index] & FLAGGED)
+        if change:
+            change //= FLAGGED
+            adjacentFlags = self.adjacentFlags
+            for d in self.neighborOffsets[self.edgeClasses[index]]:
+                adjacentFlags[index + d] += change
+        self.cells[index] = cell
+        self.adjacentMines[index] = count
+
+    #---------------------------------------------------------------------------
+    #      Method: getNeighbors
+    #
+    # Description: Lists the cells that share a side or corner with a cell.
+    #
+    #      Inputs: index - Index of the cell of interest.
+    #
+    #     Outputs: List of the indices of the neighboring cells.
+    #---------------------------------------------------------------------------
+    def getNeighbors(self, index):
+        offsets = self.neighborOffsets[self.edgeClasses[index]]
+        return [index + d for d in offsets]
+
+    #---------------------------------------------------------------------------
+    #      Method: getIndex
+    #
+    # Description: Given the row and column of a cell, returns the appropriate
+    #              index value for that cell.
+    #
+    #      Inputs: row - Row of the cell of interest.
+    #              col - Column of the cell of interest.
+    #
+    #     Outputs: The index value for the cell of interest.
+    #---------------------------------------------------------------------------
+    def getIndex(self, row, col):
+        return (row * self.cols) + col
+
+    #---------------------------------------------------------------------------
+    #      Method: getRowCol
+    #
+    # Description: Given the index value of a cell, returns the location (row
+    #              and column) of that cell in tuple form.
+    #
+    #      Inputs: index - Index value of the cell of interest.
+    #
+    #     Outputs: Tuple containing the row and column of the cell of interest.
+    #---------------------------------------------------------------------------
+    def getRowCol(self, index):
+        return (index // self.cols, index % self.cols)
+
+    #---------------------------------------------------------------------------
+    #      Method: getSeed
+    #
+    # Description: Provides the seed the mine layout was generated from.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: The seed, or None if the layout was given or came from a
+    #              caller's own source of randomness.
+    #---------------------------------------------------------------------------
+    def getSeed(self):
+        return self.seed
+
+    #---------------------------------------------------------------------------
+    #      Method: getCode
+    #
+    # Description: Provides the board code from which 'boardFromCode'
+    #              rebuilds this board's mine layout.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: The board code, or None if the board has no seed.
+    #---------------------------------------------------------------------------
+    def getCode(self):
+        if self.seed is None:
+            return None
+        return '%dx%d-%d-%x' % (self.rows, self.cols, self.mineCount,
+                                self.seed)
+
+#-------------------------------------------------------------------------------
+#    Function: getNeighborIndex
+#
+# Description: Builds the neighbor index shared by every board of a given
+#              size. Each cell belongs to one of 16 edge classes, depending on
+#              whether it is in the first or last row and the first or last
+#              column, and all cells of a class find their neighbors by adding
+#              the same index offsets. Counting, flood fills, and chords look
+#              neighbors up here instead of recomputing bounds each time.
+#
+#      Inputs: rows - Number of rows.
+#              cols - Number of columns.
+#
+#     Outputs: Tuple containing a bytearray of each cell's edge class and a
+#              tuple of 16 tuples of neighbor offsets, one per class.
+#-------------------------------------------------------------------------------
+@lru_cache(maxsize=16)
+def getNeighborIndex(rows, cols):
+    offsets = []
+    for edges in range(16):
+        (top, bottom, left, right) = (edges & 1, edges & 2, edges & 4,
+                                      edges & 8)
+        offsets.append(tuple(dRow * cols + dCol
+                             for dRow in (-1, 0, 1)
+                             for dCol in (-1, 0, 1)
+                             if (dRow, dCol) != (0, 0)
+                             and not (dRow < 0 and top)
+                             and not (dRow > 0 and bottom)
+                             and not (dCol < 0 and left)
+                             and not (dCol > 0 and right)))
+    rowClasses = [(row == 0) | (row == rows - 1) << 1 for row in range(rows)]
+    colClasses = [(col == 0) << 2 | (col == cols - 1) << 3
+                  for col in range(cols)]
+    edgeClasses = bytearray(rowClass | colClass for rowClass in rowClasses
+                            for colClass in colClasses)
+    return (edgeClasses, tuple(offsets))
+
+#-------------------------------------------------------------------------------
+#    Function: importNumpy
+#
+# Description: Imports NumPy the first time it is needed, so that importing
+#              the engine stays fast for code that never uses it.
+#
+#      Inputs: None.
+#
+#     Outputs: The numpy module, or None if it is not installed.
+#-------------------------------------------------------------------------------
+def importNumpy():
+    global numpy, numpyChecked
+    if not numpyChecked:
+        numpyChecked = True
+        try:
+            import numpy
+        except ImportError: # only the bulk generators need it
+            numpy = None
+    return numpy
+
+#-------------------------------------------------------------------------------
+#    Function: countAdjacentMines
+#
+# Description: Computes the adjacent mine count of every cell of one or more
+#              boards at once, by summing the 3x3 neighborhood of each cell
+#              over a zero-padded copy of the mine map. Requires NumPy.
+#
+#      Inputs: mines - Array of mine flags shaped (rows, cols) or
+#                      (boards, rows, cols).
+#
+#     Outputs: Array of the same shape holding each cell's adjacent mine count
+#              (0 for mine cells).
+#-------------------------------------------------------------------------------
+def countAdjacentMines(mines):
+    importNumpy()
+    mines = numpy.asarray(mines, dtype=numpy.uint8)
+    (rows, cols) = mines.shape[-2:]
+    padded = numpy.pad(mines, [(0, 0)] * (mines.ndim - 2) + [(1, 1), (1, 1)])
+    counts = numpy.zeros(mines.shape, dtype=numpy.uint8)
+    for r in range(3):
+        for c in range(3):
+            counts += padded[..., r:r + rows, c:c + cols]
+    counts[mines.astype(bool)] = 0
+    return counts
+
+#-------------------------------------------------------------------------------
+#    Function: generateBoards
+#
+# Description: Generates a batch of random boards with NumPy: one shuffle per
+#              board places the mines, and 'countAdjacentMines' computes every
+#              count. Raises ImportError if NumPy is not installed.
+#
+#      Inputs: rows      - Number of rows.
+#              cols      - Number of columns.
+#              mineCount - Number of mines on each board.
+#              count     - Number of boards to generate.
+#              seed      - Seed or numpy.random.Generator (optional).
+#
+#     Outputs: Tuple of two (count, rows, cols) arrays: the mine flags and the
+#              adjacent mine counts.
+#-------------------------------------------------------------------------------
+def generateBoards(rows, cols, mineCount, count=1, seed=None):
+    if importNumpy() is None:
+        raise ImportError('NumPy is required to generate boards in bulk')
+    generator = numpy.random.default_rng(seed)
+    layout = numpy.zeros((count, rows * cols), dtype=bool)
+    layout[:, :mineCount] = True
+    mines = generator.permuted(layout, axis=1).reshape(count, rows, cols)
+    return (mines, countAdjacentMines(mines))
+
+#-------------------------------------------------------------------------------
+#    Function: parseBoardCode
+#
+# Description: Reads a board code (see 'MinesweeperBoard.getCode').
+#
+#      Inputs: code - The board code, e.g. '16x30-72-9f3a1c2b'.
+#
+#     Outputs: Tuple containing the number of rows, columns, and mines, and
+#              the seed. Raises ValueError if the code is malformed.
+#-------------------------------------------------------------------------------
+def parseBoardCode(code):
+    try:
+        (size, mineCount, seed) = code.strip().lower().split('-')
+        (rows, cols) = size.split('x')
+        (rows, cols, mineCount, seed) = (int(rows), int(cols), int(mineCount),
+                                         int(seed, 16))
+    except ValueError:
+        raise ValueError('invalid board code: %r' % code)
+    if rows < 1 or cols < 1 or not 0 <= mineCount <= rows * cols or seed < 0:
+        raise ValueError('invalid board code: %r' % code)
+    return (rows, cols, mineCount, seed)
+
+#-------------------------------------------------------------------------------
+#    Function: boardFromCode
+#
+# Description: Rebuilds a board from its board code.
+#
+#      Inputs: code     - The board code.
+#              useNumpy - If 'True', counts are computed with NumPy (see
+#                         'MinesweeperBoard').
+#
+#     Outputs: The MinesweeperBoard, with every cell covered.
+#-------------------------------------------------------------------------------
+def boardFromCode(code, useNumpy=False):
+    (rows, cols, mineCount, seed) = parseBoardCode(code)
+    return MinesweeperBoard(rows, cols, useNumpy=useNumpy, seed=seed,
+                            mineCount=mineCount)
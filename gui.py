@@ -0,0 +1,1740 @@
+#!/usr/bin/python
+
+#-------------------------------------------------------------------------------
+#    Filename: gui.py
+#
+#      Author: David C. Drake (https://davidcdrake.com)
+#
+# Description: The GTK user interface of the Minesweeper game, developed using
+#              Python and PyGObject (originally PyGTK). Game state lives in the
+#              headless engine (see 'engine.py'); the classes here only display
+#              it. This module loads GTK when it is imported, so it is only
+#              imported once the GUI is launched (see 'minesweeper.py').
+#
+#     Classes: Minesweeper, MinesweeperTable, MinesweeperCanvas,
+#              MinesweeperCell, MinesweeperButton, MinesweeperLabel,
+#              MinesweeperImage
+#-------------------------------------------------------------------------------
+
+import gi
+gi.require_version('Gtk', '3.0')
+from gi.repository import Gtk, Gdk, GdkPixbuf, GLib
+import threading
+import time
+
+import instrument
+from engine import SMALL, MEDIUM, LARGE, ROW_COL_VALUES, MINE_RATIO, \
+                   MinesweeperBoard, boardFromCode
+from history import BoardHistory
+from solver import MinesweeperSolver
+from noguess import MinesweeperBoardPool
+
+SIZE_DESCRIPTIONS = ["Small (10 x 10)", "Medium (15 x 15)", "Large (20 x 20)"]
+CELL_SIZE = 30 # pixels
+PADDING = 2 # pixels
+MAX_WINDOW_SIZE = (800, 600) # pixels; larger canvas boards scroll
+NUMBER_COLORS = [(0.0, 0.0, 1.0), (0.0, 0.5, 0.0), (1.0, 0.0, 0.0),
+                 (0.0, 0.0, 0.5), (0.5, 0.0, 0.0), (0.0, 0.5, 0.5),
+                 (0.0, 0.0, 0.0), (0.5, 0.5, 0.5)]
+FLAG_IMAGE = 'images/flag.png'
+MINE_IMAGE = 'images/mine.png'
+
+#-------------------------------------------------------------------------------
+#       Class: Minesweeper
+#
+# Description: Manages a Minesweeper game.
+#
+#     Methods: __init__, createWindow, createMenu, addMenuItem, createTable,
+#              getNextBoard, generateBoard, prepareNextBoard,
+#              nextBoardReady, startGame, run, deleteHandler, destroyHandler,
+#              resizeHandler, restartHandler, restart, undoHandler,
+#              solveHandler, hintHandler, clickedHandler, playerHasLost,
+#              playerHasWon, displayMessage, askUndo
+#-------------------------------------------------------------------------------
+class Minesweeper():
+    #---------------------------------------------------------------------------
+    #      Method: __init__
+    #
+    # Description: Creates a window, box, menu, and table to serve as the GUI
+    #              and manage game data.
+    #
+    #      Inputs: size      - A value indicating the size of the game board.
+    #              useCanvas - If 'True', the board is drawn on a single
+    #                          MinesweeperCanvas instead of a table of buttons.
+    #              rows      - Number of rows, overriding 'size' (optional).
+    #              cols      - Number of columns, overriding 'size' (optional).
+    #              noGuess   - If 'True', every board can be solved from its
+    #                          first click without guessing; boards come from
+    #                          a MinesweeperBoardPool and their first click is
+    #                          made automatically.
+    #              boardCode - Board code of the first game's board
+    #                          (optional; see 'engine.boardFromCode').
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def __init__(self, size, useCanvas=False, rows=None, cols=None,
+                 noGuess=False, boardCode=None):
+        self.size = size
+        self.useCanvas = useCanvas
+        self.pool = MinesweeperBoardPool() if noGuess else None
+        self.nextBoard = None # ((rows, cols), (board, start)) made in advance
+        self.preparing = False
+        self.history = None # BoardHistory of the current game
+        (self.rows, self.cols) = ROW_COL_VALUES[self.size]
+        if rows and cols:
+            (self.rows, self.cols) = (rows, cols)
+        if boardCode is not None:
+            board = boardFromCode(boardCode, useNumpy=True)
+            (self.rows, self.cols) = (board.rows, board.cols)
+        self.createWindow(min(self.cols * CELL_SIZE, MAX_WINDOW_SIZE[0]),
+                          min(self.rows * CELL_SIZE, MAX_WINDOW_SIZE[1]))
+        self.createMenu()
+        if boardCode is None:
+            (board, start) = self.getNextBoard()
+        else:
+            start = None
+            self.prepareNextBoard()
+        self.createTable(self.rows, self.cols, board)
+        self.window.show_all()
+        self.startGame(start)
+        self.lastRestartTime = 0.0
+
+    #---------------------------------------------------------------------------
+    #      Method: createWindow
+    #
+    # Description: Creates a window (with a box) to serve as the GUI.
+    #
+    #      Inputs: width  - Width of the window, in pixels.
+    #              height - Height of the window, in pixels.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def createWindow(self, width, height):
+        self.window = Gtk.Window()
+        self.window.set_default_size(width, height)
+        self.window.set_resizable(False)
+        self.window.set_title('Minesweeper')
+        self.window.connect('destroy', self.destroyHandler)
+        self.window.connect('delete_event', self.deleteHandler)
+        self.box = Gtk.Box()
+        self.window.add(self.box)
+
+    #---------------------------------------------------------------------------
+    #      Method: createMenu
+    #
+    # Description: Creates a menu and adds it to the window's box.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def createMenu(self):
+        self.menu = Gtk.Menu()
+        self.accelGroup = Gtk.AccelGroup()
+        self.window.add_accel_group(self.accelGroup)
+        self.addMenuItem('New Game', self.restartHandler)
+        self.addMenuItem('Undo', self.undoHandler, '<Control>z')
+        self.addMenuItem('Resize', self.resizeHandler)
+        self.addMenuItem('Solve', self.solveHandler)
+        self.addMenuItem('Hint', self.hintHandler)
+        self.addMenuItem('Quit', self.destroyHandler)
+        self.root_menu = Gtk.MenuItem(label='Game')
+        self.root_menu.set_submenu(self.menu)
+        self.menubar = Gtk.MenuBar()
+        self.menubar.add(self.root_menu)
+        self.box.add(self.menubar)
+
+    #---------------------------------------------------------------------------
+    #      Method: addMenuItem
+    #
+    # Description: Creates a menu item and adds it to the menu.
+    #
+    #      Inputs: title       - Title for the menu item.
+    #              handler     - Function to be called when the item is
+    #                            selected.
+    #              accelerator - Keyboard shortcut, such as '<Control>z'
+    #                            (optional).
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def addMenuItem(self, title, handler, accelerator=None):
+        item = Gtk.MenuItem(label=title)
+        item.connect('activate', handler)
+        if accelerator is not None:
+            (key, modifiers) = Gtk.accelerator_parse(accelerator)
+            item.add_accelerator('activate', self.accelGroup, key, modifiers,
+                                 Gtk.AccelFlags.VISIBLE)
+        self.menu.add(item)
+
+    #---------------------------------------------------------------------------
+    #      Method: createTable
+    #
+    # Description: Creates a table, complete with cells and buttons, to store
+    #              and manage game board data. In canvas mode, a scrollable
+    #              MinesweeperCanvas is created instead.
+    #
+    #      Inputs: rows  - Number of rows.
+    #              cols  - Number of columns.
+    #              board - The MinesweeperBoard to display (optional; a
+    #                      random board is created if none is given).
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def createTable(self, rows, cols, board=None):
+        if self.useCanvas:
+            self.table = MinesweeperCanvas(rows, cols, board=board)
+            self.table.connect('button_release_event', self.clickedHandler)
+            self.view = Gtk.ScrolledWindow()
+            self.view.add(self.table)
+        else:
+            self.table = MinesweeperTable(rows, cols, board=board)
+            self.table.connectClicks(self.clickedHandler)
+            self.view = self.table
+        self.box.pack_start(self.view, True, True, PADDING)
+
+    #---------------------------------------------------------------------------
+    #      Method: getNextBoard
+    #
+    # Description: Provides the board for the next game: the one prepared in
+    #              the background if it is ready and the right size, otherwise
+    #              a new one generated at once. Either way, preparation of the
+    #              following board is started.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: Tuple containing the MinesweeperBoard and the (row, col) of
+    #              its automatic first click (or None).
+    #---------------------------------------------------------------------------
+    def getNextBoard(self):
+        key = (self.rows, self.cols)
+        if self.nextBoard is not None and self.nextBoard[0] == key:
+            item = self.nextBoard[1]
+        else:
+            item = self.generateBoard(*key)
+        self.nextBoard = None
+        self.prepareNextBoard()
+        return item
+
+    #---------------------------------------------------------------------------
+    #      Method: generateBoard
+    #
+    # Description: Generates a board. In no-guess mode it is taken from the
+    #              board pool, unless none can be found for the size. Safe
+    #              to call from a worker thread, since no GTK objects are
+    #              touched.
+    #
+    #      Inputs: rows - Number of rows.
+    #              cols - Number of columns.
+    #
+    #     Outputs: Tuple containing the MinesweeperBoard and the (row, col) of
+    #              its automatic first click (or None).
+    #---------------------------------------------------------------------------
+    def generateBoard(self, rows, cols):
+        if self.pool is not None:
+            try:
+                return self.pool.get(rows, cols)
+            except ValueError:
+                pass # no no-guess board of this size was found
+        return (MinesweeperBoard(rows, cols, MINE_RATIO, useNumpy=True), None)
+
+    #---------------------------------------------------------------------------
+    #      Method: prepareNextBoard
+    #
+    # Description: Starts generating the next game's board on a worker thread,
+    #              unless that is already under way. The board is handed back
+    #              to the main loop via 'GLib.idle_add' (see 'nextBoardReady').
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def prepareNextBoard(self):
+        if self.preparing:
+            return
+        self.preparing = True
+        key = (self.rows, self.cols)
+
+        def work():
+            start = time.perf_counter()
+            item = self.generateBoard(*key)
+            instrument.record('restart.prepare', time.perf_counter() - start)
+            GLib.idle_add(self.nextBoardReady, key, item)
+
+        threading.Thread(target=work, daemon=True).start()
+
+    #---------------------------------------------------------------------------
+    #      Method: nextBoardReady
+    #
+    # Description: Receives a board prepared by 'prepareNextBoard' on the main
+    #              loop. If the board size has changed in the meantime, the
+    #              board is discarded and another one is prepared.
+    #
+    #      Inputs: key  - (rows, cols) the board was made for.
+    #              item - Tuple containing the board and its first click.
+    #
+    #     Outputs: Returns 'False' so that the idle callback is removed.
+    #---------------------------------------------------------------------------
+    def nextBoardReady(self, key, item):
+        self.preparing = False
+        if key == (self.rows, self.cols):
+            self.nextBoard = (key, item)
+        else:
+            self.prepareNextBoard()
+        return False
+
+    #---------------------------------------------------------------------------
+    #      Method: startGame
+    #
+    # Description: Shows a new game's board code in the window's title, makes
+    #              its automatic first click, if it has one, and starts its
+    #              undo history.
+    #
+    #      Inputs: start - (row, col) of the first click, or None.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def startGame(self, start):
+        code = self.table.getBoard().getCode()
+        self.window.set_title('Minesweeper' if code is None else
+                              'Minesweeper (%s)' % code)
+        if start is not None:
+            self.table.clickCell(*start)
+        self.history = BoardHistory(self.table.getBoard())
+
+    #---------------------------------------------------------------------------
+    #      Method: run
+    #
+    # Description: Runs the Minesweeper game via 'Gtk.main()'.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def run(self):
+        Gtk.main()
+
+    #---------------------------------------------------------------------------
+    #      Method: deleteHandler
+    #
+    # Description: Handler for 'delete' events. Ends the game.
+    #
+    #      Inputs: widget - The widget object that sent the signal (the window's
+    #                       'X' button in this case).
+    #              event  - The event object.
+    #              data   - Additional event data.
+    #
+    #     Outputs: Returns 'False'.
+    #---------------------------------------------------------------------------
+    def deleteHandler(self, widget, event, data=None):
+        return False
+
+    #---------------------------------------------------------------------------
+    #      Method: destroyHandler
+    #
+    # Description: Handler for 'destroy' signals. Ends the game.
+    #
+    #      Inputs: widget - The widget object that sent the signal (a menu item
+    #                       or the window's 'X' button).
+    #              data   - Additional signal data.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def destroyHandler(self, widget, data=None):
+        if self.pool is not None:
+            self.pool.stop()
+        Gtk.main_quit()
+
+    #---------------------------------------------------------------------------
+    #      Method: resizeHandler
+    #
+    # Description: Handler for 'resize' signals. Allows the player to choose
+    #              among three different size options. Starts a new game if a
+    #              new size is selected.
+    #
+    #      Inputs: widget - The widget object that sent the signal (a menu item
+    #                       in this case).
+    #              data   - Additional signal data.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def resizeHandler(self, widget, data=None):
+        label = Gtk.Label('Choose a new size:')
+        dialog = Gtk.Dialog('Resize', None, Gtk.DialogFlags.MODAL |
+                            Gtk.DialogFlags.DESTROY_WITH_PARENT,
+                            (SIZE_DESCRIPTIONS[SMALL], SMALL,
+                             SIZE_DESCRIPTIONS[MEDIUM], MEDIUM,
+                             SIZE_DESCRIPTIONS[LARGE], LARGE,
+                             Gtk.ButtonsType.CANCEL, Gtk.ResponseType.REJECT))
+        dialog.box.pack_start(label, True, True, PADDING)
+        label.show()
+        response = dialog.run()
+        dialog.destroy()
+        if (response == SMALL or response == MEDIUM or response == LARGE) and \
+           response != self.size:
+            self.size = response
+            (self.rows, self.cols) = ROW_COL_VALUES[self.size]
+            self.restart()
+
+    #---------------------------------------------------------------------------
+    #      Method: restartHandler
+    #
+    # Description: Handler for 'restart' signals. Starts a new game.
+    #
+    #      Inputs: widget - The widget object that sent the signal (a menu item
+    #                       in this case).
+    #              data   - Additional signal data.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def restartHandler(self, widget, data=None):
+        self.restart()
+
+    #---------------------------------------------------------------------------
+    #      Method: restart
+    #
+    # Description: Starts a new game, on a board prepared in the background
+    #              if one is ready. If the board size hasn't changed, the
+    #              existing table is reset in place; otherwise a new table is
+    #              created. The time taken is stored in 'lastRestartTime'.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def restart(self):
+        start = time.perf_counter()
+        (board, firstClick) = self.getNextBoard()
+        if (self.table.rows, self.table.cols) == (self.rows, self.cols):
+            self.table.reset(board)
+        else:
+            self.box.remove(self.view)
+            self.createTable(self.rows, self.cols, board)
+            self.window.show_all()
+        self.startGame(firstClick)
+        self.lastRestartTime = time.perf_counter() - start
+        instrument.record('restart', self.lastRestartTime)
+
+    #---------------------------------------------------------------------------
+    #      Method: undoHandler
+    #
+    # Description: Handler for 'undo' signals. Takes back the last move (a
+    #              click, chord, flag, or solve), updating only the cells it
+    #              changed. Moves can be undone back to the start of the game.
+    #
+    #      Inputs: widget - The widget object that sent the signal (a menu item
+    #                       in this case).
+    #              data   - Additional signal data.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def undoHandler(self, widget, data=None):
+        changed = self.history.undo()
+        if changed is not None:
+            self.table.clearHints()
+            self.table.restoreCells(changed)
+
+    #---------------------------------------------------------------------------
+    #      Method: solveHandler
+    #
+    # Description: Handler for 'solve' signals. Lets a MinesweeperSolver play
+    #              the current game, flagging every mine it can deduce and
+    #              revealing every cell it can prove safe, until the game is won
+    #              or the next move would be a guess.
+    #
+    #      Inputs: widget - The widget object that sent the signal (a menu item
+    #                       in this case).
+    #              data   - Additional signal data.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def solveHandler(self, widget, data=None):
+        solver = MinesweeperSolver(self.table.getBoard())
+        self.table.updateCells(solver.solve())
+        self.table.restoreCells(solver.moved)
+        lost = self.playerHasLost()
+        self.history.commit()
+        if lost or self.playerHasWon():
+            self.restart()
+
+    #---------------------------------------------------------------------------
+    #      Method: hintHandler
+    #
+    # Description: Handler for 'hint' signals. Shows, on every covered cell,
+    #              the probability that it hides a mine (exact unless part of
+    #              the frontier is too large to enumerate quickly; see
+    #              'MinesweeperSolver.getMineProbabilities'). The hints are
+    #              cleared by the next click.
+    #
+    #      Inputs: widget - The widget object that sent the signal (a menu item
+    #                       in this case).
+    #              data   - Additional signal data.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def hintHandler(self, widget, data=None):
+        solver = MinesweeperSolver(self.table.getBoard())
+        self.table.showHints(solver.getMineProbabilities())
+
+    #---------------------------------------------------------------------------
+    #      Method: clickedHandler
+    #
+    # Description: Handler for 'click' signals.
+    #
+    #      Inputs: widget - The widget object that sent the signal (a button or
+    #                       the canvas).
+    #              data   - Additional signal data.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def clickedHandler(self, widget, data=None):
+        t = instrument.start()
+        (row, col) = self.table.getRowColOfEvent(widget, data)
+        if row < 0:
+            return
+        self.table.clearHints()
+        t = instrument.lap('click.lookup', t)
+        board = self.table.getBoard()
+        if data.button in (1, 2) and \
+           board.isRevealed(board.getIndex(row, col)): # chord on a number
+            self.table.chordCell(row, col)
+            t = instrument.lap('click.chord', t)
+            if self.playerHasLost():
+                self.restart()
+                return
+        elif data.button == 1: # left-click
+            self.table.clickCell(row, col)
+            t = instrument.lap('click.reveal', t)
+            if self.playerHasLost():
+                self.restart()
+                return
+            t = instrument.lap('click.lossCheck', t)
+        elif data.button == 3: # right-click
+            self.table.toggleFlag(row, col)
+            t = instrument.lap('click.flag', t)
+        self.history.commit()
+        if self.playerHasWon():
+            self.restart()
+        else:
+            instrument.lap('click.winCheck', t)
+
+    #---------------------------------------------------------------------------
+    #      Method: playerHasLost
+    #
+    # Description: Determines whether the player has lost the game. If so, a
+    #              message is displayed, offering to take back the losing move
+    #              (which has not been committed to the history yet).
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: Returns 'True' (and displays a dialog box) if the player has
+    #              lost the game, otherwise returns 'False'.
+    #---------------------------------------------------------------------------
+    def playerHasLost(self):
+        if not self.table.getBoard().hasLost():
+            return False
+        self.table.revealAllCells()
+        if self.askUndo('Sorry, you landed on a mine. Try again!',
+                        'Game over!'):
+            self.table.restoreCells(self.history.rollback())
+            return False
+        return True
+
+    #---------------------------------------------------------------------------
+    #      Method: playerHasWon
+    #
+    # Description: Determines whether the player has won the game. If so, a
+    #              message is displayed.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: Returns 'True' (and displays a dialog box) if every non-mine
+    #              cell has been revealed, otherwise returns 'False'.
+    #---------------------------------------------------------------------------
+    def playerHasWon(self):
+        if not self.table.getBoard().hasWon():
+            return False
+        self.displayMessage('Congratulations, you won!', 'Victory!')
+        return True
+
+    #---------------------------------------------------------------------------
+    #      Method: displayMessage
+    #
+    # Description: Displays a message as a dialog box with an 'OK' button.
+    #
+    #      Inputs: message - The string to display within the dialog box.
+    #              title   - The string to display along the top of the dialog
+    #                        box (optional).
+    #
+    #     Outputs: None, but a dialog box will appear.
+    #---------------------------------------------------------------------------
+    def displayMessage(self, message, title=""):
+        label = Gtk.Label(' ' + message + ' ')
+        dialog = Gtk.Dialog(title, None, Gtk.DialogFlags.MODAL |
+                            Gtk.DialogFlags.DESTROY_WITH_PARENT,
+                            (Gtk.ButtonsType.OK, Gtk.ResponseType.ACCEPT))
+        dialog.box.pack_start(label, True, True, PADDING)
+        label.show()
+        dialog.run()
+        dialog.destroy()
+
+    #---------------------------------------------------------------------------
+    #      Method: askUndo
+    #
+    # Description: Displays a message as a dialog box with 'Undo' and 'New
+    #              Game' buttons.
+    #
+    #      Inputs: message - The string to display within the dialog box.
+    #              title   - The string to display along the top of the dialog
+    #                        box (optional).
+    #
+    #     Outputs: 'True' if the player chose to undo, otherwise 'False'.
+    #---------------------------------------------------------------------------
+    def askUndo(self, message, title=""):
+        label = Gtk.Label(' ' + message + ' ')
+        dialog = Gtk.Dialog(title, None, Gtk.DialogFlags.MODAL |
+                            Gtk.DialogFlags.DESTROY_WITH_PARENT,
+                            ('Undo', Gtk.ResponseType.REJECT,
+                             'New Game', Gtk.ResponseType.ACCEPT))
+        dialog.box.pack_start(label, True, True, PADDING)
+        label.show()
+        response = dialog.run()
+        dialog.destroy()
+        return response == Gtk.ResponseType.REJECT
+
+#-------------------------------------------------------------------------------
+#       Class: MinesweeperTable
+#
+# Description: A table that displays a Minesweeper board (a MinesweeperBoard
+#              from the engine) and manages all its cells and buttons.
+#
+#     Methods: __init__, reset, placeMines, placeLabels, attachContent,
+#              updateContent, connectClicks, getBoard, getCells,
+#              getAdjacentMineCount, clickCell, chordCell, revealCell,
+#              revealAllCells, toggleFlag, updateCells, restoreCells,
+#              showHints, clearHints, getIndex, getRowCol, getRowColOfButton,
+#              getRowColOfEvent
+#-------------------------------------------------------------------------------
+class MinesweeperTable(Gtk.Table):
+    #---------------------------------------------------------------------------
+    #      Method: __init__
+    #
+    # Description: Creates a new game board, then populates the table with
+    #              cells, buttons, mine images, and labels for the non-mine
+    #              cells surrounding each mine.
+    #
+    #      Inputs: rows      - Number of rows.
+    #              cols      - Number of columns.
+    #              mineRatio - Ratio of mines vs. empty cells.
+    #              homo      - If 'True', all table cells will be the same
+    #                          size as the largest cell.
+    #              board     - The MinesweeperBoard to display (optional; a
+    #                          random board is created if none is given).
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def __init__(self, rows, cols, mineRatio=MINE_RATIO, homo=True,
+                 board=None):
+        Gtk.Table.__init__(self, n_rows=rows, n_columns=cols, homogeneous=homo)
+        self.rows = rows
+        self.cols = cols
+        self.mineRatio = mineRatio
+        if board is None:
+            board = MinesweeperBoard(rows, cols, mineRatio, useNumpy=True)
+        self.board = board
+        self.cells = []
+        self.contents = {} # cell index -> mine image or label
+        self.hints = []
+        self.clickHandler = None
+        for row in range(rows):
+            for col in range(cols):
+                cell = MinesweeperCell(self.board, self.getIndex(row, col))
+                self.cells.append(cell)
+                self.attach(cell.getButton(), col, col + 1, row, row + 1)
+        self.placeMines()
+        self.placeLabels()
+
+    #---------------------------------------------------------------------------
+    #      Method: reset
+    #
+    # Description: Starts a new game on the same table without rebuilding it:
+    #              every button is shown again and unflagged, and only the mine
+    #              images and labels that differ from the new board's are
+    #              replaced.
+    #
+    #      Inputs: board - The new MinesweeperBoard (optional; a random board
+    #                      is created if none is given).
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def reset(self, board=None):
+        if board is None:
+            board = MinesweeperBoard(self.rows, self.cols, self.mineRatio,
+                                     useNumpy=True)
+        self.board = board
+        self.clearHints()
+        for cell in self.cells:
+            cell.reset(board)
+            self.updateContent(cell.index)
+
+    #---------------------------------------------------------------------------
+    #      Method: placeMines
+    #
+    # Description: Attaches mine images to the table wherever the board has a
+    #              mine.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def placeMines(self):
+        for i in range(self.rows * self.cols):
+            if self.board.containsMine(i):
+                self.attachContent(i, MinesweeperImage(MINE_IMAGE))
+
+    #---------------------------------------------------------------------------
+    #      Method: placeLabels
+    #
+    # Description: For each cell location on the board, if it has at least one
+    #              mine next to it, the number of mines next to it is added to
+    #              the table as a MinesweeperLabel, hidden until the cell is
+    #              revealed, so that clicking it can play a chord.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def placeLabels(self):
+        for i in range(self.rows * self.cols):
+            if not self.board.containsMine(i):
+                n = self.board.getAdjacentMines(i)
+                if n > 0:
+                    label = MinesweeperLabel(i, str(n))
+                    if self.clickHandler is not None:
+                        label.connect('button_release_event',
+                                      self.clickHandler)
+                    self.attachContent(i, label)
+
+    #---------------------------------------------------------------------------
+    #      Method: attachContent
+    #
+    # Description: Attaches a mine image or label beneath a cell's button and
+    #              remembers it, so it can be updated later.
+    #
+    #      Inputs: index  - Index of the cell.
+    #              widget - The image or label to attach.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def attachContent(self, index, widget):
+        (row, col) = self.getRowCol(index)
+        self.attach(widget, col, col + 1, row, row + 1)
+        self.contents[index] = widget
+
+    #---------------------------------------------------------------------------
+    #      Method: updateContent
+    #
+    # Description: Makes the mine image or label beneath a cell's button match
+    #              the board, touching the table only if something differs.
+    #              Labels are kept hidden while their cell is covered, so that
+    #              their event boxes never take clicks meant for the button.
+    #
+    #      Inputs: index - Index of the cell.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def updateContent(self, index):
+        content = self.contents.get(index)
+        n = self.board.getAdjacentMines(index)
+        if self.board.containsMine(index):
+            if isinstance(content, MinesweeperImage):
+                return
+            widget = MinesweeperImage(MINE_IMAGE)
+        elif n > 0:
+            if isinstance(content, MinesweeperLabel):
+                if content.get_label() != str(n):
+                    content.set_label(str(n))
+                content.set_visible(self.board.isRevealed(index))
+                return
+            widget = MinesweeperLabel(index, str(n))
+            if self.clickHandler is not None:
+                widget.connect('button_release_event', self.clickHandler)
+        elif content is None:
+            return
+        else:
+            widget = None
+        if content is not None:
+            self.remove(content)
+            del self.contents[index]
+        if widget is not None:
+            self.attachContent(index, widget)
+            widget.set_visible(self.board.isRevealed(index) or
+                               not isinstance(widget, MinesweeperLabel))
+
+    #---------------------------------------------------------------------------
+    #      Method: connectClicks
+    #
+    # Description: Connects a handler to clicks on every button and number
+    #              label, including labels created later.
+    #
+    #      Inputs: handler - Function to be called on 'button_release_event'.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def connectClicks(self, handler):
+        self.clickHandler = handler
+        for cell in self.cells:
+            cell.getButton().connect('button_release_event', handler)
+        for content in self.contents.values():
+            if isinstance(content, MinesweeperLabel):
+                content.connect('button_release_event', handler)
+
+    #---------------------------------------------------------------------------
+    #      Method: getBoard
+    #
+    # Description: Provides access to the game board displayed by this table.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: The MinesweeperBoard object.
+    #---------------------------------------------------------------------------
+    def getBoard(self):
+        return self.board
+
+    #---------------------------------------------------------------------------
+    #      Method: getCells
+    #
+    # Description: Provides access to the MinesweeperTable's list of cells.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: The cell list.
+    #---------------------------------------------------------------------------
+    def getCells(self):
+        return self.cells
+
+    #---------------------------------------------------------------------------
+    #      Method: getAdjacentMineCount
+    #
+    # Description: Given a cell location, determines how many mines are adjacent
+    #              to that cell (i.e., how many mine-containing cells share a
+    #              side or corner with that cell) and returns that number.
+    #
+    #      Inputs: row - Row of the cell of interest.
+    #              col - Column of the cell of interest.
+    #
+    #     Outputs: The number of mines surrounding the cell of interest.
+    #---------------------------------------------------------------------------
+    def getAdjacentMineCount(self, row, col):
+        return self.board.getAdjacentMineCount(row, col)
+
+    #---------------------------------------------------------------------------
+    #      Method: clickCell
+    #
+    # Description: Plays a left-click on the board and hides the buttons of the
+    #              cells it revealed. The first click of a game never hits a
+    #              mine: any mines around it are moved away first (see
+    #              'MinesweeperBoard.openCell'), and only the mine images and
+    #              labels of the cells that changed are replaced.
+    #
+    #      Inputs: row - Row of the clicked cell.
+    #              col - Column of the clicked cell.
+    #
+    #     Outputs: List of the indices of the cells the click revealed.
+    #---------------------------------------------------------------------------
+    def clickCell(self, row, col):
+        (moved, changed) = self.board.openCell(row, col)
+        for i in set(moved):
+            self.updateContent(i)
+        self.updateCells(changed)
+        return changed
+
+    #---------------------------------------------------------------------------
+    #      Method: chordCell
+    #
+    # Description: Plays a chord on a revealed number (see
+    #              'MinesweeperBoard.chordCell') and updates the cells it
+    #              revealed.
+    #
+    #      Inputs: row - Row of the clicked cell.
+    #              col - Column of the clicked cell.
+    #
+    #     Outputs: List of the indices of the newly revealed cells.
+    #---------------------------------------------------------------------------
+    def chordCell(self, row, col):
+        changed = self.board.chordCell(row, col)
+        self.updateCells(changed)
+        return changed
+
+    #---------------------------------------------------------------------------
+    #      Method: revealCell
+    #
+    # Description: Reveals the cell at a given location and, if it's empty
+    #              (i.e., it bears neither mine nor label), also reveals all
+    #              nearby cells that don't contain a mine.
+    #
+    #      Inputs: row - Row of the cell to reveal.
+    #              col - Column of the cell to reveal.
+    #
+    #     Outputs: List of the indices of the newly revealed cells.
+    #---------------------------------------------------------------------------
+    def revealCell(self, row, col):
+        changed = self.board.revealCell(row, col)
+        self.updateCells(changed)
+        return changed
+
+    #---------------------------------------------------------------------------
+    #      Method: revealAllCells
+    #
+    # Description: Reveals every cell (by hiding all buttons).
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def revealAllCells(self):
+        t = instrument.start()
+        self.board.revealAllCells()
+        for cell in self.cells:
+            cell.reveal()
+        for content in self.contents.values():
+            content.show()
+        instrument.lap('revealAllCells', t)
+
+    #---------------------------------------------------------------------------
+    #      Method: toggleFlag
+    #
+    # Description: Flags or unflags a cell on the board and shows or hides the
+    #              flag image on its button.
+    #
+    #      Inputs: row - Row of the cell of interest.
+    #              col - Column of the cell of interest.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def toggleFlag(self, row, col):
+        self.board.toggleFlag(row, col)
+        self.updateCells([self.getIndex(row, col)])
+
+    #---------------------------------------------------------------------------
+    #      Method: updateCells
+    #
+    # Description: Brings the buttons of the given cells up to date with the
+    #              board, hiding those of revealed cells (and showing their
+    #              labels) and showing or hiding flags.
+    #
+    #      Inputs: indices - Indices of the cells that changed.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def updateCells(self, indices):
+        for i in indices:
+            cell = self.cells[i]
+            if cell.isRevealed():
+                cell.reveal()
+                content = self.contents.get(i)
+                if isinstance(content, MinesweeperLabel):
+                    content.show()
+            elif cell.isFlagged() != self.board.isFlagged(i):
+                cell.getButton().toggleFlag()
+
+    #---------------------------------------------------------------------------
+    #      Method: restoreCells
+    #
+    # Description: Brings the given cells fully up to date with the board
+    #              after an undo, which may cover cells again or move mines,
+    #              or after a solver's safe first click moved mines: buttons,
+    #              flags, labels, and mine images are all checked.
+    #
+    #      Inputs: indices - Indices of the cells that changed (repeats are
+    #                        allowed).
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def restoreCells(self, indices):
+        for i in set(indices):
+            self.updateContent(i)
+            cell = self.cells[i]
+            cell.getButton().set_visible(not cell.isRevealed())
+            if cell.isFlagged() != self.board.isFlagged(i):
+                cell.getButton().toggleFlag()
+
+    #---------------------------------------------------------------------------
+    #      Method: showHints
+    #
+    # Description: Writes each covered cell's mine probability, as a
+    #              percentage, on its button.
+    #
+    #      Inputs: probabilities - Dictionary mapping cell indices to mine
+    #                              probabilities.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def showHints(self, probabilities):
+        self.clearHints()
+        for (i, p) in probabilities.items():
+            button = self.cells[i].getButton()
+            button.set_label('%d' % round(p * 100))
+            button.set_tooltip_text('%.1f%% chance of a mine' % (p * 100))
+            self.hints.append(i)
+
+    #---------------------------------------------------------------------------
+    #      Method: clearHints
+    #
+    # Description: Removes any hints written on the buttons.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def clearHints(self):
+        for i in self.hints:
+            button = self.cells[i].getButton()
+            button.set_label('')
+            button.set_tooltip_text(None)
+        self.hints = []
+
+    #---------------------------------------------------------------------------
+    #      Method: getIndex
+    #
+    # Description: Given the row and column of a cell, returns the appropriate
+    #              index value for that cell (i.e., the index value for that
+    #              cell within the MinesweeperTable's list of cells).
+    #
+    #      Inputs: row - Row of the cell of interest.
+    #              col - Column of the cell of interest.
+    #
+    #     Outputs: The 'cells' list index value for the cell of interest.
+    #---------------------------------------------------------------------------
+    def getIndex(self, row, col):
+        return self.board.getIndex(row, col)
+
+    #---------------------------------------------------------------------------
+    #      Method: getRowCol
+    #
+    # Description: Given the cell list index value of a cell, returns the
+    #              location (row and column) of that cell in tuple form.
+    #
+    #      Inputs: index - List index value of the cell of interest.
+    #
+    #     Outputs: Tuple containing the row and column of the cell of interest.
+    #---------------------------------------------------------------------------
+    def getRowCol(self, index):
+        return self.board.getRowCol(index)
+
+    #---------------------------------------------------------------------------
+    #      Method: getRowColOfButton
+    #
+    # Description: Given a MinesweeperButton object, returns the location (row
+    #              and column) of that button in tuple form. Each button knows
+    #              its own cell index, so no search is needed.
+    #
+    #      Inputs: button - The button object of interest.
+    #
+    #     Outputs: Tuple containing the row and column of the button of interest
+    #              or (-1, -1) if the button's not found.
+    #---------------------------------------------------------------------------
+    def getRowColOfButton(self, button):
+        i = button.getIndex()
+        if 0 <= i < len(self.cells) and (self.cells[i].getButton() is button
+                                         or self.contents.get(i) is button):
+            return self.getRowCol(i)
+        return (-1, -1) # button wasn't found
+
+    #---------------------------------------------------------------------------
+    #      Method: getRowColOfEvent
+    #
+    # Description: Given a click event, returns the location (row and column)
+    #              of the cell that was clicked.
+    #
+    #      Inputs: widget - The button or number label that received the
+    #                       click.
+    #              event  - The click event.
+    #
+    #     Outputs: Tuple containing the row and column of the clicked cell or
+    #              (-1, -1) if the click wasn't on a cell.
+    #---------------------------------------------------------------------------
+    def getRowColOfEvent(self, widget, event):
+        return self.getRowColOfButton(widget)
+
+#-------------------------------------------------------------------------------
+#       Class: MinesweeperCanvas
+#
+# Description: An alternative to MinesweeperTable that paints the whole board
+#              on a single drawing area with cairo instead of creating a widget
+#              for every cell. Clicks are mapped to cells arithmetically and
+#              only the rectangles of changed cells are redrawn, so very large
+#              boards stay responsive.
+#
+#     Methods: __init__, reset, drawHandler, drawCell, drawText, drawImage,
+#              getBoard, clickCell, chordCell, revealCell, revealAllCells,
+#              toggleFlag, updateCells, restoreCells, showHints, clearHints,
+#              getIndex, getRowCol, getRowColOfEvent
+#-------------------------------------------------------------------------------
+class MinesweeperCanvas(Gtk.DrawingArea):
+    #---------------------------------------------------------------------------
+    #      Method: __init__
+    #
+    # Description: Creates a new game board and a drawing area big enough to
+    #              show all of it.
+    #
+    #      Inputs: rows      - Number of rows.
+    #              cols      - Number of columns.
+    #              mineRatio - Ratio of mines vs. empty cells.
+    #              board     - The MinesweeperBoard to display (optional; a
+    #                          random board is created if none is given).
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def __init__(self, rows, cols, mineRatio=MINE_RATIO, board=None):
+        Gtk.DrawingArea.__init__(self)
+        self.rows = rows
+        self.cols = cols
+        self.mineRatio = mineRatio
+        if board is None:
+            board = MinesweeperBoard(rows, cols, mineRatio, useNumpy=True)
+        self.board = board
+        self.hints = {}
+        self.set_size_request(cols * CELL_SIZE, rows * CELL_SIZE)
+        self.add_events(Gdk.EventMask.BUTTON_PRESS_MASK |
+                        Gdk.EventMask.BUTTON_RELEASE_MASK)
+        self.connect('draw', self.drawHandler)
+
+    #---------------------------------------------------------------------------
+    #      Method: reset
+    #
+    # Description: Starts a new game on the same canvas.
+    #
+    #      Inputs: board - The new MinesweeperBoard (optional; a random board
+    #                      is created if none is given).
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def reset(self, board=None):
+        if board is None:
+            board = MinesweeperBoard(self.rows, self.cols, self.mineRatio,
+                                     useNumpy=True)
+        self.board = board
+        self.hints = {}
+        self.queue_draw()
+
+    #---------------------------------------------------------------------------
+    #      Method: drawHandler
+    #
+    # Description: Handler for 'draw' signals. Paints only the cells that
+    #              intersect the area being redrawn.
+    #
+    #      Inputs: widget  - The widget object that sent the signal (this
+    #                        canvas).
+    #              context - The cairo context to draw with.
+    #
+    #     Outputs: Returns 'False'.
+    #---------------------------------------------------------------------------
+    def drawHandler(self, widget, context):
+        (x1, y1, x2, y2) = context.clip_extents()
+        firstRow = max(int(y1) // CELL_SIZE, 0)
+        lastRow = min(int(y2 - 1) // CELL_SIZE, self.rows - 1)
+        firstCol = max(int(x1) // CELL_SIZE, 0)
+        lastCol = min(int(x2 - 1) // CELL_SIZE, self.cols - 1)
+        for row in range(firstRow, lastRow + 1):
+            for col in range(firstCol, lastCol + 1):
+                self.drawCell(context, row, col)
+        return False
+
+    #---------------------------------------------------------------------------
+    #      Method: drawCell
+    #
+    # Description: Paints a single cell: a raised square (possibly flagged) if
+    #              it is still covered, otherwise its mine or number.
+    #
+    #      Inputs: context - The cairo context to draw with.
+    #              row     - Row of the cell to draw.
+    #              col     - Column of the cell to draw.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def drawCell(self, context, row, col):
+        i = self.getIndex(row, col)
+        x = col * CELL_SIZE
+        y = row * CELL_SIZE
+        if not self.board.isRevealed(i):
+            context.set_source_rgb(0.75, 0.75, 0.75)
+            context.rectangle(x, y, CELL_SIZE, CELL_SIZE)
+            context.fill()
+            context.set_source_rgb(1.0, 1.0, 1.0)
+            context.rectangle(x, y, CELL_SIZE - 1, 2)
+            context.rectangle(x, y, 2, CELL_SIZE - 1)
+            context.fill()
+            context.set_source_rgb(0.5, 0.5, 0.5)
+            context.rectangle(x, y + CELL_SIZE - 2, CELL_SIZE, 2)
+            context.rectangle(x + CELL_SIZE - 2, y, 2, CELL_SIZE)
+            context.fill()
+            if self.board.isFlagged(i):
+                self.drawImage(context, FLAG_IMAGE, x, y)
+            elif i in self.hints:
+                self.drawText(context, '%d' % round(self.hints[i] * 100),
+                              (0.2, 0.2, 0.2), CELL_SIZE * 0.35, x, y)
+            return
+        context.set_source_rgb(0.85, 0.85, 0.85)
+        context.rectangle(x, y, CELL_SIZE, CELL_SIZE)
+        context.fill()
+        context.set_source_rgb(0.6, 0.6, 0.6)
+        context.rectangle(x + 0.5, y + 0.5, CELL_SIZE - 1, CELL_SIZE - 1)
+        context.set_line_width(1)
+        context.stroke()
+        if self.board.containsMine(i):
+            self.drawImage(context, MINE_IMAGE, x, y)
+            return
+        n = self.board.getAdjacentMines(i)
+        if n > 0:
+            self.drawText(context, str(n), NUMBER_COLORS[n - 1],
+                          CELL_SIZE * 0.6, x, y)
+
+    #---------------------------------------------------------------------------
+    #      Method: drawText
+    #
+    # Description: Paints text centered within a cell.
+    #
+    #      Inputs: context - The cairo context to draw with.
+    #              text    - The text to draw.
+    #              color   - (red, green, blue) tuple of the text color.
+    #              size    - Font size, in pixels.
+    #              x       - Left edge of the cell, in pixels.
+    #              y       - Top edge of the cell, in pixels.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def drawText(self, context, text, color, size, x, y):
+        context.set_source_rgb(*color)
+        context.set_font_size(size)
+        extents = context.text_extents(text)
+        context.move_to(x + (CELL_SIZE - extents.width) / 2 - extents.x_bearing,
+                        y + (CELL_SIZE - extents.height) / 2 -
+                        extents.y_bearing)
+        context.show_text(text)
+
+    #---------------------------------------------------------------------------
+    #      Method: drawImage
+    #
+    # Description: Paints a cell-sized image (taken from the shared pixbuf
+    #              cache) at the given position.
+    #
+    #      Inputs: context  - The cairo context to draw with.
+    #              filename - Filename of the desired image.
+    #              x        - Left edge of the cell, in pixels.
+    #              y        - Top edge of the cell, in pixels.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def drawImage(self, context, filename, x, y):
+        Gdk.cairo_set_source_pixbuf(context,
+                                    MinesweeperImage.getPixbuf(filename,
+                                                               CELL_SIZE),
+                                    x, y)
+        context.rectangle(x, y, CELL_SIZE, CELL_SIZE)
+        context.fill()
+
+    #---------------------------------------------------------------------------
+    #      Method: getBoard
+    #
+    # Description: Provides access to the game board displayed by this canvas.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: The MinesweeperBoard object.
+    #---------------------------------------------------------------------------
+    def getBoard(self):
+        return self.board
+
+    #---------------------------------------------------------------------------
+    #      Method: clickCell
+    #
+    # Description: Plays a left-click on the board and redraws the cells it
+    #              revealed. The first click of a game never hits a mine (see
+    #              'MinesweeperBoard.openCell'); the cells whose mines moved
+    #              are still covered, so they look the same and need no
+    #              redraw.
+    #
+    #      Inputs: row - Row of the clicked cell.
+    #              col - Column of the clicked cell.
+    #
+    #     Outputs: List of the indices of the cells the click revealed.
+    #---------------------------------------------------------------------------
+    def clickCell(self, row, col):
+        (_, changed) = self.board.openCell(row, col)
+        self.updateCells(changed)
+        return changed
+
+    #---------------------------------------------------------------------------
+    #      Method: chordCell
+    #
+    # Description: Plays a chord on a revealed number (see
+    #              'MinesweeperBoard.chordCell') and redraws the cells it
+    #              revealed.
+    #
+    #      Inputs: row - Row of the clicked cell.
+    #              col - Column of the clicked cell.
+    #
+    #     Outputs: List of the indices of the newly revealed cells.
+    #---------------------------------------------------------------------------
+    def chordCell(self, row, col):
+        changed = self.board.chordCell(row, col)
+        self.updateCells(changed)
+        return changed
+
+    #---------------------------------------------------------------------------
+    #      Method: revealCell
+    #
+    # Description: Reveals the cell at a given location (and possibly some
+    #              empty neighbors) and redraws the cells that changed.
+    #
+    #      Inputs: row - Row of the cell to reveal.
+    #              col - Column of the cell to reveal.
+    #
+    #     Outputs: List of the indices of the newly revealed cells.
+    #---------------------------------------------------------------------------
+    def revealCell(self, row, col):
+        changed = self.board.revealCell(row, col)
+        self.updateCells(changed)
+        return changed
+
+    #---------------------------------------------------------------------------
+    #      Method: revealAllCells
+    #
+    # Description: Reveals every cell and redraws the whole board.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def revealAllCells(self):
+        t = instrument.start()
+        self.board.revealAllCells()
+        self.queue_draw()
+        instrument.lap('revealAllCells', t)
+
+    #---------------------------------------------------------------------------
+    #      Method: toggleFlag
+    #
+    # Description: Flags or unflags a cell on the board and redraws it.
+    #
+    #      Inputs: row - Row of the cell of interest.
+    #              col - Column of the cell of interest.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def toggleFlag(self, row, col):
+        self.board.toggleFlag(row, col)
+        self.updateCells([self.getIndex(row, col)])
+
+    #---------------------------------------------------------------------------
+    #      Method: updateCells
+    #
+    # Description: Schedules a redraw of the rectangles of the given cells.
+    #
+    #      Inputs: indices - Indices of the cells that changed.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def updateCells(self, indices):
+        for i in indices:
+            (row, col) = self.getRowCol(i)
+            self.queue_draw_area(col * CELL_SIZE, row * CELL_SIZE, CELL_SIZE,
+                                 CELL_SIZE)
+
+    #---------------------------------------------------------------------------
+    #      Method: restoreCells
+    #
+    # Description: Redraws the given cells after an undo or a solver's safe
+    #              first click, or the whole board if most of it changed.
+    #
+    #      Inputs: indices - Indices of the cells that changed (repeats are
+    #                        allowed).
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def restoreCells(self, indices):
+        indices = set(indices)
+        if len(indices) > self.rows * self.cols // 4:
+            self.queue_draw()
+        else:
+            self.updateCells(indices)
+
+    #---------------------------------------------------------------------------
+    #      Method: showHints
+    #
+    # Description: Draws each covered cell's mine probability, as a
+    #              percentage, on the cell.
+    #
+    #      Inputs: probabilities - Dictionary mapping cell indices to mine
+    #                              probabilities.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def showHints(self, probabilities):
+        self.hints = dict(probabilities)
+        self.queue_draw()
+
+    #---------------------------------------------------------------------------
+    #      Method: clearHints
+    #
+    # Description: Removes any hints drawn on the cells.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def clearHints(self):
+        if self.hints:
+            self.hints = {}
+            self.queue_draw()
+
+    #---------------------------------------------------------------------------
+    #      Method: getIndex
+    #
+    # Description: Given the row and column of a cell, returns the appropriate
+    #              index value for that cell.
+    #
+    #      Inputs: row - Row of the cell of interest.
+    #              col - Column of the cell of interest.
+    #
+    #     Outputs: The index value for the cell of interest.
+    #---------------------------------------------------------------------------
+    def getIndex(self, row, col):
+        return self.board.getIndex(row, col)
+
+    #---------------------------------------------------------------------------
+    #      Method: getRowCol
+    #
+    # Description: Given the index value of a cell, returns the location (row
+    #              and column) of that cell in tuple form.
+    #
+    #      Inputs: index - Index value of the cell of interest.
+    #
+    #     Outputs: Tuple containing the row and column of the cell of interest.
+    #---------------------------------------------------------------------------
+    def getRowCol(self, index):
+        return self.board.getRowCol(index)
+
+    #---------------------------------------------------------------------------
+    #      Method: getRowColOfEvent
+    #
+    # Description: Given a click event, returns the location (row and column)
+    #              of the cell under the pointer.
+    #
+    #      Inputs: widget - The widget that received the click (this canvas).
+    #              event  - The click event.
+    #
+    #     Outputs: Tuple containing the row and column of the clicked cell or
+    #              (-1, -1) if the click was outside the board.
+    #---------------------------------------------------------------------------
+    def getRowColOfEvent(self, widget, event):
+        row = int(event.y) // CELL_SIZE
+        col = int(event.x) // CELL_SIZE
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            return (row, col)
+        return (-1, -1)
+
+#-------------------------------------------------------------------------------
+#       Class: MinesweeperCell
+#
+# Description: A view of one cell of the board: its button, plus access to the
+#              cell's state as recorded by the engine.
+#
+#     Methods: __init__, reset, containsMine, getAdjacentMines, isFlagged,
+#              reveal, isRevealed, getButton
+#-------------------------------------------------------------------------------
+class MinesweeperCell:
+    #---------------------------------------------------------------------------
+    #      Method: __init__
+    #
+    # Description: Links the cell to its place on the board and creates a
+    #              button that will hide the MinesweeperCell.
+    #
+    #      Inputs: board - The MinesweeperBoard this cell belongs to.
+    #              index - Index of this cell on the board.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def __init__(self, board, index):
+        self.board = board
+        self.index = index
+        self.button = MinesweeperButton(index)
+
+    #---------------------------------------------------------------------------
+    #      Method: reset
+    #
+    # Description: Links the cell to a new board and covers it again with an
+    #              unflagged button.
+    #
+    #      Inputs: board - The new MinesweeperBoard.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def reset(self, board):
+        self.board = board
+        if self.isFlagged():
+            self.button.toggleFlag()
+        self.button.show()
+
+    #---------------------------------------------------------------------------
+    #      Method: containsMine
+    #
+    # Description: Determines whether this cell contains a mine.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: 'True' if this cell contains a mine, otherwise 'False'.
+    #---------------------------------------------------------------------------
+    def containsMine(self):
+        return self.board.containsMine(self.index)
+
+    #---------------------------------------------------------------------------
+    #      Method: getAdjacentMines
+    #
+    # Description: Returns the number of mine-containing cells that share a side
+    #              or corner with this cell.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: The number of adjacent mines.
+    #---------------------------------------------------------------------------
+    def getAdjacentMines(self):
+        return self.board.getAdjacentMines(self.index)
+
+    #---------------------------------------------------------------------------
+    #      Method: isFlagged
+    #
+    # Description: Determines whether this cell's button is showing a flag.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: 'True' if a flag is showing, otherwise 'False'.
+    #---------------------------------------------------------------------------
+    def isFlagged(self):
+        image = self.button.get_image()
+        return image is not None and image.get_visible()
+
+    #---------------------------------------------------------------------------
+    #      Method: reveal
+    #
+    # Description: Reveals the cell by hiding its associated button.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def reveal(self):
+        self.button.hide()
+
+    #---------------------------------------------------------------------------
+    #      Method: isRevealed
+    #
+    # Description: Determines whether this cell has been revealed.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: 'True' if the board has revealed this cell, otherwise
+    #              'False'.
+    #---------------------------------------------------------------------------
+    def isRevealed(self):
+        return self.board.isRevealed(self.index)
+
+    #---------------------------------------------------------------------------
+    #      Method: getButton
+    #
+    # Description: Provides access to the cell's associated button.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: This cell's associated button object.
+    #---------------------------------------------------------------------------
+    def getButton(self):
+        return self.button
+
+#-------------------------------------------------------------------------------
+#       Class: MinesweeperButton
+#
+# Description: Buttons to cover cells, concealing mines. They can be flagged by
+#              right-clicking or removed by left-clicking.
+#
+#     Methods: __init__, getIndex, toggleFlag
+#-------------------------------------------------------------------------------
+class MinesweeperButton(Gtk.Button):
+    #---------------------------------------------------------------------------
+    #      Method: __init__
+    #
+    # Description: Initializes the button and sets its width and height to the
+    #              same preset value.
+    #
+    #      Inputs: index - Index of the cell this button covers.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def __init__(self, index):
+        Gtk.Button.__init__(self)
+        self.index = index
+        self.set_size_request(CELL_SIZE, CELL_SIZE)
+
+    #---------------------------------------------------------------------------
+    #      Method: getIndex
+    #
+    # Description: Provides the index of the cell this button covers.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: The cell index.
+    #---------------------------------------------------------------------------
+    def getIndex(self):
+        return self.index
+
+    #---------------------------------------------------------------------------
+    #      Method: toggleFlag
+    #
+    # Description: Adds a flag image to the button or removes that image if it
+    #              was already present.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def toggleFlag(self):
+        if self.get_image():
+            if self.get_image().get_visible():
+                self.get_image().set_visible(False)
+            else:
+                self.get_image().set_visible(True)
+        else:
+            self.set_image(MinesweeperImage(FLAG_IMAGE))
+
+#-------------------------------------------------------------------------------
+#       Class: MinesweeperLabel
+#
+# Description: Labels showing the number of a revealed cell. They sit in an
+#              event box so that clicking them can play a chord, and are left
+#              out of 'show_all' since they are shown only once revealed.
+#
+#     Methods: __init__, getIndex, get_label, set_label
+#-------------------------------------------------------------------------------
+class MinesweeperLabel(Gtk.EventBox):
+    #---------------------------------------------------------------------------
+    #      Method: __init__
+    #
+    # Description: Creates the label inside the event box.
+    #
+    #      Inputs: index - Index of the cell this label belongs to.
+    #              text  - Text of the label.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def __init__(self, index, text):
+        Gtk.EventBox.__init__(self)
+        self.set_no_show_all(True)
+        self.index = index
+        self.label = Gtk.Label(label=text)
+        self.add(self.label)
+        self.label.show()
+
+    #---------------------------------------------------------------------------
+    #      Method: getIndex
+    #
+    # Description: Provides the index of the cell this label belongs to.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: The cell index.
+    #---------------------------------------------------------------------------
+    def getIndex(self):
+        return self.index
+
+    #---------------------------------------------------------------------------
+    #      Method: get_label
+    #
+    # Description: Provides the label's text.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: The text.
+    #---------------------------------------------------------------------------
+    def get_label(self):
+        return self.label.get_label()
+
+    #---------------------------------------------------------------------------
+    #      Method: set_label
+    #
+    # Description: Changes the label's text.
+    #
+    #      Inputs: text - The new text.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def set_label(self, text):
+        self.label.set_label(text)
+
+#-------------------------------------------------------------------------------
+#       Class: MinesweeperImage
+#
+# Description: Images scaled to fit within Minesweeper cells/buttons. Decoded,
+#              scaled pixbufs are kept in a process-wide cache keyed by
+#              (filename, size), so each image file is read and scaled only
+#              once no matter how many images or games use it.
+#
+#     Methods: __init__, getPixbuf, getCacheStats
+#-------------------------------------------------------------------------------
+class MinesweeperImage(Gtk.Image):
+    pixbufCache = {}
+    cacheHits = 0
+    cacheMisses = 0
+
+    #---------------------------------------------------------------------------
+    #      Method: __init__
+    #
+    # Description: Initializes a Gtk.Image object based on a given filename,
+    #              scaled to fit within a single cell/button.
+    #
+    #      Inputs: filename - Filename of the desired image.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def __init__(self, filename):
+        Gtk.Image.__init__(self)
+        self.set_from_pixbuf(MinesweeperImage.getPixbuf(filename, CELL_SIZE))
+
+    #---------------------------------------------------------------------------
+    #      Method: getPixbuf
+    #
+    # Description: Provides the pixbuf for an image file scaled to a given
+    #              size, loading and scaling it only on the first request.
+    #
+    #      Inputs: filename - Filename of the desired image.
+    #              size     - Width and height of the scaled image, in pixels.
+    #
+    #     Outputs: The shared, scaled GdkPixbuf.Pixbuf.
+    #---------------------------------------------------------------------------
+    @classmethod
+    def getPixbuf(cls, filename, size):
+        key = (filename, size)
+        pixbuf = cls.pixbufCache.get(key)
+        if pixbuf is None:
+            t = instrument.start()
+            cls.cacheMisses += 1
+            pixbuf = GdkPixbuf.Pixbuf.new_from_file(filename)
+            pixbuf = pixbuf.scale_simple(size, size,
+                                         GdkPixbuf.InterpType.BILINEAR)
+            cls.pixbufCache[key] = pixbuf
+            instrument.lap('image.load', t)
+        else:
+            cls.cacheHits += 1
+        return pixbuf
+
+    #---------------------------------------------------------------------------
+    #      Method: getCacheStats
+    #
+    # Description: Reports how well the pixbuf cache is working.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: Tuple containing the number of cache hits and misses.
+    #---------------------------------------------------------------------------
+    @classmethod
+    def getCacheStats(cls):
+        return (cls.cacheHits, cls.cacheMisses)
@@ -0,0 +1,310 @@
+#!/usr/bin/python
+
+#-------------------------------------------------------------------------------
+#    Filename: history.py
+#
+#      Author: David C. Drake (https://davidcdrake.com)
+#
+# Description: Undo and branching for MinesweeperBoards. A BoardHistory keeps
+#              a tree of versions of one board. Each version stores only the
+#              cells that changed since its parent, as compact arrays of
+#              their old and new states, and shares everything else with the
+#              board itself. Moving between versions undoes and redoes those
+#              deltas along the path through the tree, so an undo takes time
+#              proportional to the cells the move changed, and a solver can
+#              explore thousands of hypothetical positions from one board and
+#              return to any of them.
+#
+#              Typical use:
+#
+#                  history = BoardHistory(board)
+#                  board.clickCell(row, col)
+#                  history.commit()
+#                  history.undo()
+#
+#     Classes: BoardVersion, BoardHistory
+#-------------------------------------------------------------------------------
+
+from array import array
+
+#-------------------------------------------------------------------------------
+#       Class: BoardVersion
+#
+# Description: One node of the version tree: the changes leading to it from
+#              its parent, and the board's counters at this version. Uses
+#              '__slots__' since search trees can hold many thousands of
+#              versions.
+#
+#     Methods: __init__, getParent, getChangeCount
+#-------------------------------------------------------------------------------
+class BoardVersion:
+    __slots__ = ('parent', 'depth', 'latest', 'indices', 'oldCells',
+                 'oldCounts', 'newCells', 'newCounts', 'counters')
+
+    #---------------------------------------------------------------------------
+    #      Method: __init__
+    #
+    # Description: Creates a version.
+    #
+    #      Inputs: parent    - The parent BoardVersion (None for the root).
+    #              indices   - Array of the indices of the changed cells, in
+    #                          the order they were changed (a cell may appear
+    #                          more than once).
+    #              oldCells  - Bytes holding each change's old state byte.
+    #              oldCounts - Bytes holding each change's old adjacent mine
+    #                          count.
+    #              newCells  - Bytes holding each changed cell's state byte at
+    #                          this version.
+    #              newCounts - Bytes holding each changed cell's adjacent mine
+    #                          count at this version.
+    #              counters  - Tuple containing the board's state, number of
+    #                          unrevealed safe cells, and number of flags at
+    #                          this version.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def __init__(self, parent, indices, oldCells, oldCounts, newCells,
+                 newCounts, counters):
+        self.parent = parent
+        self.depth = 0 if parent is None else parent.depth + 1
+        self.latest = None # the child most recently created or visited
+        self.indices = indices
+        self.oldCells = oldCells
+        self.oldCounts = oldCounts
+        self.newCells = newCells
+        self.newCounts = newCounts
+        self.counters = counters
+
+    #---------------------------------------------------------------------------
+    #      Method: getParent
+    #
+    # Description: Provides the version this one was made from.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: The parent BoardVersion, or None for the root.
+    #---------------------------------------------------------------------------
+    def getParent(self):
+        return self.parent
+
+    #---------------------------------------------------------------------------
+    #      Method: getChangeCount
+    #
+    # Description: Provides the number of cell changes stored in this version.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: The number of changes.
+    #---------------------------------------------------------------------------
+    def getChangeCount(self):
+        return len(self.indices)
+
+#-------------------------------------------------------------------------------
+#       Class: BoardHistory
+#
+# Description: The version tree of a board. While a BoardHistory exists, the
+#              board logs its changes in its journal; 'commit' turns the
+#              logged changes into a new version, and 'checkout', 'undo', and
+#              'redo' move the board to another version in place.
+#
+#     Methods: __init__, getVersion, getCounters, commit, rollback, checkout,
+#              undo, redo, applyOld, applyNew
+#-------------------------------------------------------------------------------
+class BoardHistory:
+    #---------------------------------------------------------------------------
+    #      Method: __init__
+    #
+    # Description: Starts a history at the board's current state and turns on
+    #              the board's journal.
+    #
+    #      Inputs: board - The MinesweeperBoard.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def __init__(self, board):
+        self.board = board
+        self.root = BoardVersion(None, array('I'), b'', b'', b'', b'',
+                                 self.getCounters())
+        self.current = self.root
+        board.journal = []
+
+    #---------------------------------------------------------------------------
+    #      Method: getVersion
+    #
+    # Description: Provides the version the board is at (not counting any
+    #              uncommitted changes).
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: The current BoardVersion.
+    #---------------------------------------------------------------------------
+    def getVersion(self):
+        return self.current
+
+    #---------------------------------------------------------------------------
+    #      Method: getCounters
+    #
+    # Description: Reads the board's counters.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: Tuple containing the board's state, number of unrevealed
+    #              safe cells, and number of flags.
+    #---------------------------------------------------------------------------
+    def getCounters(self):
+        board = self.board
+        return (board.state, board.unrevealedSafeCells, board.flagCount)
+
+    #---------------------------------------------------------------------------
+    #      Method: commit
+    #
+    # Description: Records the changes made since the current version as a
+    #              new child version, which becomes the current one.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: The new BoardVersion, or the current one if nothing
+    #              changed.
+    #---------------------------------------------------------------------------
+    def commit(self):
+        board = self.board
+        journal = board.journal
+        counters = self.getCounters()
+        if not journal and counters == self.current.counters:
+            return self.current
+        indices = array('I', [i for (i, _, _) in journal])
+        cells = board.cells
+        adjacentMines = board.adjacentMines
+        version = BoardVersion(self.current, indices,
+                               bytes(cell for (_, cell, _) in journal),
+                               bytes(count for (_, _, count) in journal),
+                               bytes(cells[i] for i in indices),
+                               bytes(adjacentMines[i] for i in indices),
+                               counters)
+        self.current.latest = version
+        self.current = version
+        board.journal = []
+        return version
+
+    #---------------------------------------------------------------------------
+    #      Method: rollback
+    #
+    # Description: Discards the changes made since the current version.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: List of the indices of the cells that changed.
+    #---------------------------------------------------------------------------
+    def rollback(self):
+        board = self.board
+        journal = board.journal
+        board.journal = None
+        for (i, cell, count) in reversed(journal):
+            board.restoreCell(i, cell, count)
+        (board.state, board.unrevealedSafeCells, board.flagCount) = \
+            self.current.counters
+        board.journal = []
+        return [i for (i, _, _) in journal]
+
+    #---------------------------------------------------------------------------
+    #      Method: checkout
+    #
+    # Description: Moves the board to another version of the tree, discarding
+    #              any uncommitted changes. The deltas of the versions between
+    #              the current one and their common ancestor with the target
+    #              are undone, then those down to the target are redone.
+    #
+    #      Inputs: version - The BoardVersion to move to.
+    #
+    #     Outputs: List of the indices of the cells that changed (possibly
+    #              with repeats).
+    #---------------------------------------------------------------------------
+    def checkout(self, version):
+        changed = self.rollback()
+        board = self.board
+        board.journal = None # the restores themselves are not logged
+        (up, down) = (self.current, [])
+        while up is not version:
+            if up.depth >= version.depth:
+                self.applyOld(up)
+                changed += up.indices
+                up = up.parent
+            else:
+                down.append(version)
+                version = version.parent
+        for step in reversed(down):
+            self.applyNew(step)
+            changed += step.indices
+            step.parent.latest = step
+            version = step
+        (board.state, board.unrevealedSafeCells, board.flagCount) = \
+            version.counters
+        self.current = version
+        board.journal = []
+        return changed
+
+    #---------------------------------------------------------------------------
+    #      Method: undo
+    #
+    # Description: Moves the board back to the parent of the current version,
+    #              after committing any pending changes.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: List of the indices of the cells that changed, or None if
+    #              there is nothing to undo.
+    #---------------------------------------------------------------------------
+    def undo(self):
+        self.commit()
+        if self.current.parent is None:
+            return None
+        return self.checkout(self.current.parent)
+
+    #---------------------------------------------------------------------------
+    #      Method: redo
+    #
+    # Description: Moves the board forward to the child of the current
+    #              version that was most recently created or visited.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: List of the indices of the cells that changed, or None if
+    #              there is nothing to redo.
+    #---------------------------------------------------------------------------
+    def redo(self):
+        self.commit()
+        if self.current.latest is None:
+            return None
+        return self.checkout(self.current.latest)
+
+    #---------------------------------------------------------------------------
+    #      Method: applyOld
+    #
+    # Description: Undoes a version's changes, most recent first.
+    #
+    #      Inputs: version - The BoardVersion.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def applyOld(self, version):
+        restoreCell = self.board.restoreCell
+        (indices, cells, counts) = (version.indices, version.oldCells,
+                                    version.oldCounts)
+        for k in range(len(indices) - 1, -1, -1):
+            restoreCell(indices[k], cells[k], counts[k])
+
+    #---------------------------------------------------------------------------
+    #      Method: applyNew
+    #
+    # Description: Redoes a version's changes.
+    #
+    #      Inputs: version - The BoardVersion.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def applyNew(self, version):
+        restoreCell = self.board.restoreCell
+        (indices, cells, counts) = (version.indices, version.newCells,
+                                    version.newCounts)
+        for k in range(len(indices)):
+            restoreCell(indices[k], cells[k], counts[k])
@@ -0,0 +1,534 @@
+#!/usr/bin/python
+
+#-------------------------------------------------------------------------------
+#    Filename: infinite.py
+#
+#      Author: David C. Drake (https://davidcdrake.com)
+#
+# Description: An unbounded Minesweeper board for the "infinite" mode. The
+#              board is divided into square chunks whose mines follow from
+#              the board's seed and the chunk's coordinates alone, so a chunk
+#              is generated only when a reveal, flag, or neighbor count first
+#              touches it. At most a fixed number of chunks are kept in
+#              memory; the least recently used are evicted and generated
+#              again on demand, keeping only the player's revealed and flagged
+#              cells, compressed. Memory use and latency therefore depend on
+#              the area explored rather than on the size of the board.
+#
+#     Classes: InfiniteBoard
+#-------------------------------------------------------------------------------
+
+from collections import OrderedDict
+import math
+import random
+import zlib
+
+from engine import MINE_RATIO, PLAYING, LOST, MINE, REVEALED, FLAGGED, \
+                   COVER_TABLE
+
+CHUNK_BITS = 5
+CHUNK_SIZE = 1 << CHUNK_BITS # cells per side of a chunk
+CHUNK_MASK = CHUNK_SIZE - 1
+MAX_CHUNKS = 4096 # chunks kept in memory, about 8 MB
+MIN_CHUNKS = 9 # a chunk and its neighbors
+MAX_FLOOD = 100000 # cells a single reveal may open
+STATE_TABLE = bytes(b & (REVEALED | FLAGGED) for b in range(256))
+NEIGHBOR_STEPS = tuple((dRow, dCol) for dRow in (-1, 0, 1)
+                       for dCol in (-1, 0, 1) if (dRow, dCol) != (0, 0))
+LOCAL_STEPS = tuple((dRow, dCol, dRow * CHUNK_SIZE + dCol)
+                    for (dRow, dCol) in NEIGHBOR_STEPS) # within a chunk
+
+#-------------------------------------------------------------------------------
+#       Class: InfiniteBoard
+#
+# Description: The state of a game on an unbounded board. Cells are addressed
+#              by (row, col), which may be any integers; the tuple itself
+#              serves as the cell's index, so frontends written against
+#              MinesweeperBoard's index-based methods work unchanged. The
+#              cells around (0, 0) never contain mines, so a game can always
+#              start there. There is no win: the game goes on until a mine is
+#              revealed.
+#
+#              Each loaded chunk is a tuple of two bytearrays laid out like a
+#              MinesweeperBoard's: 'cells' (MINE, REVEALED, and FLAGGED bits)
+#              and 'adjacentMines'.
+#
+#     Methods: __init__, generateMines, loadChunk, evictChunk, getChunk,
+#              locate, getCellState, containsMine, getAdjacentMines,
+#              isRevealed, isFlagged, getFlagCount, getRevealedCount,
+#              getState, getChunkCounts, clickCell, openCell, chordCell,
+#              revealCell, revealAllCells, toggleFlag, getIndex, getRowCol
+#-------------------------------------------------------------------------------
+class InfiniteBoard:
+    #---------------------------------------------------------------------------
+    #      Method: __init__
+    #
+    # Description: Creates a board. No chunk is generated until it is needed.
+    #
+    #      Inputs: mineRatio - Ratio of mines vs. empty cells.
+    #              seed      - Integer seed of the mine layout (optional;
+    #                          chosen at random by default).
+    #              maxChunks - Maximum number of chunks kept in memory.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def __init__(self, mineRatio=MINE_RATIO, seed=None, maxChunks=MAX_CHUNKS):
+        if seed is None:
+            seed = random.getrandbits(64)
+        self.mineRatio = mineRatio
+        self.seed = seed
+        self.maxChunks = max(maxChunks, MIN_CHUNKS)
+        self.chunkMines = math.ceil(CHUNK_SIZE * CHUNK_SIZE * mineRatio)
+        self.chunks = OrderedDict() # (chunk row, chunk col) -> chunk
+        self.saved = {} # (chunk row, chunk col) -> compressed player state
+        self.flagCount = 0
+        self.revealedCount = 0
+        self.state = PLAYING
+        self.exposed = False
+
+    #---------------------------------------------------------------------------
+    #      Method: generateMines
+    #
+    # Description: Generates a chunk's mine layout from the board's seed and
+    #              the chunk's coordinates. Every chunk gets the same number
+    #              of mines, less any that would border (0, 0).
+    #
+    #      Inputs: key - Tuple containing the chunk's row and column.
+    #
+    #     Outputs: Bytearray holding MINE for each cell with a mine and 0 for
+    #              each cell without.
+    #---------------------------------------------------------------------------
+    def generateMines(self, key):
+        rng = random.Random('%d:%d:%d' % (self.seed, key[0], key[1]))
+        mines = bytearray(CHUNK_SIZE * CHUNK_SIZE)
+        for i in rng.sample(range(CHUNK_SIZE * CHUNK_SIZE), self.chunkMines):
+            mines[i] = MINE
+        if key[0] in (-1, 0) and key[1] in (-1, 0):
+            for (row, col) in NEIGHBOR_STEPS + ((0, 0),):
+                if (row >> CHUNK_BITS, col >> CHUNK_BITS) == key:
+                    mines[(row & CHUNK_MASK) << CHUNK_BITS |
+                          (col & CHUNK_MASK)] = 0
+        return mines
+
+    #---------------------------------------------------------------------------
+    #      Method: loadChunk
+    #
+    # Description: Generates a chunk, computes its adjacent mine counts from
+    #              its own mines and the edges of its eight neighbors, and
+    #              restores the player's state if the chunk was evicted
+    #              before. The least recently used chunk is evicted if too
+    #              many are loaded.
+    #
+    #      Inputs: key - Tuple containing the chunk's row and column.
+    #
+    #     Outputs: The chunk.
+    #---------------------------------------------------------------------------
+    def loadChunk(self, key):
+        size = CHUNK_SIZE
+        width = size + 2
+        cells = self.generateMines(key)
+        padded = bytearray(width * width) # the mines, with a 1-cell border
+        for (dRow, dCol) in NEIGHBOR_STEPS + ((0, 0),):
+            if (dRow, dCol) == (0, 0):
+                mines = cells
+            else:
+                neighbor = self.chunks.get((key[0] + dRow, key[1] + dCol))
+                if neighbor is None:
+                    mines = self.generateMines((key[0] + dRow,
+                                                key[1] + dCol))
+                else:
+                    mines = neighbor[0].translate(COVER_TABLE)
+            (rowStart, rowCount, toRow) = ((size - 1, 1, 0), (0, size, 1),
+                                           (0, 1, size + 1))[dRow + 1]
+            (colStart, colCount, toCol) = ((size - 1, 1, 0), (0, size, 1),
+                                           (0, 1, size + 1))[dCol + 1]
+            for k in range(rowCount):
+                source = (rowStart + k) * size + colStart
+                target = (toRow + k) * width + toCol
+                padded[target:target + colCount] = \
+                    mines[source:source + colCount]
+        # Each row becomes an integer with one byte per cell, so that adding
+        # shifted rows sums whole 3x3 neighborhoods at once (a sum never
+        # exceeds 9, so bytes never carry into each other).
+        full = (1 << 8 * width) - 1
+        sums = []
+        for row in range(width):
+            mines = int.from_bytes(padded[row * width:(row + 1) * width],
+                                   'big')
+            sums.append(mines + (mines << 8 & full) + (mines >> 8))
+        adjacentMines = bytearray()
+        for row in range(1, size + 1):
+            mines = int.from_bytes(padded[row * width:(row + 1) * width],
+                                   'big')
+            counts = (sums[row - 1] + sums[row] + sums[row + 1]) & \
+                     ~(mines * 0xff)
+            adjacentMines += counts.to_bytes(width, 'big')[1:size + 1]
+        state = self.saved.pop(key, None)
+        if state is not None:
+            state = zlib.decompress(state)
+            cells = bytearray((int.from_bytes(cells, 'big') |
+                               int.from_bytes(state, 'big'))
+                              .to_bytes(size * size, 'big'))
+        chunk = (cells, adjacentMines)
+        self.chunks[key] = chunk
+        if len(self.chunks) > self.maxChunks:
+            self.evictChunk()
+        return chunk
+
+    #---------------------------------------------------------------------------
+    #      Method: evictChunk
+    #
+    # Description: Drops the least recently used chunk. If the player has
+    #              revealed or flagged any of its cells, those bits are kept,
+    #              compressed; its mines and counts are regenerated when it is
+    #              next needed.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def evictChunk(self):
+        (key, (cells, _)) = self.chunks.popitem(last=False)
+        state = cells.translate(STATE_TABLE)
+        if state.count(0) < len(state):
+            self.saved[key] = zlib.compress(state)
+
+    #---------------------------------------------------------------------------
+    #      Method: getChunk
+    #
+    # Description: Looks up a chunk, loading it if necessary, and marks it as
+    #              the most recently used.
+    #
+    #      Inputs: key - Tuple containing the chunk's row and column.
+    #
+    #     Outputs: The chunk.
+    #---------------------------------------------------------------------------
+    def getChunk(self, key):
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            return self.loadChunk(key)
+        self.chunks.move_to_end(key)
+        return chunk
+
+    #---------------------------------------------------------------------------
+    #      Method: locate
+    #
+    # Description: Finds where a cell's state is stored, loading its chunk if
+    #              necessary.
+    #
+    #      Inputs: row - Row of the cell of interest.
+    #              col - Column of the cell of interest.
+    #
+    #     Outputs: Tuple containing the cell's chunk and its index within the
+    #              chunk.
+    #---------------------------------------------------------------------------
+    def locate(self, row, col):
+        return (self.getChunk((row >> CHUNK_BITS, col >> CHUNK_BITS)),
+                (row & CHUNK_MASK) << CHUNK_BITS | (col & CHUNK_MASK))
+
+    #---------------------------------------------------------------------------
+    #      Method: getCellState
+    #
+    # Description: Reads a cell's REVEALED and FLAGGED bits without loading
+    #              its chunk, which is why drawing untouched parts of the
+    #              board costs nothing.
+    #
+    #      Inputs: index - (row, col) of the cell of interest.
+    #
+    #     Outputs: The cell's REVEALED and FLAGGED bits.
+    #---------------------------------------------------------------------------
+    def getCellState(self, index):
+        (row, col) = index
+        key = (row >> CHUNK_BITS, col >> CHUNK_BITS)
+        i = (row & CHUNK_MASK) << CHUNK_BITS | (col & CHUNK_MASK)
+        chunk = self.chunks.get(key)
+        if chunk is not None:
+            return chunk[0][i] & (REVEALED | FLAGGED)
+        state = self.saved.get(key)
+        if state is not None:
+            return zlib.decompress(state)[i]
+        return 0
+
+    #---------------------------------------------------------------------------
+    #      Method: containsMine
+    #
+    # Description: Determines whether a cell contains a mine.
+    #
+    #      Inputs: index - (row, col) of the cell of interest.
+    #
+    #     Outputs: 'True' if the cell contains a mine, otherwise 'False'.
+    #---------------------------------------------------------------------------
+    def containsMine(self, index):
+        (chunk, i) = self.locate(*index)
+        return chunk[0][i] & MINE != 0
+
+    #---------------------------------------------------------------------------
+    #      Method: getAdjacentMines
+    #
+    # Description: Provides the number of mines next to a cell.
+    #
+    #      Inputs: index - (row, col) of the cell of interest.
+    #
+    #     Outputs: The number of adjacent mines (0 for mine cells).
+    #---------------------------------------------------------------------------
+    def getAdjacentMines(self, index):
+        (chunk, i) = self.locate(*index)
+        return chunk[1][i]
+
+    #---------------------------------------------------------------------------
+    #      Method: isRevealed
+    #
+    # Description: Determines whether a cell has been revealed.
+    #
+    #      Inputs: index - (row, col) of the cell of interest.
+    #
+    #     Outputs: 'True' if the cell is revealed, otherwise 'False'.
+    #---------------------------------------------------------------------------
+    def isRevealed(self, index):
+        return self.exposed or self.getCellState(index) & REVEALED != 0
+
+    #---------------------------------------------------------------------------
+    #      Method: isFlagged
+    #
+    # Description: Determines whether a cell has been flagged.
+    #
+    #      Inputs: index - (row, col) of the cell of interest.
+    #
+    #     Outputs: 'True' if the cell is flagged, otherwise 'False'.
+    #---------------------------------------------------------------------------
+    def isFlagged(self, index):
+        return not self.exposed and self.getCellState(index) & FLAGGED != 0
+
+    #---------------------------------------------------------------------------
+    #      Method: getFlagCount
+    #
+    # Description: Provides the number of flagged cells.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: The number of flags on the board.
+    #---------------------------------------------------------------------------
+    def getFlagCount(self):
+        return self.flagCount
+
+    #---------------------------------------------------------------------------
+    #      Method: getRevealedCount
+    #
+    # Description: Provides the number of revealed cells, which serves as the
+    #              player's score.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: The number of revealed cells.
+    #---------------------------------------------------------------------------
+    def getRevealedCount(self):
+        return self.revealedCount
+
+    #---------------------------------------------------------------------------
+    #      Method: getState
+    #
+    # Description: Provides the game's state.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: PLAYING or LOST.
+    #---------------------------------------------------------------------------
+    def getState(self):
+        return self.state
+
+    #---------------------------------------------------------------------------
+    #      Method: getChunkCounts
+    #
+    # Description: Reports how much of the board is held in memory.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: Tuple containing the number of loaded chunks and the number
+    #              of evicted chunks whose player state is kept.
+    #---------------------------------------------------------------------------
+    def getChunkCounts(self):
+        return (len(self.chunks), len(self.saved))
+
+    #---------------------------------------------------------------------------
+    #      Method: clickCell
+    #
+    # Description: Plays a left-click on a cell: the game is lost if the cell
+    #              contains a mine, otherwise the cell (and possibly some empty
+    #              neighbors) is revealed.
+    #
+    #      Inputs: row - Row of the clicked cell.
+    #              col - Column of the clicked cell.
+    #
+    #     Outputs: List of the (row, col) of each cell the click revealed.
+    #---------------------------------------------------------------------------
+    def clickCell(self, row, col):
+        if self.state != PLAYING:
+            return []
+        (chunk, i) = self.locate(row, col)
+        if chunk[0][i] & MINE:
+            self.state = LOST
+            return []
+        return self.revealCell(row, col)
+
+    #---------------------------------------------------------------------------
+    #      Method: openCell
+    #
+    # Description: Plays a left-click the way the game's frontends do (see
+    #              'MinesweeperBoard.openCell'). Games start with the mine-free
+    #              origin revealed, so no click is ever a first click and no
+    #              mines are moved.
+    #
+    #      Inputs: row - Row of the clicked cell.
+    #              col - Column of the clicked cell.
+    #
+    #     Outputs: Tuple containing an empty list (no mines moved) and a list
+    #              of the (row, col) of each cell the click revealed.
+    #---------------------------------------------------------------------------
+    def openCell(self, row, col):
+        return ([], self.clickCell(row, col))
+
+    #---------------------------------------------------------------------------
+    #      Method: chordCell
+    #
+    # Description: Plays a chord on a revealed number: if as many of its
+    #              neighbors are flagged as it has adjacent mines, all of its
+    #              other covered neighbors are revealed (and the game is lost if
+    #              one of them contains a mine).
+    #
+    #      Inputs: row - Row of the clicked cell.
+    #              col - Column of the clicked cell.
+    #
+    #     Outputs: List of the (row, col) of each cell the chord revealed.
+    #---------------------------------------------------------------------------
+    def chordCell(self, row, col):
+        ((cells, adjacentMines), i) = self.locate(row, col)
+        count = adjacentMines[i]
+        if self.state != PLAYING or not cells[i] & REVEALED or count == 0:
+            return []
+        flags = 0
+        covered = []
+        for (dRow, dCol) in NEIGHBOR_STEPS:
+            (chunk, j) = self.locate(row + dRow, col + dCol)
+            if chunk[0][j] & FLAGGED:
+                flags += 1
+            elif not chunk[0][j] & REVEALED:
+                covered.append((row + dRow, col + dCol, chunk[0][j] & MINE))
+        if flags != count:
+            return []
+        if any(mine for (_, _, mine) in covered):
+            self.state = LOST
+            return []
+        changed = []
+        for (r, c, _) in covered:
+            changed += self.revealCell(r, c)
+        return changed
+
+    #---------------------------------------------------------------------------
+    #      Method: revealCell
+    #
+    # Description: Reveals the cell at a given location and, if it's empty,
+    #              also reveals all nearby cells that don't contain a mine,
+    #              across chunk boundaries. A fill that would open more than
+    #              MAX_FLOOD cells stops there, leaving the empty cells at its
+    #              edge covered so that the player can continue from them.
+    #
+    #      Inputs: row - Row of the cell to reveal.
+    #              col - Column of the cell to reveal.
+    #
+    #     Outputs: List of the (row, col) of each newly revealed cell.
+    #---------------------------------------------------------------------------
+    def revealCell(self, row, col):
+        ((cells, adjacentMines), i) = self.locate(row, col)
+        if cells[i] & (REVEALED | MINE):
+            return []
+        flags = cells[i] & FLAGGED
+        cells[i] = cells[i] & ~FLAGGED | REVEALED
+        changed = [(row, col)]
+        pending = [(row, col)] if adjacentMines[i] == 0 else []
+        locate = self.locate
+        getChunk = self.getChunk
+        while pending and len(changed) < MAX_FLOOD:
+            (r, c) = pending.pop()
+            (localRow, localCol) = (r & CHUNK_MASK, c & CHUNK_MASK)
+            if 0 < localRow < CHUNK_MASK and 0 < localCol < CHUNK_MASK:
+                chunk = getChunk((r >> CHUNK_BITS, c >> CHUNK_BITS))
+                i = localRow << CHUNK_BITS | localCol
+                neighbors = [(chunk, i + d, r + dRow, c + dCol)
+                             for (dRow, dCol, d) in LOCAL_STEPS]
+            else: # on the chunk's edge
+                neighbors = [locate(r + dRow, c + dCol) + (r + dRow, c + dCol)
+                             for (dRow, dCol) in NEIGHBOR_STEPS]
+            for ((cells, adjacentMines), j, nRow, nCol) in neighbors:
+                if not cells[j] & (REVEALED | MINE):
+                    flags += cells[j] & FLAGGED
+                    cells[j] = cells[j] & ~FLAGGED | REVEALED
+                    changed.append((nRow, nCol))
+                    if adjacentMines[j] == 0:
+                        pending.append((nRow, nCol))
+        if pending:
+            for (r, c) in pending:
+                (chunk, j) = locate(r, c)
+                chunk[0][j] &= ~REVEALED
+            pending = set(pending)
+            changed = [cell for cell in changed if cell not in pending]
+        self.flagCount -= flags // FLAGGED
+        self.revealedCount += len(changed)
+        return changed
+
+    #---------------------------------------------------------------------------
+    #      Method: revealAllCells
+    #
+    # Description: Shows every cell (e.g., after a loss) and hides all flags.
+    #              Nothing is generated up front: cells are generated as the
+    #              frontend draws them.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def revealAllCells(self):
+        self.exposed = True
+
+    #---------------------------------------------------------------------------
+    #      Method: toggleFlag
+    #
+    # Description: Flags an unrevealed cell or removes its flag if it was
+    #              already flagged.
+    #
+    #      Inputs: row - Row of the cell of interest.
+    #              col - Column of the cell of interest.
+    #
+    #     Outputs: 'True' if the cell is now flagged, otherwise 'False'.
+    #---------------------------------------------------------------------------
+    def toggleFlag(self, row, col):
+        ((cells, _), i) = self.locate(row, col)
+        if not cells[i] & REVEALED:
+            cells[i] ^= FLAGGED
+            self.flagCount += 1 if cells[i] & FLAGGED else -1
+        return cells[i] & FLAGGED != 0
+
+    #---------------------------------------------------------------------------
+    #      Method: getIndex
+    #
+    # Description: Given the row and column of a cell, returns its index,
+    #              which on an unbounded board is the (row, col) tuple itself.
+    #
+    #      Inputs: row - Row of the cell of interest.
+    #              col - Column of the cell of interest.
+    #
+    #     Outputs: The index value for the cell of interest.
+    #---------------------------------------------------------------------------
+    def getIndex(self, row, col):
+        return (row, col)
+
+    #---------------------------------------------------------------------------
+    #      Method: getRowCol
+    #
+    # Description: Given the index value of a cell, returns its location.
+    #
+    #      Inputs: index - Index value of the cell of interest.
+    #
+    #     Outputs: Tuple containing the row and column of the cell of interest.
+    #---------------------------------------------------------------------------
+    def getRowCol(self, index):
+        return index
@@ -0,0 +1,273 @@
+#!/usr/bin/python
+
+#-------------------------------------------------------------------------------
+#    Filename: instrument.py
+#
+#      Author: David C. Drake (https://davidcdrake.com)
+#
+# Description: Lightweight latency instrumentation. Code marks the phases of
+#              an event with 'start' and 'lap'; when instrumentation is
+#              enabled each phase's duration goes into a latency histogram,
+#              and 'getReport' summarizes the p50, p95, and p99 latency of
+#              every phase. When disabled, 'start' and 'lap' return at once
+#              without reading the clock.
+#
+#              Instrumentation is enabled by calling 'enable' or by setting
+#              the environment variable MINESWEEPER_PROFILE to a non-empty
+#              value other than '0'.
+#
+#     Classes: LatencyHistogram
+#
+#   Functions: enable, isEnabled, start, lap, record, getHistograms, reset,
+#              getReport, dumpReport
+#-------------------------------------------------------------------------------
+
+import math
+import os
+import sys
+import time
+
+BUCKETS_PER_DOUBLING = 8 # about 9% resolution
+MIN_LATENCY = 1e-7 # seconds; shorter times share the first bucket
+
+enabled = os.environ.get('MINESWEEPER_PROFILE', '') not in ('', '0')
+histograms = {}
+
+#-------------------------------------------------------------------------------
+#       Class: LatencyHistogram
+#
+# Description: A histogram of latencies with logarithmically spaced buckets,
+#              so it uses a fixed amount of memory however many samples it
+#              records while keeping percentiles accurate to within a bucket.
+#
+#     Methods: __init__, record, getPercentile, getCount, getMean, getMax
+#-------------------------------------------------------------------------------
+class LatencyHistogram:
+    #---------------------------------------------------------------------------
+    #      Method: __init__
+    #
+    # Description: Creates an empty histogram.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    #---------------------------------------------------------------------------
+    #      Method: record
+    #
+    # Description: Adds a sample to the histogram.
+    #
+    #      Inputs: seconds - The latency, in seconds.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def record(self, seconds):
+        bucket = 0
+        if seconds > MIN_LATENCY:
+            bucket = int(math.log2(seconds / MIN_LATENCY) *
+                         BUCKETS_PER_DOUBLING)
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    #---------------------------------------------------------------------------
+    #      Method: getPercentile
+    #
+    # Description: Estimates a percentile from the buckets (using the upper
+    #              edge of the bucket it falls in, capped at the maximum).
+    #
+    #      Inputs: percent - The percentile wanted (e.g., 99).
+    #
+    #     Outputs: The estimated latency, in seconds (0 if there are no
+    #              samples).
+    #---------------------------------------------------------------------------
+    def getPercentile(self, percent):
+        if self.count == 0:
+            return 0.0
+        rank = math.ceil(self.count * percent / 100)
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                edge = MIN_LATENCY * 2 ** ((bucket + 1) / BUCKETS_PER_DOUBLING)
+                return min(edge, self.max)
+        return self.max
+
+    #---------------------------------------------------------------------------
+    #      Method: getCount
+    #
+    # Description: Provides the number of samples recorded.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: The number of samples.
+    #---------------------------------------------------------------------------
+    def getCount(self):
+        return self.count
+
+    #---------------------------------------------------------------------------
+    #      Method: getMean
+    #
+    # Description: Provides the mean latency.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: The mean latency, in seconds (0 if there are no samples).
+    #---------------------------------------------------------------------------
+    def getMean(self):
+        return self.total / self.count if self.count else 0.0
+
+    #---------------------------------------------------------------------------
+    #      Method: getMax
+    #
+    # Description: Provides the largest latency recorded.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: The maximum latency, in seconds.
+    #---------------------------------------------------------------------------
+    def getMax(self):
+        return self.max
+
+#-------------------------------------------------------------------------------
+#    Function: enable
+#
+# Description: Turns instrumentation on or off.
+#
+#      Inputs: on - 'True' to enable instrumentation, 'False' to disable it.
+#
+#     Outputs: None.
+#-------------------------------------------------------------------------------
+def enable(on=True):
+    global enabled
+    enabled = on
+
+#-------------------------------------------------------------------------------
+#    Function: isEnabled
+#
+# Description: Determines whether instrumentation is enabled.
+#
+#      Inputs: None.
+#
+#     Outputs: 'True' if enabled, otherwise 'False'.
+#-------------------------------------------------------------------------------
+def isEnabled():
+    return enabled
+
+#-------------------------------------------------------------------------------
+#    Function: start
+#
+# Description: Marks the start of the first phase of an event.
+#
+#      Inputs: None.
+#
+#     Outputs: A timestamp to pass to 'lap' (0 if instrumentation is
+#              disabled).
+#-------------------------------------------------------------------------------
+def start():
+    if enabled:
+        return time.perf_counter()
+    return 0.0
+
+#-------------------------------------------------------------------------------
+#    Function: lap
+#
+# Description: Marks the end of a phase, recording its duration, and the
+#              start of the next one.
+#
+#      Inputs: phase - Name of the phase that just ended.
+#              since - Timestamp from 'start' or the previous 'lap'.
+#
+#     Outputs: A timestamp for the next 'lap' (0 if instrumentation is
+#              disabled).
+#-------------------------------------------------------------------------------
+def lap(phase, since):
+    if enabled:
+        now = time.perf_counter()
+        record(phase, now - since)
+        return now
+    return 0.0
+
+#-------------------------------------------------------------------------------
+#    Function: record
+#
+# Description: Records the duration of a phase, if instrumentation is
+#              enabled.
+#
+#      Inputs: phase   - Name of the phase.
+#              seconds - Its duration.
+#
+#     Outputs: None.
+#-------------------------------------------------------------------------------
+def record(phase, seconds):
+    if enabled:
+        histogram = histograms.get(phase)
+        if histogram is None:
+            histogram = histograms[phase] = LatencyHistogram()
+        histogram.record(seconds)
+
+#-------------------------------------------------------------------------------
+#    Function: getHistograms
+#
+# Description: Provides access to the recorded histograms.
+#
+#      Inputs: None.
+#
+#     Outputs: Dictionary mapping phase names to LatencyHistogram objects.
+#-------------------------------------------------------------------------------
+def getHistograms():
+    return histograms
+
+#-------------------------------------------------------------------------------
+#    Function: reset
+#
+# Description: Discards all recorded samples.
+#
+#      Inputs: None.
+#
+#     Outputs: None.
+#-------------------------------------------------------------------------------
+def reset():
+    histograms.clear()
+
+#-------------------------------------------------------------------------------
+#    Function: getReport
+#
+# Description: Summarizes every phase's latency.
+#
+#      Inputs: None.
+#
+#     Outputs: The report, as a multi-line string.
+#-------------------------------------------------------------------------------
+def getReport():
+    lines = ['%-24s %8s %10s %10s %10s %10s %10s' %
+             ('phase', 'count', 'mean us', 'p50 us', 'p95 us', 'p99 us',
+              'max us')]
+    for phase in sorted(histograms):
+        h = histograms[phase]
+        lines.append('%-24s %8d %10.1f %10.1f %10.1f %10.1f %10.1f' %
+                     (phase, h.getCount(), h.getMean() * 1e6,
+                      h.getPercentile(50) * 1e6, h.getPercentile(95) * 1e6,
+                      h.getPercentile(99) * 1e6, h.getMax() * 1e6))
+    return '\n'.join(lines)
+
+#-------------------------------------------------------------------------------
+#    Function: dumpReport
+#
+# Description: Writes the report, if anything was recorded.
+#
+#      Inputs: stream - File object to write to (defaults to 'sys.stderr').
+#
+#     Outputs: None.
+#-------------------------------------------------------------------------------
+def dumpReport(stream=None):
+    if histograms:
+        print(getReport(), file=stream or sys.stderr)
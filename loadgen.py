@@ -0,0 +1,194 @@
+#!/usr/bin/python
+
+#-------------------------------------------------------------------------------
+#    Filename: loadgen.py
+#
+#      Author: David C. Drake (https://davidcdrake.com)
+#
+# Description: A load generator for the game server (see 'server.py'). It
+#              opens many connections at once, each playing games by revealing
+#              random covered cells (and now and then flagging one), and
+#              reports the request throughput and the p50, p95, and p99
+#              latency of each kind of request.
+#
+#   Functions: request, playGames, runLoad, main
+#-------------------------------------------------------------------------------
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from engine import MINE_RATIO
+from instrument import LatencyHistogram
+from server import DEFAULT_SOCKET
+
+READ_LIMIT = 1 << 24 # bytes; a flood fill on a large board is a long line
+FLAG_CHANCE = 0.1
+
+#-------------------------------------------------------------------------------
+#    Function: request
+#
+# Description: Sends a request and waits for its response, recording the
+#              round-trip time.
+#
+#      Inputs: reader     - The connection's asyncio.StreamReader.
+#              writer     - The connection's asyncio.StreamWriter.
+#              message    - The request, as a dictionary.
+#              histograms - Dictionary mapping request ops to
+#                           LatencyHistogram objects.
+#
+#     Outputs: The response, as a dictionary.
+#-------------------------------------------------------------------------------
+async def request(reader, writer, message, histograms):
+    start = time.perf_counter()
+    writer.write(json.dumps(message).encode() + b'\n')
+    response = json.loads(await reader.readline())
+    histogram = histograms.get(message['op'])
+    if histogram is None:
+        histogram = histograms[message['op']] = LatencyHistogram()
+    histogram.record(time.perf_counter() - start)
+    if not response.get('ok'):
+        raise RuntimeError(response.get('error'))
+    return response
+
+#-------------------------------------------------------------------------------
+#    Function: playGames
+#
+# Description: Plays games over one connection until a deadline.
+#
+#      Inputs: connect    - Coroutine function opening a connection.
+#              rows       - Number of rows.
+#              cols       - Number of columns.
+#              mineRatio  - Ratio of mines vs. empty cells.
+#              deadline   - 'time.perf_counter' value at which to stop.
+#              rng        - Source of randomness.
+#              histograms - Dictionary of LatencyHistogram objects to record
+#                           into.
+#
+#     Outputs: Number of games finished.
+#-------------------------------------------------------------------------------
+async def playGames(connect, rows, cols, mineRatio, deadline, rng,
+                    histograms):
+    (reader, writer) = await connect()
+    games = 0
+    try:
+        while time.perf_counter() < deadline:
+            game = await request(reader, writer,
+                                 {'op': 'new', 'rows': rows, 'cols': cols,
+                                  'ratio': mineRatio}, histograms)
+            session = game['session']
+            covered = list(range(rows * cols))
+            rng.shuffle(covered)
+            revealed = set()
+            state = 'playing'
+            while state == 'playing' and covered and \
+                  time.perf_counter() < deadline:
+                i = covered.pop()
+                if i in revealed:
+                    continue
+                (row, col) = divmod(i, cols)
+                if rng.random() < FLAG_CHANCE:
+                    await request(reader, writer,
+                                  {'op': 'flag', 'session': session,
+                                   'row': row, 'col': col}, histograms)
+                    continue
+                response = await request(reader, writer,
+                                         {'op': 'reveal', 'session': session,
+                                          'row': row, 'col': col},
+                                         histograms)
+                state = response['state']
+                revealed.update(r * cols + c for (r, c, _) in response['cells'])
+            await request(reader, writer, {'op': 'close', 'session': session},
+                          histograms)
+            games += 1
+    finally:
+        writer.close()
+    return games
+
+#-------------------------------------------------------------------------------
+#    Function: runLoad
+#
+# Description: Runs many connections against a server at once.
+#
+#      Inputs: connections - Number of concurrent connections.
+#              duration    - Seconds to run for.
+#              rows        - Number of rows.
+#              cols        - Number of columns.
+#              mineRatio   - Ratio of mines vs. empty cells.
+#              path        - Path of the server's Unix domain socket.
+#              port        - Localhost TCP port of the server (used instead of
+#                            'path' if given).
+#              seed        - Seed for the random moves.
+#
+#     Outputs: Tuple containing the number of games finished, the elapsed
+#              time (seconds), and a dictionary mapping request ops to
+#              LatencyHistogram objects.
+#-------------------------------------------------------------------------------
+async def runLoad(connections, duration, rows, cols, mineRatio=MINE_RATIO,
+                  path=DEFAULT_SOCKET, port=None, seed=0):
+    async def connect():
+        if port:
+            return await asyncio.open_connection('127.0.0.1', port,
+                                                 limit=READ_LIMIT)
+        return await asyncio.open_unix_connection(path, limit=READ_LIMIT)
+
+    histograms = {}
+    start = time.perf_counter()
+    deadline = start + duration
+    games = await asyncio.gather(*[
+        playGames(connect, rows, cols, mineRatio, deadline,
+                  random.Random('%d:%d' % (seed, i)), histograms)
+        for i in range(connections)])
+    return (sum(games), time.perf_counter() - start, histograms)
+
+#-------------------------------------------------------------------------------
+#    Function: main
+#
+# Description: Command-line entry point. Runs a load test and prints its
+#              results.
+#
+#      Inputs: argv - Command-line arguments (optional; defaults to
+#                     'sys.argv').
+#
+#     Outputs: None.
+#-------------------------------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Generate load against the Minesweeper server.')
+    parser.add_argument('-c', '--connections', type=int, default=1000,
+                        help='number of concurrent connections (sessions)')
+    parser.add_argument('-d', '--duration', type=float, default=10.0,
+                        help='seconds to run for')
+    parser.add_argument('--rows', type=int, default=16,
+                        help='number of rows')
+    parser.add_argument('--cols', type=int, default=30,
+                        help='number of columns')
+    parser.add_argument('--ratio', type=float, default=MINE_RATIO,
+                        help='ratio of mines vs. empty cells')
+    parser.add_argument('--socket', default=DEFAULT_SOCKET,
+                        help='path of the server\'s Unix domain socket')
+    parser.add_argument('--port', type=int,
+                        help='localhost TCP port of the server')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='seed for the random moves')
+    args = parser.parse_args(argv)
+    (games, elapsed, histograms) = asyncio.run(runLoad(
+        args.connections, args.duration, args.rows, args.cols, args.ratio,
+        args.socket, args.port, args.seed))
+    requests = sum(h.getCount() for h in histograms.values())
+    print('%d connections, %d games, %d requests in %.2f s '
+          '(%.0f requests/s)' % (args.connections, games, requests, elapsed,
+                                 requests / elapsed))
+    print('%-8s %8s %10s %10s %10s %10s' %
+          ('op', 'count', 'p50 us', 'p95 us', 'p99 us', 'max us'))
+    for op in sorted(histograms):
+        h = histograms[op]
+        print('%-8s %8d %10.1f %10.1f %10.1f %10.1f' %
+              (op, h.getCount(), h.getPercentile(50) * 1e6,
+               h.getPercentile(95) * 1e6, h.getPercentile(99) * 1e6,
+               h.getMax() * 1e6))
+
+if __name__ == '__main__':
+    main()
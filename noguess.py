@@ -0,0 +1,174 @@
+#!/usr/bin/python
+
+#-------------------------------------------------------------------------------
+#    Filename: noguess.py
+#
+#      Author: David C. Drake (https://davidcdrake.com)
+#
+# Description: Generates boards that can be solved from the first click by
+#              deduction alone, and keeps pools of such boards ready so that
+#              new games can start without waiting for one to be generated.
+#
+#     Classes: MinesweeperBoardPool
+#
+#   Functions: generateNoGuessBoard
+#-------------------------------------------------------------------------------
+
+from collections import deque
+import random
+import threading
+
+from engine import MINE_RATIO, SEED_BITS, MinesweeperBoard
+from solver import MinesweeperSolver
+
+MAX_ATTEMPTS = 200 # layouts tried per no-guess board before giving up
+DEFAULT_POOL_SIZE = 3 # boards kept ready per board size
+
+#-------------------------------------------------------------------------------
+#    Function: generateNoGuessBoard
+#
+# Description: Generates a board that a MinesweeperSolver can win from the
+#              given starting cell without guessing. Layouts are generated
+#              from random seeds until the solver wins one; the layout is
+#              never edited, so the board's code rebuilds it exactly (its
+#              first click at 'start' then clears the opening the same way).
+#              At the default mine ratio about 90% of layouts are accepted
+#              on the standard sizes and about 60% at 100 x 100, but only
+#              15-20% at a ratio of 0.2, and fewer still on larger or
+#              denser boards, so at most MAX_ATTEMPTS layouts are tried.
+#
+#      Inputs: rows      - Number of rows.
+#              cols      - Number of columns.
+#              mineRatio - Ratio of mines vs. empty cells.
+#              rng       - Source of the boards' seeds (defaults to 'random').
+#              start     - (row, col) of the first click (optional; defaults
+#                          to the center of the board).
+#
+#     Outputs: Tuple containing the (unrevealed) MinesweeperBoard and the
+#              (row, col) of the first click. Raises ValueError if no such
+#              board is found.
+#-------------------------------------------------------------------------------
+def generateNoGuessBoard(rows, cols, mineRatio=MINE_RATIO, rng=random,
+                         start=None):
+    if start is None:
+        start = (rows // 2, cols // 2)
+    for _ in range(MAX_ATTEMPTS):
+        seed = rng.getrandbits(SEED_BITS)
+        board = MinesweeperBoard(rows, cols, mineRatio, seed=seed)
+        opening = len(board.getNeighbors(board.getIndex(*start))) + 1
+        if board.getMineCount() > rows * cols - opening:
+            raise ValueError('too many mines for a no-guess board')
+        MinesweeperSolver(board).solve(start)
+        if board.hasWon():
+            # Solving moved mines out of the opening, so start over from the
+            # seed; the real first click will move them the same way.
+            return (MinesweeperBoard(rows, cols, mineRatio, seed=seed), start)
+    raise ValueError('no no-guess board found in %d layouts' % MAX_ATTEMPTS)
+
+#-------------------------------------------------------------------------------
+#       Class: MinesweeperBoardPool
+#
+# Description: Pools of ready-made boards, one per board size, refilled by a
+#              background thread whenever a board is taken.
+#
+#     Methods: __init__, get, refill, stop
+#-------------------------------------------------------------------------------
+class MinesweeperBoardPool:
+    #---------------------------------------------------------------------------
+    #      Method: __init__
+    #
+    # Description: Creates empty pools and starts the background thread that
+    #              fills them.
+    #
+    #      Inputs: size      - Number of boards to keep ready per board size.
+    #              generator - Function taking (rows, cols, mineRatio, rng)
+    #                          and returning a (board, start) tuple (defaults
+    #                          to 'generateNoGuessBoard'). The rng is only a
+    #                          source of seeds; each board has its own
+    #                          generator.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def __init__(self, size=DEFAULT_POOL_SIZE, generator=generateNoGuessBoard):
+        self.size = size
+        self.generator = generator
+        self.rng = random.Random()
+        self.pools = {} # (rows, cols, mineRatio) -> deque of (board, start)
+        self.condition = threading.Condition()
+        self.stopped = False
+        self.thread = threading.Thread(target=self.refill, daemon=True)
+        self.thread.start()
+
+    #---------------------------------------------------------------------------
+    #      Method: get
+    #
+    # Description: Takes a board from the pool for its size, or generates one
+    #              at once if that pool is empty. Either way, the pool is then
+    #              topped up in the background.
+    #
+    #      Inputs: rows      - Number of rows.
+    #              cols      - Number of columns.
+    #              mineRatio - Ratio of mines vs. empty cells.
+    #
+    #     Outputs: Tuple containing a MinesweeperBoard and the (row, col) of
+    #              its first click. Raises ValueError if the pool is empty and
+    #              no board can be generated.
+    #---------------------------------------------------------------------------
+    def get(self, rows, cols, mineRatio=MINE_RATIO):
+        key = (rows, cols, mineRatio)
+        with self.condition:
+            pool = self.pools.setdefault(key, deque())
+            item = pool.popleft() if pool else None
+            self.condition.notify()
+        if item is None:
+            item = self.generator(rows, cols, mineRatio, random.Random())
+        return item
+
+    #---------------------------------------------------------------------------
+    #      Method: refill
+    #
+    # Description: Body of the background thread: waits until some pool is
+    #              below its target size, then generates a board for it. If
+    #              that fails, the pool is dropped until 'get' asks for its
+    #              size again.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def refill(self):
+        while True:
+            with self.condition:
+                key = None
+                while not self.stopped:
+                    key = next((k for (k, pool) in self.pools.items()
+                                if len(pool) < self.size), None)
+                    if key is not None:
+                        break
+                    self.condition.wait()
+                if self.stopped:
+                    return
+            try:
+                item = self.generator(*key, self.rng)
+            except ValueError:
+                item = None
+            with self.condition:
+                if item is None:
+                    del self.pools[key] # given up on until asked for again
+                else:
+                    self.pools[key].append(item)
+
+    #---------------------------------------------------------------------------
+    #      Method: stop
+    #
+    # Description: Stops the background thread once its current board, if
+    #              any, is finished.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify()
@@ -0,0 +1,430 @@
+#!/usr/bin/python
+
+#-------------------------------------------------------------------------------
+#    Filename: record.py
+#
+#      Author: David C. Drake (https://davidcdrake.com)
+#
+# Description: A compact binary format for archiving boards and games. A
+#              corpus file starts with a short magic string, followed by any
+#              number of records, each prefixed with its length as a varint.
+#              A record holds:
+#
+#                  rows, cols, seed       varints
+#                  state                  one byte (PLAYING, WON, or LOST)
+#                  mine map               one bit per cell, row-major, least
+#                                         significant bit first
+#                  move count             varint
+#                  moves                  two varints per move: the cell's
+#                                         index times two, plus one for a
+#                                         flag; then the move's outcome, the
+#                                         number of revealed cells after it
+#                                         times four, plus the game's state
+#
+#              A RecordReader memory-maps a corpus and iterates over its
+#              records without copying them, so files of millions of records
+#              can be scanned in bulk.
+#
+#     Classes: GameRecord, RecordWriter, RecordReader
+#
+#   Functions: encodeVarint, decodeVarint, packMines, unpackMines, getOutcome,
+#              encodeRecord
+#-------------------------------------------------------------------------------
+
+import mmap
+
+from engine import PLAYING, MinesweeperBoard
+
+MAGIC = b'MSWR\x02'
+REVEAL = 0
+FLAG = 1
+
+#-------------------------------------------------------------------------------
+#    Function: encodeVarint
+#
+# Description: Appends a non-negative integer to a buffer as a varint (seven
+#              bits per byte, least significant group first, with the high bit
+#              set on every byte but the last).
+#
+#      Inputs: value  - The integer.
+#              buffer - The bytearray to append to.
+#
+#     Outputs: None.
+#-------------------------------------------------------------------------------
+def encodeVarint(value, buffer):
+    while value > 0x7F:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+#-------------------------------------------------------------------------------
+#    Function: decodeVarint
+#
+# Description: Reads a varint written by 'encodeVarint'.
+#
+#      Inputs: buffer - Bytes-like object to read from.
+#              offset - Position of the varint's first byte.
+#
+#     Outputs: Tuple containing the integer and the position just after it.
+#-------------------------------------------------------------------------------
+def decodeVarint(buffer, offset):
+    byte = buffer[offset]
+    offset += 1
+    if byte < 0x80:
+        return (byte, offset)
+    value = byte & 0x7F
+    shift = 7
+    while True:
+        byte = buffer[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return (value, offset)
+        shift += 7
+
+#-------------------------------------------------------------------------------
+#    Function: packMines
+#
+# Description: Packs a mine layout into one bit per cell.
+#
+#      Inputs: mines - Sequence of truth values, one per cell.
+#
+#     Outputs: The packed layout, as bytes.
+#-------------------------------------------------------------------------------
+def packMines(mines):
+    bits = ''.join('1' if mine else '0' for mine in reversed(mines))
+    return int(bits or '0', 2).to_bytes((len(mines) + 7) // 8, 'little')
+
+#-------------------------------------------------------------------------------
+#    Function: unpackMines
+#
+# Description: Unpacks a layout packed by 'packMines'.
+#
+#      Inputs: packed - Bytes-like object holding the packed layout.
+#              cells  - Number of cells.
+#
+#     Outputs: List of truth values, one per cell.
+#-------------------------------------------------------------------------------
+def unpackMines(packed, cells):
+    bits = format(int.from_bytes(packed, 'little'), '0%db' % cells)
+    return [bit == '1' for bit in reversed(bits[-cells:] if cells else '')]
+
+#-------------------------------------------------------------------------------
+#    Function: getOutcome
+#
+# Description: Summarizes a board's progress after a move, as stored in a
+#              record.
+#
+#      Inputs: board - The MinesweeperBoard.
+#
+#     Outputs: The number of revealed cells times four, plus the game's state.
+#-------------------------------------------------------------------------------
+def getOutcome(board):
+    return board.getRevealedCount() * 4 + board.getState()
+
+#-------------------------------------------------------------------------------
+#    Function: encodeRecord
+#
+# Description: Encodes a board and the moves played on it as a record,
+#              including its length prefix. The outcome of each move is found
+#              by playing the moves on a copy of the board's layout, so that
+#              a replay can tell at which move it first parts from the
+#              record.
+#
+#      Inputs: board - The MinesweeperBoard; its mine layout and current state
+#                      are stored.
+#              moves - Sequence of (action, row, col) tuples, where 'action'
+#                      is REVEAL or FLAG.
+#              seed  - Seed the layout was generated from (optional; defaults
+#                      to the board's seed, or 0 if it has none).
+#
+#     Outputs: The encoded record, as bytes.
+#-------------------------------------------------------------------------------
+def encodeRecord(board, moves, seed=None):
+    if seed is None:
+        seed = board.getSeed() or 0
+    body = bytearray()
+    encodeVarint(board.rows, body)
+    encodeVarint(board.cols, body)
+    encodeVarint(seed, body)
+    body.append(board.getState())
+    body += packMines(board.getMines())
+    encodeVarint(len(moves), body)
+    replay = MinesweeperBoard(board.rows, board.cols, mines=board.getMines())
+    for (action, row, col) in moves:
+        index = board.getIndex(row, col)
+        if replay.getState() == PLAYING:
+            replay.playMove(index, action)
+        encodeVarint(index * 2 + action, body)
+        encodeVarint(getOutcome(replay), body)
+    record = bytearray()
+    encodeVarint(len(body), record)
+    return bytes(record + body)
+
+#-------------------------------------------------------------------------------
+#       Class: GameRecord
+#
+# Description: A decoded record's header, with its mine map and moves left in
+#              place in the underlying buffer until they are asked for.
+#
+#     Methods: __init__, getMines, getBoard, getMoves, getMoveCodes,
+#              getSteps
+#-------------------------------------------------------------------------------
+class GameRecord:
+    #---------------------------------------------------------------------------
+    #      Method: __init__
+    #
+    # Description: Decodes a record's header.
+    #
+    #      Inputs: buffer - Bytes-like object holding the record.
+    #              offset - Position of the record's body (just after its
+    #                       length prefix).
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def __init__(self, buffer, offset=0):
+        self.buffer = buffer
+        (self.rows, offset) = decodeVarint(buffer, offset)
+        (self.cols, offset) = decodeVarint(buffer, offset)
+        (self.seed, offset) = decodeVarint(buffer, offset)
+        self.state = buffer[offset]
+        self.minesOffset = offset + 1
+        offset = self.minesOffset + (self.rows * self.cols + 7) // 8
+        (self.moveCount, self.movesOffset) = decodeVarint(buffer, offset)
+
+    #---------------------------------------------------------------------------
+    #      Method: getMines
+    #
+    # Description: Unpacks the mine layout.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: List of truth values, one per cell.
+    #---------------------------------------------------------------------------
+    def getMines(self):
+        cells = self.rows * self.cols
+        return unpackMines(self.buffer[self.minesOffset:
+                                       self.minesOffset + (cells + 7) // 8],
+                           cells)
+
+    #---------------------------------------------------------------------------
+    #      Method: getBoard
+    #
+    # Description: Creates a new, unplayed board with the recorded layout.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: The MinesweeperBoard.
+    #---------------------------------------------------------------------------
+    def getBoard(self):
+        return MinesweeperBoard(self.rows, self.cols, mines=self.getMines())
+
+    #---------------------------------------------------------------------------
+    #      Method: getMoves
+    #
+    # Description: Decodes the recorded moves.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: List of (action, row, col) tuples.
+    #---------------------------------------------------------------------------
+    def getMoves(self):
+        cols = self.cols
+        return [(code & 1,) + divmod(code >> 1, cols)
+                for code in self.getMoveCodes()]
+
+    #---------------------------------------------------------------------------
+    #      Method: getMoveCodes
+    #
+    # Description: Decodes the recorded moves without converting cell indices
+    #              to rows and columns.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: List of move codes: each cell's index times two, plus one
+    #              for a flag.
+    #---------------------------------------------------------------------------
+    def getMoveCodes(self):
+        buffer = self.buffer
+        offset = self.movesOffset
+        codes = []
+        for _ in range(self.moveCount):
+            (code, offset) = decodeVarint(buffer, offset)
+            (_, offset) = decodeVarint(buffer, offset)
+            codes.append(code)
+        return codes
+
+    #---------------------------------------------------------------------------
+    #      Method: getSteps
+    #
+    # Description: Decodes the recorded moves along with the outcome of each
+    #              (see 'getOutcome').
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: List of (move code, outcome) tuples.
+    #---------------------------------------------------------------------------
+    def getSteps(self):
+        buffer = self.buffer
+        offset = self.movesOffset
+        steps = []
+        for _ in range(self.moveCount):
+            (code, offset) = decodeVarint(buffer, offset)
+            (outcome, offset) = decodeVarint(buffer, offset)
+            steps.append((code, outcome))
+        return steps
+
+#-------------------------------------------------------------------------------
+#       Class: RecordWriter
+#
+# Description: Writes records to a corpus file.
+#
+#     Methods: __init__, write, close, __enter__, __exit__
+#-------------------------------------------------------------------------------
+class RecordWriter:
+    #---------------------------------------------------------------------------
+    #      Method: __init__
+    #
+    # Description: Creates (or truncates) a corpus file and writes its magic
+    #              string.
+    #
+    #      Inputs: path - Path of the file.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def __init__(self, path):
+        self.file = open(path, 'wb')
+        self.file.write(MAGIC)
+        self.count = 0
+
+    #---------------------------------------------------------------------------
+    #      Method: write
+    #
+    # Description: Appends a record (see 'encodeRecord').
+    #
+    #      Inputs: board - The MinesweeperBoard.
+    #              moves - Sequence of (action, row, col) tuples.
+    #              seed  - Seed the layout was generated from (optional).
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def write(self, board, moves, seed=None):
+        self.file.write(encodeRecord(board, moves, seed))
+        self.count += 1
+
+    #---------------------------------------------------------------------------
+    #      Method: close
+    #
+    # Description: Closes the file.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def close(self):
+        self.file.close()
+
+    #---------------------------------------------------------------------------
+    #      Method: __enter__
+    #
+    # Description: Lets the writer be used in a 'with' statement.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: The writer itself.
+    #---------------------------------------------------------------------------
+    def __enter__(self):
+        return self
+
+    #---------------------------------------------------------------------------
+    #      Method: __exit__
+    #
+    # Description: Closes the writer at the end of a 'with' statement.
+    #
+    #      Inputs: exception - Details of any exception raised.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def __exit__(self, *exception):
+        self.close()
+
+#-------------------------------------------------------------------------------
+#       Class: RecordReader
+#
+# Description: Reads a corpus file through a read-only memory map. Iterating
+#              yields GameRecord objects that refer to the map directly, so
+#              they are only usable until the reader is closed.
+#
+#     Methods: __init__, __iter__, close, __enter__, __exit__
+#-------------------------------------------------------------------------------
+class RecordReader:
+    #---------------------------------------------------------------------------
+    #      Method: __init__
+    #
+    # Description: Opens and maps a corpus file.
+    #
+    #      Inputs: path - Path of the file.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError('%s is not a game record file' % path)
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.map)
+
+    #---------------------------------------------------------------------------
+    #      Method: __iter__
+    #
+    # Description: Iterates over the records in file order.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: Generator of GameRecord objects.
+    #---------------------------------------------------------------------------
+    def __iter__(self):
+        view = self.view
+        offset = len(MAGIC)
+        end = len(view)
+        while offset < end:
+            (length, offset) = decodeVarint(view, offset)
+            yield GameRecord(view, offset)
+            offset += length
+
+    #---------------------------------------------------------------------------
+    #      Method: close
+    #
+    # Description: Unmaps and closes the file.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def close(self):
+        self.view.release()
+        self.map.close()
+
+    #---------------------------------------------------------------------------
+    #      Method: __enter__
+    #
+    # Description: Lets the reader be used in a 'with' statement.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: The reader itself.
+    #---------------------------------------------------------------------------
+    def __enter__(self):
+        return self
+
+    #---------------------------------------------------------------------------
+    #      Method: __exit__
+    #
+    # Description: Closes the reader at the end of a 'with' statement.
+    #
+    #      Inputs: exception - Details of any exception raised.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def __exit__(self, *exception):
+        self.close()
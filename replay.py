@@ -0,0 +1,154 @@
+#!/usr/bin/python
+
+#-------------------------------------------------------------------------------
+#    Filename: replay.py
+#
+#      Author: David C. Drake (https://davidcdrake.com)
+#
+# Description: Replays recorded games on the headless engine, without widgets
+#              or dialogs, to re-verify them in bulk after engine changes. A
+#              replay reports the game's final state and the first move at
+#              which it parted from the record: the first move after which
+#              the number of revealed cells or the game's state differs from
+#              the recorded outcome of that move.
+#
+#   Functions: replayMoves, replayCodes, replayRecord, replayFile, main
+#-------------------------------------------------------------------------------
+
+import argparse
+import sys
+import time
+
+from engine import PLAYING
+from record import RecordReader, getOutcome
+
+#-------------------------------------------------------------------------------
+#    Function: replayMoves
+#
+# Description: Applies a sequence of moves to a board.
+#
+#      Inputs: board - The MinesweeperBoard to play on.
+#              moves - Sequence of (action, row, col) tuples, where 'action'
+#                      is REVEAL or FLAG (see 'record.py').
+#
+#     Outputs: Tuple containing the final state (PLAYING, WON, or LOST) and
+#              the number of moves applied; replay stops once the game ends.
+#-------------------------------------------------------------------------------
+def replayMoves(board, moves):
+    cols = board.cols
+    return replayCodes(board, [(row * cols + col) * 2 + action
+                               for (action, row, col) in moves])
+
+#-------------------------------------------------------------------------------
+#    Function: replayCodes
+#
+# Description: Applies a sequence of encoded moves to a board. Every move
+#              goes through the engine's 'playMove', so a replay keeps the
+#              same counters, win and loss checks, and undo journal as live
+#              play.
+#
+#      Inputs: board - The MinesweeperBoard to play on.
+#              codes - Sequence of move codes: each cell's index times two,
+#                      plus one for a flag.
+#
+#     Outputs: Tuple containing the final state and the number of moves
+#              applied.
+#-------------------------------------------------------------------------------
+def replayCodes(board, codes):
+    playMove = board.playMove
+    applied = 0
+    for code in codes:
+        if board.getState() != PLAYING:
+            break
+        applied += 1
+        playMove(code >> 1, code & 1)
+    return (board.getState(), applied)
+
+#-------------------------------------------------------------------------------
+#    Function: replayRecord
+#
+# Description: Replays a recorded game on a fresh board with its layout,
+#              comparing the outcome of each move with the recorded one.
+#
+#      Inputs: record - The GameRecord.
+#
+#     Outputs: Dictionary with the final 'state', the number of moves
+#              'applied', and 'divergence': the index of the first move whose
+#              outcome differs from the record (or, if every outcome matches
+#              but the final state doesn't, the last move applied), or None
+#              if the replay matched.
+#-------------------------------------------------------------------------------
+def replayRecord(record):
+    board = record.getBoard()
+    playMove = board.playMove
+    applied = 0
+    divergence = None
+    for (move, (code, outcome)) in enumerate(record.getSteps()):
+        if board.getState() == PLAYING:
+            applied += 1
+            playMove(code >> 1, code & 1)
+        if divergence is None and getOutcome(board) != outcome:
+            divergence = move
+    state = board.getState()
+    if divergence is None and state != record.state:
+        divergence = max(applied - 1, 0)
+    return {'state': state, 'applied': applied, 'divergence': divergence}
+
+#-------------------------------------------------------------------------------
+#    Function: replayFile
+#
+# Description: Replays every game in a corpus file.
+#
+#      Inputs: path - Path of the corpus file.
+#
+#     Outputs: Generator of (record number, result) tuples, one per record,
+#              where each result is as returned by 'replayRecord' plus the
+#              record's 'moves' count.
+#-------------------------------------------------------------------------------
+def replayFile(path):
+    with RecordReader(path) as reader:
+        for (number, record) in enumerate(reader):
+            result = replayRecord(record)
+            result['moves'] = record.moveCount
+            yield (number, result)
+
+#-------------------------------------------------------------------------------
+#    Function: main
+#
+# Description: Command-line entry point. Replays one or more corpus files and
+#              prints the number of diverging games and the replay speed.
+#
+#      Inputs: argv - Command-line arguments (optional; defaults to
+#                     'sys.argv').
+#
+#     Outputs: Exit status: 1 if any game diverged, otherwise 0.
+#-------------------------------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Replay recorded Minesweeper games.')
+    parser.add_argument('files', nargs='+', help='game record files')
+    parser.add_argument('--show', type=int, default=10,
+                        help='number of divergences to list per file')
+    args = parser.parse_args(argv)
+    status = 0
+    for path in args.files:
+        start = time.perf_counter()
+        (games, moves, divergences) = (0, 0, 0)
+        for (number, result) in replayFile(path):
+            games += 1
+            moves += result['applied']
+            if result['divergence'] is not None:
+                divergences += 1
+                if divergences <= args.show:
+                    print('%s: game %d diverged at move %d of %d' %
+                          (path, number, result['divergence'],
+                           result['moves']))
+        elapsed = time.perf_counter() - start
+        print('%s: %d games, %d moves, %d diverged (%.0f moves/s)' %
+              (path, games, moves, divergences, moves / max(elapsed, 1e-9)))
+        if divergences:
+            status = 1
+    return status
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,351 @@
+#!/usr/bin/python
+
+#-------------------------------------------------------------------------------
+#    Filename: server.py
+#
+#      Author: David C. Drake (https://davidcdrake.com)
+#
+# Description: An asyncio server hosting many Minesweeper games at once. Each
+#              session is a headless MinesweeperBoard; no GUI is involved.
+#              Clients connect to a local (Unix domain, or localhost TCP)
+#              socket and send one JSON object per line, receiving one JSON
+#              object per line in reply:
+#
+#                  {"op": "new", "rows": 16, "cols": 30, "ratio": 0.15}
+#                      -> {"ok": true, "session": 1, "rows": 16, ...,
+#                          "code": "16x30-72-9f3a1c2b"}
+#                  {"op": "new", "code": "16x30-72-9f3a1c2b"}
+#                      -> the same board again
+#                  {"op": "reveal", "session": 1, "row": 3, "col": 4}
+#                      -> {"ok": true, "state": "playing",
+#                          "cells": [[3, 4, 0], [3, 5, 1], ...]}
+#                  {"op": "flag", "session": 1, "row": 0, "col": 0}
+#                      -> {"ok": true, "flagged": true}
+#                  {"op": "state", "session": 1}
+#                      -> {"ok": true, "state": "playing", "revealed": 57}
+#                  {"op": "close", "session": 1}
+#                      -> {"ok": true}
+#
+#              A reveal lists the (row, col, adjacent mine count) of each
+#              newly revealed cell; a losing reveal lists the mines instead.
+#              Errors are reported as {"ok": false, "error": "..."}. A
+#              session belongs to the connection that created it and is
+#              discarded when that connection closes. Board sizes and the
+#              number of sessions are capped, which bounds memory use.
+#
+#     Classes: MinesweeperServer
+#
+#   Functions: main
+#-------------------------------------------------------------------------------
+
+import argparse
+import asyncio
+import json
+import os
+
+from engine import ROW_COL_VALUES, MINE_RATIO, SMALL, PLAYING, WON, LOST, \
+                   MinesweeperBoard, parseBoardCode
+
+DEFAULT_SOCKET = '/tmp/minesweeper.sock'
+MAX_CELLS = 300 * 300 # per session
+MAX_SESSIONS = 10000
+BACKLOG = 4096 # pending connections; load tests connect all at once
+STATE_NAMES = {PLAYING: 'playing', WON: 'won', LOST: 'lost'}
+
+#-------------------------------------------------------------------------------
+#       Class: MinesweeperServer
+#
+# Description: Holds the sessions and answers requests.
+#
+#     Methods: __init__, handleConnection, handleRequest, newGame, reveal,
+#              flag, getState, closeGame, getSession, getCell, getInteger
+#-------------------------------------------------------------------------------
+class MinesweeperServer:
+    #---------------------------------------------------------------------------
+    #      Method: __init__
+    #
+    # Description: Creates a server with no sessions.
+    #
+    #      Inputs: maxSessions - Maximum number of sessions at once.
+    #              maxCells    - Maximum number of cells per board.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def __init__(self, maxSessions=MAX_SESSIONS, maxCells=MAX_CELLS):
+        self.maxSessions = maxSessions
+        self.maxCells = maxCells
+        self.sessions = {} # session ID -> MinesweeperBoard
+        self.nextSession = 1
+        self.operations = {'new': self.newGame, 'reveal': self.reveal,
+                           'flag': self.flag, 'state': self.getState,
+                           'close': self.closeGame}
+
+    #---------------------------------------------------------------------------
+    #      Method: handleConnection
+    #
+    # Description: Serves one client connection until it closes, then
+    #              discards the sessions it created.
+    #
+    #      Inputs: reader - The connection's asyncio.StreamReader.
+    #              writer - The connection's asyncio.StreamWriter.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    async def handleConnection(self, reader, writer):
+        owned = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    response = self.handleRequest(request, owned)
+                except (ValueError, TypeError, KeyError, OverflowError,
+                        RecursionError) as error:
+                    response = {'ok': False, 'error': str(error)}
+                writer.write(json.dumps(response).encode() + b'\n')
+                await writer.drain()
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            for session in owned:
+                self.sessions.pop(session, None)
+            writer.close()
+
+    #---------------------------------------------------------------------------
+    #      Method: handleRequest
+    #
+    # Description: Carries out one request, which must be a JSON object.
+    #
+    #      Inputs: request - The decoded request.
+    #              owned   - Set of the IDs of the sessions the requesting
+    #                        connection owns.
+    #
+    #     Outputs: The response, as a dictionary.
+    #---------------------------------------------------------------------------
+    def handleRequest(self, request, owned):
+        if not isinstance(request, dict):
+            raise ValueError('request must be a JSON object')
+        operation = self.operations.get(request.get('op'))
+        if operation is None:
+            raise ValueError('unknown op: %r' % request.get('op'))
+        response = operation(request, owned)
+        response['ok'] = True
+        return response
+
+    #---------------------------------------------------------------------------
+    #      Method: newGame
+    #
+    # Description: Creates a session with a new board.
+    #
+    #      Inputs: request - The request: optional 'rows', 'cols', and 'ratio'
+    #                        (default to a small board), or else a board
+    #                        'code'.
+    #              owned   - Set of the connection's session IDs.
+    #
+    #     Outputs: Response with the session ID, board size, mine count, and
+    #              board code.
+    #---------------------------------------------------------------------------
+    def newGame(self, request, owned):
+        (rows, cols) = ROW_COL_VALUES[SMALL]
+        (mineCount, seed) = (None, None)
+        if 'code' in request:
+            if any(key in request for key in ('rows', 'cols', 'ratio')):
+                raise ValueError('code cannot be combined with rows, cols, '
+                                 'or ratio')
+            (rows, cols, mineCount, seed) = parseBoardCode(str(request['code']))
+        rows = self.getInteger(request, 'rows', rows)
+        cols = self.getInteger(request, 'cols', cols)
+        ratio = float(request.get('ratio', MINE_RATIO))
+        if rows < 1 or cols < 1 or rows * cols > self.maxCells:
+            raise ValueError('board must have 1 to %d cells' % self.maxCells)
+        if not 0.0 <= ratio < 1.0:
+            raise ValueError('ratio must be at least 0 and less than 1')
+        if len(self.sessions) >= self.maxSessions:
+            raise ValueError('too many sessions')
+        session = self.nextSession
+        self.nextSession += 1
+        board = MinesweeperBoard(rows, cols, ratio, useNumpy=True, seed=seed,
+                                 mineCount=mineCount)
+        self.sessions[session] = board
+        owned.add(session)
+        return {'session': session, 'rows': rows, 'cols': cols,
+                'mines': board.getMineCount(), 'code': board.getCode()}
+
+    #---------------------------------------------------------------------------
+    #      Method: reveal
+    #
+    # Description: Reveals a cell. As in the other frontends, the first click
+    #              of a game never hits a mine.
+    #
+    #      Inputs: request - The request: 'session', 'row', and 'col'.
+    #              owned   - Set of the connection's session IDs.
+    #
+    #     Outputs: Response with the game's state and the newly revealed
+    #              cells (or, after a loss, the mines) as [row, col, count]
+    #              lists.
+    #---------------------------------------------------------------------------
+    def reveal(self, request, owned):
+        board = self.getSession(request, owned)
+        (row, col) = self.getCell(board, request)
+        (_, changed) = board.openCell(row, col)
+        state = board.getState()
+        cols = board.cols
+        if state == LOST:
+            cells = [[i // cols, i % cols, -1]
+                     for i in range(board.rows * cols) if board.containsMine(i)]
+        else:
+            counts = board.adjacentMines
+            cells = [[i // cols, i % cols, counts[i]] for i in changed]
+        return {'state': STATE_NAMES[state], 'cells': cells}
+
+    #---------------------------------------------------------------------------
+    #      Method: flag
+    #
+    # Description: Flags a covered cell or removes its flag.
+    #
+    #      Inputs: request - The request: 'session', 'row', and 'col'.
+    #              owned   - Set of the connection's session IDs.
+    #
+    #     Outputs: Response saying whether the cell is now flagged.
+    #---------------------------------------------------------------------------
+    def flag(self, request, owned):
+        board = self.getSession(request, owned)
+        (row, col) = self.getCell(board, request)
+        return {'flagged': board.toggleFlag(row, col)}
+
+    #---------------------------------------------------------------------------
+    #      Method: getState
+    #
+    # Description: Reports a game's state.
+    #
+    #      Inputs: request - The request: 'session'.
+    #              owned   - Set of the connection's session IDs.
+    #
+    #     Outputs: Response with the game's state and number of revealed
+    #              cells.
+    #---------------------------------------------------------------------------
+    def getState(self, request, owned):
+        board = self.getSession(request, owned)
+        return {'state': STATE_NAMES[board.getState()],
+                'revealed': board.getRevealedCount()}
+
+    #---------------------------------------------------------------------------
+    #      Method: closeGame
+    #
+    # Description: Discards a session.
+    #
+    #      Inputs: request - The request: 'session'.
+    #              owned   - Set of the connection's session IDs.
+    #
+    #     Outputs: Empty response.
+    #---------------------------------------------------------------------------
+    def closeGame(self, request, owned):
+        self.getSession(request, owned)
+        session = request['session']
+        owned.discard(session)
+        del self.sessions[session]
+        return {}
+
+    #---------------------------------------------------------------------------
+    #      Method: getSession
+    #
+    # Description: Looks up the board of a request's session, which must
+    #              belong to the requesting connection.
+    #
+    #      Inputs: request - The request.
+    #              owned   - Set of the connection's session IDs.
+    #
+    #     Outputs: The session's MinesweeperBoard.
+    #---------------------------------------------------------------------------
+    def getSession(self, request, owned):
+        session = request.get('session')
+        if session not in owned:
+            raise ValueError('unknown session: %r' % session)
+        return self.sessions[session]
+
+    #---------------------------------------------------------------------------
+    #      Method: getCell
+    #
+    # Description: Reads and checks the cell location of a request.
+    #
+    #      Inputs: board   - The session's MinesweeperBoard.
+    #              request - The request.
+    #
+    #     Outputs: Tuple containing the row and column.
+    #---------------------------------------------------------------------------
+    def getCell(self, board, request):
+        row = self.getInteger(request, 'row')
+        col = self.getInteger(request, 'col')
+        if not (0 <= row < board.rows and 0 <= col < board.cols):
+            raise ValueError('cell out of range: (%d, %d)' % (row, col))
+        return (row, col)
+
+    #---------------------------------------------------------------------------
+    #      Method: getInteger
+    #
+    # Description: Reads an integer field of a request. Only JSON integers are
+    #              accepted, so values such as 1e400 or true are rejected
+    #              instead of overflowing or being silently converted.
+    #
+    #      Inputs: request - The request.
+    #              key     - Name of the field.
+    #              default - Value if the field is missing (optional; if not
+    #                        given, the field is required).
+    #
+    #     Outputs: The integer.
+    #---------------------------------------------------------------------------
+    def getInteger(self, request, key, default=None):
+        if key not in request:
+            if default is None:
+                raise ValueError('%s is required' % key)
+            return default
+        value = request[key]
+        if isinstance(value, bool) or not isinstance(value, int):
+            raise ValueError('%s must be an integer: %r' % (key, value))
+        return value
+
+#-------------------------------------------------------------------------------
+#    Function: main
+#
+# Description: Command-line entry point. Runs the server until interrupted.
+#
+#      Inputs: argv - Command-line arguments (optional; defaults to
+#                     'sys.argv').
+#
+#     Outputs: None.
+#-------------------------------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Serve Minesweeper games over a local socket.')
+    parser.add_argument('--socket', default=DEFAULT_SOCKET,
+                        help='path of the Unix domain socket')
+    parser.add_argument('--port', type=int,
+                        help='listen on this localhost TCP port instead')
+    parser.add_argument('--max-sessions', type=int, default=MAX_SESSIONS,
+                        help='maximum number of sessions at once')
+    args = parser.parse_args(argv)
+    server = MinesweeperServer(args.max_sessions)
+
+    async def serve():
+        if args.port:
+            listener = await asyncio.start_server(server.handleConnection,
+                                                  '127.0.0.1', args.port,
+                                                  backlog=BACKLOG)
+        else:
+            if os.path.exists(args.socket):
+                os.unlink(args.socket)
+            listener = await asyncio.start_unix_server(server.handleConnection,
+                                                       args.socket,
+                                                       backlog=BACKLOG)
+        async with listener:
+            await listener.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+#!/usr/bin/python
+
+#-------------------------------------------------------------------------------
+#    Filename: simulation.py
+#
+#      Author: David C. Drake (https://davidcdrake.com)
+#
+# Description: Runs many automated Minesweeper games across a pool of worker
+#              processes, to study win rates for different board sizes and
+#              mine ratios. Games are split into shards with deterministic
+#              seeds, so a run can be reproduced exactly. Per-game results are
+#              streamed to a JSON Lines file as shards finish.
+#
+#   Functions: playGame, runShard, getShardSeed, simulate, main
+#-------------------------------------------------------------------------------
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import argparse
+import json
+import os
+import random
+import time
+
+from engine import SMALL, MEDIUM, LARGE, ROW_COL_VALUES, MINE_RATIO, WON, \
+                   SEED_BITS, MinesweeperBoard
+from solver import MinesweeperSolver
+
+SIZE_NAMES = {'small': SMALL, 'medium': MEDIUM, 'large': LARGE}
+DEFAULT_SHARD_SIZE = 100 # games per shard
+
+#-------------------------------------------------------------------------------
+#    Function: playGame
+#
+# Description: Plays one game with a MinesweeperSolver, guessing whenever no
+#              deduction is possible. As in the game itself, the first click
+#              never hits a mine.
+#
+#      Inputs: rows      - Number of rows.
+#              cols      - Number of columns.
+#              mineRatio - Ratio of mines vs. empty cells.
+#              seed      - Seed for the board's mine layout.
+#
+#     Outputs: Dictionary describing the game: its seed and board code,
+#              whether it was won, the number of clicks and guesses (the
+#              opening click is not a guess), and the time taken (seconds).
+#-------------------------------------------------------------------------------
+def playGame(rows, cols, mineRatio, seed):
+    start = time.perf_counter()
+    board = MinesweeperBoard(rows, cols, mineRatio, seed=seed)
+    solver = MinesweeperSolver(board)
+    state = solver.play()
+    return {'seed': seed, 'board': board.getCode(), 'won': state == WON,
+            'clicks': solver.clicks, 'guesses': solver.guesses,
+            'time': time.perf_counter() - start}
+
+#-------------------------------------------------------------------------------
+#    Function: runShard
+#
+# Description: Plays a shard of games in a worker process. Each game's seed is
+#              drawn from a generator seeded with the shard's seed, and has
+#              SEED_BITS bits like the seeds of boards in the game, so the
+#              board codes of simulated games are the usual length.
+#
+#      Inputs: rows      - Number of rows.
+#              cols      - Number of columns.
+#              mineRatio - Ratio of mines vs. empty cells.
+#              shardSeed - Seed of the shard.
+#              games     - Number of games in the shard.
+#
+#     Outputs: List of per-game result dictionaries (see 'playGame').
+#-------------------------------------------------------------------------------
+def runShard(rows, cols, mineRatio, shardSeed, games):
+    rng = random.Random(shardSeed)
+    return [playGame(rows, cols, mineRatio, rng.getrandbits(SEED_BITS))
+            for _ in range(games)]
+
+#-------------------------------------------------------------------------------
+#    Function: getShardSeed
+#
+# Description: Derives the seed of a shard from the seed of the whole run, so
+#              that results don't depend on how shards are spread over
+#              workers.
+#
+#      Inputs: seed  - Seed of the run.
+#              shard - Number of the shard.
+#
+#     Outputs: The shard's seed.
+#-------------------------------------------------------------------------------
+def getShardSeed(seed, shard):
+    return random.Random('%d:%d' % (seed, shard)).getrandbits(64)
+
+#-------------------------------------------------------------------------------
+#    Function: simulate
+#
+# Description: Plays a number of games across a process pool, writing each
+#              game's result as a line of JSON as soon as its shard is done.
+#
+#      Inputs: games     - Total number of games.
+#              rows      - Number of rows.
+#              cols      - Number of columns.
+#              mineRatio - Ratio of mines vs. empty cells.
+#              seed      - Seed of the run.
+#              workers   - Number of worker processes (defaults to the number
+#                          of CPUs).
+#              shardSize - Number of games per shard.
+#              output    - File object for the per-game results (optional).
+#
+#     Outputs: Dictionary of aggregate results: games, wins, winRate, mean
+#              clicks and guesses per game, elapsed time (seconds), and
+#              gamesPerSecond.
+#-------------------------------------------------------------------------------
+def simulate(games, rows, cols, mineRatio=MINE_RATIO, seed=0, workers=None,
+             shardSize=DEFAULT_SHARD_SIZE, output=None):
+    start = time.perf_counter()
+    totals = {'games': 0, 'wins': 0, 'clicks': 0, 'guesses': 0}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = []
+        for (shard, first) in enumerate(range(0, games, shardSize)):
+            futures.append(pool.submit(runShard, rows, cols, mineRatio,
+                                       getShardSeed(seed, shard),
+                                       min(shardSize, games - first)))
+        for future in as_completed(futures):
+            for result in future.result():
+                totals['games'] += 1
+                totals['wins'] += result['won']
+                totals['clicks'] += result['clicks']
+                totals['guesses'] += result['guesses']
+                if output is not None:
+                    output.write(json.dumps(result) + '\n')
+    elapsed = time.perf_counter() - start
+    played = max(totals['games'], 1)
+    return {'games': totals['games'], 'wins': totals['wins'],
+            'winRate': totals['wins'] / played,
+            'clicks': totals['clicks'] / played,
+            'guesses': totals['guesses'] / played,
+            'elapsed': elapsed, 'gamesPerSecond': totals['games'] / elapsed}
+
+#-------------------------------------------------------------------------------
+#    Function: main
+#
+# Description: Command-line entry point. Runs a simulation and prints its
+#              aggregate results.
+#
+#      Inputs: argv - Command-line arguments (optional; defaults to
+#                     'sys.argv').
+#
+#     Outputs: None.
+#-------------------------------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Simulate automated Minesweeper games.')
+    parser.add_argument('-n', '--games', type=int, default=1000,
+                        help='number of games to play')
+    parser.add_argument('--size', choices=sorted(SIZE_NAMES), default='small',
+                        help='standard board size')
+    parser.add_argument('--rows', type=int, help='number of rows')
+    parser.add_argument('--cols', type=int, help='number of columns')
+    parser.add_argument('--ratio', type=float, default=MINE_RATIO,
+                        help='ratio of mines vs. empty cells')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the run')
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count(),
+                        help='number of worker processes')
+    parser.add_argument('--shard-size', type=int, default=DEFAULT_SHARD_SIZE,
+                        help='games per shard')
+    parser.add_argument('-o', '--output',
+                        help='JSON Lines file for per-game results')
+    args = parser.parse_args(argv)
+    if (args.rows is None) != (args.cols is None):
+        parser.error('--rows and --cols must be given together')
+    (rows, cols) = ROW_COL_VALUES[SIZE_NAMES[args.size]]
+    if args.rows is not None:
+        (rows, cols) = (args.rows, args.cols)
+    output = open(args.output, 'w') if args.output else None
+    try:
+        results = simulate(args.games, rows, cols, args.ratio, args.seed,
+                           args.workers, args.shard_size, output)
+    finally:
+        if output is not None:
+            output.close()
+    print('%d games on %d x %d with mine ratio %.3f' %
+          (results['games'], rows, cols, args.ratio))
+    print('  win rate:    %.2f%% (%d won)' %
+          (results['winRate'] * 100, results['wins']))
+    print('  per game:    %.1f clicks, %.2f guesses' %
+          (results['clicks'], results['guesses']))
+    print('  throughput:  %.1f games/s with %d workers (%.2f s)' %
+          (results['gamesPerSecond'], args.workers, results['elapsed']))
+
+if __name__ == '__main__':
+    main()
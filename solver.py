@@ -0,0 +1,578 @@
+#!/usr/bin/python
+
+#-------------------------------------------------------------------------------
+#    Filename: solver.py
+#
+#      Author: David C. Drake (https://davidcdrake.com)
+#
+# Description: An automatic Minesweeper solver. It plays a MinesweeperBoard
+#              using only what a player could see (revealed numbers and its
+#              own deductions), never the hidden mine layout.
+#
+#     Classes: MinesweeperSolver
+#
+#   Functions: binomial
+#-------------------------------------------------------------------------------
+
+from collections import deque
+from functools import lru_cache
+import math
+
+from engine import PLAYING
+
+MAX_ENUMERATION_CELLS = 48 # larger frontiers are not enumerated
+MAX_ENUMERATION_STEPS = 20000 # backtracking steps per deduction or estimate
+
+#-------------------------------------------------------------------------------
+#       Class: MinesweeperSolver
+#
+# Description: Deduces safe cells and mines from the revealed numbers. Each
+#              step first applies single-cell rules (a number whose mines are
+#              all accounted for, or whose unknown neighbors must all be
+#              mines), then difference rules between overlapping numbers, and
+#              finally enumerates every consistent mine layout of the frontier
+#              if the rules find nothing. It can also compute the probability
+#              of a mine for every unknown cell. Enumeration is capped at
+#              MAX_ENUMERATION_STEPS backtracking steps per call, so dense
+#              frontiers with huge numbers of layouts stay interactive.
+#
+#     Methods: __init__, addRevealed, getConstraints, deduce,
+#              applyDifferenceRules, getComponents, enumerateLayouts,
+#              enumerateFrontier, getMineProbabilities, estimateProbabilities,
+#              getSafestCell, step, click, guess, solve, play
+#-------------------------------------------------------------------------------
+class MinesweeperSolver:
+    #---------------------------------------------------------------------------
+    #      Method: __init__
+    #
+    # Description: Prepares to solve a board from its current state.
+    #
+    #      Inputs: board - The MinesweeperBoard to solve.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def __init__(self, board):
+        self.board = board
+        self.knownMines = set()
+        self.frontier = set() # revealed numbers that may border unknown cells
+        self.clicks = 0
+        self.guesses = 0
+        self.moved = [] # cells whose mine or count a safe first click changed
+        self.addRevealed(i for i in range(board.rows * board.cols)
+                         if board.isRevealed(i))
+
+    #---------------------------------------------------------------------------
+    #      Method: addRevealed
+    #
+    # Description: Adds newly revealed numbered cells to the frontier.
+    #
+    #      Inputs: indices - Indices of the newly revealed cells.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def addRevealed(self, indices):
+        for i in indices:
+            if self.board.getAdjacentMines(i) > 0:
+                self.frontier.add(i)
+
+    #---------------------------------------------------------------------------
+    #      Method: getConstraints
+    #
+    # Description: Builds one constraint per frontier number: the set of its
+    #              unknown neighbors and how many of them are mines. Numbers
+    #              with no unknown neighbors left are dropped from the frontier.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: Dictionary mapping frozensets of cell indices to mine counts.
+    #---------------------------------------------------------------------------
+    def getConstraints(self):
+        board = self.board
+        knownMines = self.knownMines
+        constraints = {}
+        finished = []
+        for i in self.frontier:
+            unknown = []
+            mines = board.getAdjacentMines(i)
+            for j in board.getNeighbors(i):
+                if j in knownMines:
+                    mines -= 1
+                elif not board.isRevealed(j):
+                    unknown.append(j)
+            if unknown:
+                constraints[frozenset(unknown)] = mines
+            else:
+                finished.append(i)
+        self.frontier.difference_update(finished)
+        return constraints
+
+    #---------------------------------------------------------------------------
+    #      Method: deduce
+    #
+    # Description: Finds cells that are certainly safe or certainly mines,
+    #              trying the cheapest rules first.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: Tuple containing the set of safe cells and the set of mines.
+    #---------------------------------------------------------------------------
+    def deduce(self):
+        constraints = self.getConstraints()
+        safe = set()
+        mines = set()
+        for (cells, n) in constraints.items():
+            if n == 0:
+                safe |= cells
+            elif n == len(cells):
+                mines |= cells
+        if not safe and not mines:
+            self.applyDifferenceRules(constraints, safe, mines)
+        if not safe and not mines:
+            self.enumerateFrontier(constraints, safe, mines)
+        return (safe, mines)
+
+    #---------------------------------------------------------------------------
+    #      Method: applyDifferenceRules
+    #
+    # Description: Compares every pair of overlapping constraints A and B. If
+    #              A has exactly as many more mines than B as it has cells
+    #              outside B, those cells are all mines and B's cells outside A
+    #              are all safe. (When B is a subset of A this is the classic
+    #              subset rule.)
+    #
+    #      Inputs: constraints - Constraints from 'getConstraints'.
+    #              safe        - Set to which safe cells are added.
+    #              mines       - Set to which mines are added.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def applyDifferenceRules(self, constraints, safe, mines):
+        byCell = {}
+        for cells in constraints:
+            for cell in cells:
+                byCell.setdefault(cell, []).append(cells)
+        for (a, na) in constraints.items():
+            overlapping = set()
+            for cell in a:
+                overlapping.update(byCell[cell])
+            for b in overlapping:
+                if b is a:
+                    continue
+                onlyA = a - b
+                if na - constraints[b] == len(onlyA):
+                    mines |= onlyA
+                    safe |= b - a
+
+    #---------------------------------------------------------------------------
+    #      Method: getComponents
+    #
+    # Description: Splits the frontier into independent components: groups of
+    #              unknown cells linked (directly or indirectly) by shared
+    #              constraints. Each component can be enumerated on its own.
+    #              Cells within a component are ordered so that cells sharing a
+    #              constraint are close together, which lets contradictions
+    #              surface early during enumeration.
+    #
+    #      Inputs: constraints - Constraints from 'getConstraints'.
+    #
+    #     Outputs: List of (cells, keys) tuples, where 'cells' lists the cell
+    #              indices of a component and 'keys' lists its constraints.
+    #---------------------------------------------------------------------------
+    def getComponents(self, constraints):
+        byCell = {}
+        for cells in constraints:
+            for cell in cells:
+                byCell.setdefault(cell, []).append(cells)
+        components = []
+        seen = set()
+        for start in byCell:
+            if start in seen:
+                continue
+            seen.add(start)
+            cells = []
+            keys = set()
+            pending = deque([start])
+            while pending:
+                cell = pending.popleft()
+                cells.append(cell)
+                for key in byCell[cell]:
+                    keys.add(key)
+                    for other in key:
+                        if other not in seen:
+                            seen.add(other)
+                            pending.append(other)
+            components.append((cells, list(keys)))
+        return components
+
+    #---------------------------------------------------------------------------
+    #      Method: enumerateLayouts
+    #
+    # Description: Backtracks through every mine layout of a component that
+    #              satisfies all of its constraints, calling 'visit' with each,
+    #              until the step budget runs out.
+    #
+    #      Inputs: cells       - Cell indices of the component, in order.
+    #              keys        - The component's constraints.
+    #              constraints - Constraints from 'getConstraints'.
+    #              visit       - Function called with a list of 0s and 1s (one
+    #                            per cell, 1 meaning mine) for each layout; if
+    #                            it returns 'True' the enumeration stops.
+    #              budget      - One-element list holding the number of
+    #                            backtracking steps left, shared by the
+    #                            components of one call and decreased here.
+    #
+    #     Outputs: 'False' if the budget ran out before the enumeration
+    #              finished (or was stopped by 'visit'), otherwise 'True'.
+    #---------------------------------------------------------------------------
+    def enumerateLayouts(self, cells, keys, constraints, visit, budget):
+        remaining = [constraints[key] for key in keys]
+        unassigned = [len(key) for key in keys]
+        byCell = {}
+        for (k, key) in enumerate(keys):
+            for cell in key:
+                byCell.setdefault(cell, []).append(k)
+        links = [byCell[cell] for cell in cells]
+        values = [0] * len(cells)
+
+        def assign(n):
+            if n == len(cells):
+                return visit(values)
+            budget[0] -= 1
+            if budget[0] < 0:
+                return True
+            for value in (0, 1):
+                if all(0 <= remaining[k] - value <= unassigned[k] - 1
+                       for k in links[n]):
+                    for k in links[n]:
+                        remaining[k] -= value
+                        unassigned[k] -= 1
+                    values[n] = value
+                    done = assign(n + 1)
+                    for k in links[n]:
+                        remaining[k] += value
+                        unassigned[k] += 1
+                    if done:
+                        return True
+            return False
+
+        assign(0)
+        return budget[0] >= 0
+
+    #---------------------------------------------------------------------------
+    #      Method: enumerateFrontier
+    #
+    # Description: Enumerates the consistent mine layouts of each frontier
+    #              component. Cells that are mines in every layout, or in none,
+    #              are certain. A component's enumeration stops early once none
+    #              of its cells can be certain. Components larger than
+    #              MAX_ENUMERATION_CELLS, and those not finished within the
+    #              step budget, are skipped.
+    #
+    #      Inputs: constraints - Constraints from 'getConstraints'.
+    #              safe        - Set to which safe cells are added.
+    #              mines       - Set to which mines are added.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def enumerateFrontier(self, constraints, safe, mines):
+        budget = [MAX_ENUMERATION_STEPS]
+        for (cells, keys) in self.getComponents(constraints):
+            if len(cells) > MAX_ENUMERATION_CELLS:
+                continue
+            seenMine = [False] * len(cells)
+            seenSafe = [False] * len(cells)
+            undecided = [len(cells)] # cells not yet seen both ways
+
+            def visit(values):
+                for (m, value) in enumerate(values):
+                    if value:
+                        if not seenMine[m]:
+                            seenMine[m] = True
+                            if seenSafe[m]:
+                                undecided[0] -= 1
+                    elif not seenSafe[m]:
+                        seenSafe[m] = True
+                        if seenMine[m]:
+                            undecided[0] -= 1
+                return undecided[0] == 0
+
+            if not self.enumerateLayouts(cells, keys, constraints, visit,
+                                         budget):
+                continue
+            for (m, cell) in enumerate(cells):
+                if seenMine[m] and not seenSafe[m]:
+                    mines.add(cell)
+                elif seenSafe[m] and not seenMine[m]:
+                    safe.add(cell)
+
+    #---------------------------------------------------------------------------
+    #      Method: getMineProbabilities
+    #
+    # Description: Computes the exact probability that each unknown cell holds
+    #              a mine, given the revealed numbers and the total number of
+    #              mines. Each frontier component is enumerated separately and
+    #              its layouts are tallied by mine count; the components are
+    #              then combined by convolution, weighting every combination by
+    #              the number of ways to place the remaining mines among the
+    #              unconstrained cells. The cost is governed by the largest
+    #              component rather than the whole frontier. Components larger
+    #              than MAX_ENUMERATION_CELLS, and those not finished within
+    #              the step budget, are treated as unconstrained in the
+    #              combination, and their cells get approximate probabilities
+    #              from 'estimateProbabilities' instead.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: Dictionary mapping the index of every unrevealed cell to the
+    #              probability that it contains a mine (exact unless a
+    #              component was too large to enumerate).
+    #---------------------------------------------------------------------------
+    def getMineProbabilities(self):
+        board = self.board
+        constraints = self.getConstraints()
+        unknown = [i for i in range(board.rows * board.cols)
+                   if not board.isRevealed(i) and i not in self.knownMines]
+        minesLeft = board.getMineCount() - len(self.knownMines)
+        components = []
+        skipped = []
+        constrained = 0
+        budget = [MAX_ENUMERATION_STEPS]
+        for (cells, keys) in self.getComponents(constraints):
+            if len(cells) > MAX_ENUMERATION_CELLS:
+                skipped.append((cells, keys))
+                continue
+            layouts = {} # mine count -> [layouts, mines per cell]
+
+            def visit(values):
+                k = sum(values)
+                entry = layouts.get(k)
+                if entry is None:
+                    entry = layouts[k] = [0, [0] * len(values)]
+                entry[0] += 1
+                tallies = entry[1]
+                for (m, value) in enumerate(values):
+                    tallies[m] += value
+                return False
+
+            if not self.enumerateLayouts(cells, keys, constraints, visit,
+                                         budget):
+                skipped.append((cells, keys))
+                continue
+            components.append((cells, layouts))
+            constrained += len(cells)
+        others = len(unknown) - constrained
+
+        def convolve(a, b):
+            result = {}
+            for (ka, wa) in a.items():
+                for (kb, wb) in b.items():
+                    if ka + kb <= minesLeft:
+                        result[ka + kb] = result.get(ka + kb, 0) + wa * wb
+            return result
+
+        def weight(frontierMines):
+            return binomial(others, minesLeft - frontierMines)
+
+        counts = [{k: entry[0] for (k, entry) in layouts.items()}
+                  for (cells, layouts) in components]
+        before = [{0: 1}]
+        for count in counts:
+            before.append(convolve(before[-1], count))
+        after = [{0: 1}]
+        for count in reversed(counts):
+            after.append(convolve(after[-1], count))
+        after.reverse()
+        total = sum(w * weight(t) for (t, w) in before[-1].items())
+        probabilities = dict.fromkeys(self.knownMines, 1.0)
+        if total == 0: # no layout fits the visible numbers
+            return probabilities
+        outside = sum(w * weight(t) * (minesLeft - t)
+                      for (t, w) in before[-1].items())
+        for i in unknown:
+            probabilities[i] = outside / (total * others) if others else 0.0
+        for (c, (cells, layouts)) in enumerate(components):
+            rest = convolve(before[c], after[c + 1])
+            numerators = [0] * len(cells)
+            for (k, (n, tallies)) in layouts.items():
+                factor = sum(w * weight(k + t) for (t, w) in rest.items())
+                for (m, tally) in enumerate(tallies):
+                    numerators[m] += tally * factor
+            for (m, cell) in enumerate(cells):
+                probabilities[cell] = numerators[m] / total
+        for (cells, keys) in skipped:
+            self.estimateProbabilities(cells, keys, constraints, probabilities)
+        return probabilities
+
+    #---------------------------------------------------------------------------
+    #      Method: estimateProbabilities
+    #
+    # Description: Approximates the mine probabilities of a component that was
+    #              not enumerated. Each cell gets the average, over the numbers
+    #              it borders, of the share of each number's remaining mines
+    #              per unknown neighbor.
+    #
+    #      Inputs: cells         - Cell indices of the component.
+    #              keys          - The component's constraints.
+    #              constraints   - Constraints from 'getConstraints'.
+    #              probabilities - Dictionary in which the estimates are
+    #                              stored.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def estimateProbabilities(self, cells, keys, constraints, probabilities):
+        shares = dict.fromkeys(cells, 0.0)
+        counts = dict.fromkeys(cells, 0)
+        for key in keys:
+            share = constraints[key] / len(key)
+            for cell in key:
+                shares[cell] += share
+                counts[cell] += 1
+        for cell in cells:
+            probabilities[cell] = shares[cell] / counts[cell]
+
+    #---------------------------------------------------------------------------
+    #      Method: getSafestCell
+    #
+    # Description: Finds the unrevealed cell least likely to contain a mine.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: Tuple containing the cell's index and its mine probability,
+    #              or None if no cell is left to reveal.
+    #---------------------------------------------------------------------------
+    def getSafestCell(self):
+        probabilities = self.getMineProbabilities()
+        candidates = [(p, i) for (i, p) in probabilities.items()
+                      if i not in self.knownMines]
+        if not candidates:
+            return None
+        (p, i) = min(candidates)
+        return (i, p)
+
+    #---------------------------------------------------------------------------
+    #      Method: step
+    #
+    # Description: Makes one round of deductions and plays them: deduced mines
+    #              are flagged and deduced safe cells are revealed.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: List of the indices of the cells that changed (empty if no
+    #              deduction was possible).
+    #---------------------------------------------------------------------------
+    def step(self):
+        board = self.board
+        (safe, mines) = self.deduce()
+        changed = []
+        for i in mines:
+            self.knownMines.add(i)
+            if not board.isFlagged(i):
+                board.toggleFlag(*board.getRowCol(i))
+                changed.append(i)
+        for i in safe:
+            if not board.isRevealed(i):
+                changed.extend(self.click(i))
+        return changed
+
+    #---------------------------------------------------------------------------
+    #      Method: click
+    #
+    # Description: Reveals a cell with 'openCell', so, as in the game's
+    #              frontends, the first click of a game never hits a mine; the
+    #              cells whose mines or counts that changed are added to
+    #              'moved'.
+    #
+    #      Inputs: index - Index of the cell to reveal.
+    #
+    #     Outputs: List of the indices of the cells that changed.
+    #---------------------------------------------------------------------------
+    def click(self, index):
+        (moved, changed) = self.board.openCell(*self.board.getRowCol(index))
+        self.moved.extend(moved)
+        self.clicks += 1
+        self.addRevealed(changed)
+        return changed
+
+    #---------------------------------------------------------------------------
+    #      Method: guess
+    #
+    # Description: Reveals a cell that is not certainly safe: the given one, or
+    #              else the cell least likely to contain a mine. Counted in
+    #              'guesses' as well as 'clicks'.
+    #
+    #      Inputs: index - Index of the cell to reveal (optional).
+    #
+    #     Outputs: List of the indices of the cells that changed.
+    #---------------------------------------------------------------------------
+    def guess(self, index=None):
+        if index is None:
+            safest = self.getSafestCell()
+            if safest is None:
+                return []
+            index = safest[0]
+        self.guesses += 1
+        return self.click(index)
+
+    #---------------------------------------------------------------------------
+    #      Method: solve
+    #
+    # Description: Plays the board until it is won or no further deduction is
+    #              possible (i.e., the next move would be a guess). If no cell
+    #              has been revealed yet, an opening click is made first; since
+    #              it can't hit a mine, it is not counted as a guess.
+    #
+    #      Inputs: start - (row, col) of the opening click (optional; defaults
+    #                      to the center of the board).
+    #
+    #     Outputs: List of the indices of the cells that changed.
+    #---------------------------------------------------------------------------
+    def solve(self, start=None):
+        board = self.board
+        changed = []
+        if board.getRevealedCount() == 0 and board.getState() == PLAYING:
+            if start is None:
+                start = (board.rows // 2, board.cols // 2)
+            changed = self.click(board.getIndex(*start))
+        while board.getState() == PLAYING:
+            step = self.step()
+            if not step:
+                break
+            changed.extend(step)
+        return changed
+
+    #---------------------------------------------------------------------------
+    #      Method: play
+    #
+    # Description: Plays the board to the end, solving as far as possible and
+    #              guessing the safest cell whenever it gets stuck.
+    #
+    #      Inputs: start - (row, col) of the opening click (optional; defaults
+    #                      to the center of the board).
+    #
+    #     Outputs: The final state of the game (WON or LOST).
+    #---------------------------------------------------------------------------
+    def play(self, start=None):
+        self.solve(start)
+        while self.board.getState() == PLAYING:
+            if not self.guess() and self.board.getState() == PLAYING:
+                break # nothing left to guess
+            self.solve()
+        return self.board.getState()
+
+#-------------------------------------------------------------------------------
+#    Function: binomial
+#
+# Description: Memoized binomial coefficient, used to weight the ways of
+#              placing leftover mines among unconstrained cells.
+#
+#      Inputs: n - Number of cells.
+#              k - Number of mines among them.
+#
+#     Outputs: The number of ways to choose k of n cells (0 if k is out of
+#              range).
+#-------------------------------------------------------------------------------
+@lru_cache(maxsize=None)
+def binomial(n, k):
+    if k < 0 or k > n:
+        return 0
+    return math.comb(n, k)
@@ -0,0 +1,505 @@
+#!/usr/bin/python
+
+#-------------------------------------------------------------------------------
+#    Filename: terminal.py
+#
+#      Author: David C. Drake (https://davidcdrake.com)
+#
+# Description: A curses frontend for playing Minesweeper in a terminal (e.g.,
+#              over SSH). It uses the same headless engine as the GTK table
+#              and redraws only the cells each action changed, such as the
+#              cells opened by a flood fill, rather than the whole screen.
+#              Boards larger than the terminal scroll with the cursor. With
+#              '--infinite', the game is played on an unbounded board (see
+#              'infinite.py') that starts around the cursor.
+#
+#              Keys: arrows or h/j/k/l move the cursor, space or enter
+#              reveals (or, on a revealed number, chords), f flags, n starts
+#              a new game, and q quits.
+#
+#     Classes: MinesweeperTerminal, InfiniteTerminal
+#
+#   Functions: main
+#-------------------------------------------------------------------------------
+
+import argparse
+import curses
+
+from engine import SMALL, MEDIUM, LARGE, ROW_COL_VALUES, MINE_RATIO, \
+                   PLAYING, WON, LOST, MinesweeperBoard, boardFromCode, \
+                   parseBoardCode
+from infinite import MAX_CHUNKS, InfiniteBoard
+
+SIZE_NAMES = {'small': SMALL, 'medium': MEDIUM, 'large': LARGE}
+CELL_WIDTH = 2 # characters per cell, including a blank separator
+COVERED = '.'
+FLAG = 'F'
+MINE = '*'
+MOVES = {curses.KEY_UP: (-1, 0), curses.KEY_DOWN: (1, 0),
+         curses.KEY_LEFT: (0, -1), curses.KEY_RIGHT: (0, 1),
+         ord('k'): (-1, 0), ord('j'): (1, 0), ord('h'): (0, -1),
+         ord('l'): (0, 1)}
+NUMBER_COLORS = [curses.COLOR_BLUE, curses.COLOR_GREEN, curses.COLOR_RED,
+                 curses.COLOR_BLUE, curses.COLOR_RED, curses.COLOR_CYAN,
+                 curses.COLOR_WHITE, curses.COLOR_WHITE]
+
+#-------------------------------------------------------------------------------
+#       Class: MinesweeperTerminal
+#
+# Description: Manages a Minesweeper game on a curses screen.
+#
+#     Methods: __init__, run, restart, handleKey, moveCursor, clickCell,
+#              toggleFlag, scrollTo, drawAll, drawCells, drawStatus,
+#              placeCursor, getGlyph
+#-------------------------------------------------------------------------------
+class MinesweeperTerminal:
+    #---------------------------------------------------------------------------
+    #      Method: __init__
+    #
+    # Description: Sets up the screen and starts a game.
+    #
+    #      Inputs: screen    - The curses window to draw on.
+    #              rows      - Number of rows.
+    #              cols      - Number of columns.
+    #              mineRatio - Ratio of mines vs. empty cells.
+    #              boardCode - Board code of the first game's board, which
+    #                          overrides the size (optional).
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def __init__(self, screen, rows, cols, mineRatio=MINE_RATIO,
+                 boardCode=None):
+        self.screen = screen
+        self.rows = rows
+        self.cols = cols
+        self.mineRatio = mineRatio
+        self.boardCode = boardCode
+        self.attributes = [curses.A_NORMAL] * 9
+        if curses.has_colors():
+            curses.start_color()
+            for (i, color) in enumerate(NUMBER_COLORS):
+                curses.init_pair(i + 1, color, curses.COLOR_BLACK)
+                self.attributes[i + 1] = curses.color_pair(i + 1) | \
+                                         curses.A_BOLD
+        curses.curs_set(1)
+        self.screen.keypad(True)
+        self.restart()
+
+    #---------------------------------------------------------------------------
+    #      Method: run
+    #
+    # Description: Reads and handles keys until the player quits.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def run(self):
+        self.placeCursor()
+        curses.doupdate()
+        while self.handleKey(self.screen.getch()):
+            self.placeCursor()
+            curses.doupdate()
+
+    #---------------------------------------------------------------------------
+    #      Method: restart
+    #
+    # Description: Starts a new game with the cursor in the top-left corner.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def restart(self):
+        if self.boardCode is not None:
+            self.board = boardFromCode(self.boardCode)
+            (self.rows, self.cols) = (self.board.rows, self.board.cols)
+            self.boardCode = None
+        else:
+            self.board = MinesweeperBoard(self.rows, self.cols,
+                                          self.mineRatio)
+        self.cursor = (0, 0)
+        self.top = 0
+        self.left = 0
+        self.drawAll()
+
+    #---------------------------------------------------------------------------
+    #      Method: handleKey
+    #
+    # Description: Carries out the action bound to a key.
+    #
+    #      Inputs: key - The key code from 'getch'.
+    #
+    #     Outputs: 'False' if the player quit, otherwise 'True'.
+    #---------------------------------------------------------------------------
+    def handleKey(self, key):
+        if key in (ord('q'), ord('Q')):
+            return False
+        if key in MOVES:
+            self.moveCursor(*MOVES[key])
+        elif key in (ord(' '), ord('\n'), curses.KEY_ENTER):
+            self.clickCell(*self.cursor)
+        elif key in (ord('f'), ord('F')):
+            self.toggleFlag(*self.cursor)
+        elif key in (ord('n'), ord('N')):
+            self.restart()
+        elif key == curses.KEY_RESIZE:
+            self.scrollTo(*self.cursor)
+            self.drawAll()
+        return True
+
+    #---------------------------------------------------------------------------
+    #      Method: moveCursor
+    #
+    # Description: Moves the cursor, scrolling the board if the cursor leaves
+    #              the visible part of it.
+    #
+    #      Inputs: dRow - Change in row.
+    #              dCol - Change in column.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def moveCursor(self, dRow, dCol):
+        row = min(max(self.cursor[0] + dRow, 0), self.rows - 1)
+        col = min(max(self.cursor[1] + dCol, 0), self.cols - 1)
+        self.cursor = (row, col)
+        self.scrollTo(row, col)
+
+    #---------------------------------------------------------------------------
+    #      Method: clickCell
+    #
+    # Description: Reveals a cell, or plays a chord if the cell is a revealed
+    #              number, and redraws the cells that changed. The first click
+    #              of a game never hits a mine. If the game is lost, every
+    #              cell is revealed.
+    #
+    #      Inputs: row - Row of the cell.
+    #              col - Column of the cell.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def clickCell(self, row, col):
+        if self.board.getState() != PLAYING or \
+           self.board.isFlagged(self.board.getIndex(row, col)):
+            return
+        if self.board.isRevealed(self.board.getIndex(row, col)):
+            changed = self.board.chordCell(row, col)
+        else:
+            (_, changed) = self.board.openCell(row, col)
+        if self.board.getState() == LOST:
+            self.board.revealAllCells()
+            self.drawAll()
+        else:
+            self.drawCells(changed)
+            self.drawStatus()
+
+    #---------------------------------------------------------------------------
+    #      Method: toggleFlag
+    #
+    # Description: Flags or unflags a cell and redraws it.
+    #
+    #      Inputs: row - Row of the cell.
+    #              col - Column of the cell.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def toggleFlag(self, row, col):
+        if self.board.getState() != PLAYING:
+            return
+        self.board.toggleFlag(row, col)
+        self.drawCells([self.board.getIndex(row, col)])
+        self.drawStatus()
+
+    #---------------------------------------------------------------------------
+    #      Method: scrollTo
+    #
+    # Description: Scrolls the board, if necessary, so that a cell is visible,
+    #              redrawing the board only when it actually scrolls.
+    #
+    #      Inputs: row - Row of the cell.
+    #              col - Column of the cell.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def scrollTo(self, row, col):
+        (height, width) = self.screen.getmaxyx()
+        visibleRows = max(height - 1, 1)
+        visibleCols = max(width // CELL_WIDTH, 1)
+        (top, left) = (self.top, self.left)
+        if row < top:
+            top = row
+        elif row >= top + visibleRows:
+            top = row - visibleRows + 1
+        if col < left:
+            left = col
+        elif col >= left + visibleCols:
+            left = col - visibleCols + 1
+        if (top, left) != (self.top, self.left):
+            (self.top, self.left) = (top, left)
+            self.drawAll()
+
+    #---------------------------------------------------------------------------
+    #      Method: drawAll
+    #
+    # Description: Redraws the status line and every visible cell. Used only
+    #              when a game starts, the board scrolls, or the terminal is
+    #              resized.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def drawAll(self):
+        self.screen.erase()
+        (height, width) = self.screen.getmaxyx()
+        bottom = min(self.top + height - 1, self.rows)
+        right = min(self.left + width // CELL_WIDTH, self.cols)
+        self.drawCells(row * self.cols + col
+                       for row in range(self.top, bottom)
+                       for col in range(self.left, right))
+        self.drawStatus()
+
+    #---------------------------------------------------------------------------
+    #      Method: drawCells
+    #
+    # Description: Draws the given cells, skipping any outside the visible
+    #              part of the board.
+    #
+    #      Inputs: indices - Iterable of the indices of the cells to draw.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def drawCells(self, indices):
+        (height, width) = self.screen.getmaxyx()
+        getRowCol = self.board.getRowCol
+        for i in indices:
+            (row, col) = getRowCol(i)
+            y = row - self.top + 1
+            x = (col - self.left) * CELL_WIDTH
+            if 1 <= y < height and 0 <= x < width - 1:
+                (glyph, attribute) = self.getGlyph(i)
+                self.screen.addstr(y, x, glyph, attribute)
+        self.screen.noutrefresh()
+
+    #---------------------------------------------------------------------------
+    #      Method: drawStatus
+    #
+    # Description: Draws the status line: the game's state, the number of
+    #              mines and flags, and the key bindings. Once the game is
+    #              over, the board code is shown so the board can be played
+    #              again.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def drawStatus(self):
+        state = self.board.getState()
+        if state == WON:
+            text = 'You won! Board %s. n: new game, q: quit' % \
+                   self.board.getCode()
+        elif state == LOST:
+            text = 'You lost. Board %s. n: new game, q: quit' % \
+                   self.board.getCode()
+        else:
+            text = '%d x %d, %d mines, %d flags | ' \
+                   'space: reveal, f: flag, n: new, q: quit' % \
+                   (self.rows, self.cols, self.board.getMineCount(),
+                    self.board.getFlagCount())
+        width = self.screen.getmaxyx()[1]
+        self.screen.addnstr(0, 0, text.ljust(width - 1), width - 1,
+                            curses.A_REVERSE)
+        self.screen.noutrefresh()
+
+    #---------------------------------------------------------------------------
+    #      Method: placeCursor
+    #
+    # Description: Moves the terminal's cursor onto the selected cell.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def placeCursor(self):
+        (row, col) = self.cursor
+        self.screen.move(row - self.top + 1, (col - self.left) * CELL_WIDTH)
+        self.screen.noutrefresh()
+
+    #---------------------------------------------------------------------------
+    #      Method: getGlyph
+    #
+    # Description: Determines how a cell is shown.
+    #
+    #      Inputs: index - Index of the cell.
+    #
+    #     Outputs: Tuple containing the cell's character and its curses
+    #              attribute.
+    #---------------------------------------------------------------------------
+    def getGlyph(self, index):
+        board = self.board
+        if board.isFlagged(index):
+            return (FLAG, curses.A_BOLD)
+        if not board.isRevealed(index):
+            return (COVERED, curses.A_DIM)
+        if board.containsMine(index):
+            return (MINE, curses.A_BOLD)
+        count = board.getAdjacentMines(index)
+        if count == 0:
+            return (' ', curses.A_NORMAL)
+        return (str(count), self.attributes[count])
+
+#-------------------------------------------------------------------------------
+#       Class: InfiniteTerminal
+#
+# Description: Manages a game on an unbounded board. The cursor moves freely,
+#              the board scrolls to follow it, and only the cells on screen
+#              are drawn; the game starts with the cell under the cursor
+#              revealed.
+#
+#     Methods: __init__, restart, moveCursor, drawAll, drawStatus
+#-------------------------------------------------------------------------------
+class InfiniteTerminal(MinesweeperTerminal):
+    #---------------------------------------------------------------------------
+    #      Method: __init__
+    #
+    # Description: Sets up the screen and starts a game.
+    #
+    #      Inputs: screen    - The curses window to draw on.
+    #              mineRatio - Ratio of mines vs. empty cells.
+    #              seed      - Seed of the mine layout (optional; each game
+    #                          gets a random one by default).
+    #              maxChunks - Maximum number of chunks kept in memory.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def __init__(self, screen, mineRatio=MINE_RATIO, seed=None,
+                 maxChunks=MAX_CHUNKS):
+        self.seed = seed
+        self.maxChunks = maxChunks
+        MinesweeperTerminal.__init__(self, screen, None, None, mineRatio)
+
+    #---------------------------------------------------------------------------
+    #      Method: restart
+    #
+    # Description: Starts a new game with the cursor, on the board's safe
+    #              origin, in the middle of the screen.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def restart(self):
+        self.board = InfiniteBoard(self.mineRatio, self.seed, self.maxChunks)
+        self.board.clickCell(0, 0)
+        (height, width) = self.screen.getmaxyx()
+        self.cursor = (0, 0)
+        self.top = -max(height - 1, 1) // 2
+        self.left = -max(width // CELL_WIDTH, 1) // 2
+        self.drawAll()
+
+    #---------------------------------------------------------------------------
+    #      Method: moveCursor
+    #
+    # Description: Moves the cursor, scrolling the board if the cursor leaves
+    #              the visible part of it.
+    #
+    #      Inputs: dRow - Change in row.
+    #              dCol - Change in column.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def moveCursor(self, dRow, dCol):
+        self.cursor = (self.cursor[0] + dRow, self.cursor[1] + dCol)
+        self.scrollTo(*self.cursor)
+
+    #---------------------------------------------------------------------------
+    #      Method: drawAll
+    #
+    # Description: Redraws the status line and every visible cell.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def drawAll(self):
+        self.screen.erase()
+        (height, width) = self.screen.getmaxyx()
+        self.drawCells((row, col)
+                       for row in range(self.top, self.top + height - 1)
+                       for col in range(self.left,
+                                        self.left + width // CELL_WIDTH))
+        self.drawStatus()
+
+    #---------------------------------------------------------------------------
+    #      Method: drawStatus
+    #
+    # Description: Draws the status line: the game's state, the number of
+    #              cells revealed and flagged, and the key bindings.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: None.
+    #---------------------------------------------------------------------------
+    def drawStatus(self):
+        if self.board.getState() == LOST:
+            text = 'You lost after revealing %d cells. n: new game, q: quit' % \
+                   self.board.getRevealedCount()
+        else:
+            text = 'Infinite, %d revealed, %d flags at (%d, %d) | ' \
+                   'space: reveal, f: flag, n: new, q: quit' % \
+                   ((self.board.getRevealedCount(),
+                     self.board.getFlagCount()) + self.cursor)
+        width = self.screen.getmaxyx()[1]
+        self.screen.addnstr(0, 0, text.ljust(width - 1), width - 1,
+                            curses.A_REVERSE)
+        self.screen.noutrefresh()
+
+#-------------------------------------------------------------------------------
+#    Function: main
+#
+# Description: Command-line entry point. Plays Minesweeper in the terminal.
+#
+#      Inputs: argv - Command-line arguments (optional; defaults to
+#                     'sys.argv').
+#
+#     Outputs: None.
+#-------------------------------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Play Minesweeper in a terminal.')
+    parser.add_argument('--size', choices=sorted(SIZE_NAMES), default='small',
+                        help='standard board size')
+    parser.add_argument('--rows', type=int, help='number of rows')
+    parser.add_argument('--cols', type=int, help='number of columns')
+    parser.add_argument('--ratio', type=float, default=MINE_RATIO,
+                        help='ratio of mines vs. empty cells')
+    parser.add_argument('--board', metavar='CODE',
+                        help='start with the board that has this board code')
+    parser.add_argument('--infinite', action='store_true',
+                        help='play on an unbounded board')
+    parser.add_argument('--seed', type=int,
+                        help='seed of the unbounded board\'s mine layout')
+    parser.add_argument('--max-chunks', type=int, default=MAX_CHUNKS,
+                        help='chunks of the unbounded board kept in memory')
+    args = parser.parse_args(argv)
+    if (args.rows is None) != (args.cols is None):
+        parser.error('--rows and --cols must be given together')
+    if args.infinite:
+        curses.wrapper(lambda screen: InfiniteTerminal(
+            screen, args.ratio, args.seed, args.max_chunks).run())
+        return
+    (rows, cols) = ROW_COL_VALUES[SIZE_NAMES[args.size]]
+    if args.rows is not None:
+        if args.rows < 1 or args.cols < 1:
+            parser.error('--rows and --cols must be at least 1')
+        (rows, cols) = (args.rows, args.cols)
+    if args.board is not None:
+        try:
+            parseBoardCode(args.board)
+        except ValueError as error:
+            parser.error(str(error))
+    curses.wrapper(lambda screen: MinesweeperTerminal(
+        screen, rows, cols, args.ratio, args.board).run())
+
+if __name__ == '__main__':
+    main()
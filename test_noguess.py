@@ -0,0 +1,43 @@
+#!/usr/bin/python
+
+#-------------------------------------------------------------------------------
+#    Filename: test_noguess.py
+#
+#      Author: David C. Drake (https://davidcdrake.com)
+#
+# Description: Tests for the no-guess board generator and board pool.
+#-------------------------------------------------------------------------------
+
+import random
+
+import pytest
+
+from engine import boardFromCode
+from noguess import MinesweeperBoardPool, generateNoGuessBoard
+from solver import MinesweeperSolver
+
+def test_pooled_board_code_rebuilds_board():
+    pool = MinesweeperBoardPool(size=1)
+    try:
+        (board, start) = pool.get(9, 9)
+    finally:
+        pool.stop()
+    code = board.getCode()
+    assert code is not None
+    rebuilt = boardFromCode(code)
+    assert rebuilt.cells == board.cells
+    assert rebuilt.adjacentMines == board.adjacentMines
+    MinesweeperSolver(rebuilt).solve(start)
+    assert rebuilt.hasWon()
+
+def test_boards_have_their_own_generators():
+    rng = random.Random(1)
+    (first, _) = generateNoGuessBoard(9, 9, rng=rng)
+    (second, _) = generateNoGuessBoard(9, 9, rng=rng)
+    assert first.getCode() is not None
+    assert first.rng is not rng and second.rng is not rng
+    assert first.rng is not second.rng
+
+def test_gives_up_after_max_attempts():
+    with pytest.raises(ValueError):
+        generateNoGuessBoard(20, 20, 0.6, rng=random.Random(1))